@@ -5,10 +5,16 @@ Description : Data Storytelling sur la vaccination.
 """
 
 import streamlit as st
-import pandas as pd
-import numpy as np
-import altair as alt
 import os
+import json
+import hmac
+
+# Imports légers seulement : pandas, Altair et Arrow sont importés par les
+# fonctions qui en ont besoin, après le premier affichage de la barre latérale
+from vacsi import trace
+from vacsi.i18n import TRANSLATIONS
+from vacsi.registry import DatasetRegistry
+from vacsi.watch import Refresher
 
 # ============================================================================
 # 1. Configuration (Doit être la toute première ligne)
@@ -23,9 +29,9 @@ st.set_page_config(
 # ============================================================================
 # 2. Gestion du Style (CSS)
 # ============================================================================
-def inject_custom_css(dark_mode: bool):
-    """Injecte le CSS pour le thème et supprime la barre blanche."""
-    
+@st.cache_resource
+def theme_css(dark_mode: bool):
+    """CSS du thème (clair ou sombre), construit une fois par processus."""
     # Couleurs dynamiques
     bg_color = "#0E1117" if dark_mode else "#FFFFFF"
     text_color = "#FAFAFA" if dark_mode else "#333333"
@@ -63,290 +69,194 @@ def inject_custom_css(dark_mode: bool):
         }}
     </style>
     """
-    st.markdown(css, unsafe_allow_html=True)
-    
-    if dark_mode: alt.themes.enable("dark")
-    else: alt.themes.enable("default")
+    return css
+
+@trace.traced("inject_css")
+def inject_custom_css(dark_mode: bool):
+    """Injecte le CSS pour le thème et supprime la barre blanche.
+
+    Streamlit ne garde que les éléments émis pendant le rendu : le CSS est
+    renvoyé à chaque rendu, mais la chaîne n'est construite qu'une fois par thème.
+    """
+    st.markdown(theme_css(dark_mode), unsafe_allow_html=True)
 
 # ============================================================================
 # 3. Constantes & Mapping
 # ============================================================================
-URL_GEOJSON = "https://raw.githubusercontent.com/gregoiredavid/france-geojson/master/departements-version-simplifiee.geojson"
-
-# --- FICHIERS DANS LE DOSSIER DATA ---
-FILES = {
-    "dep_age": "data/vacsi-tot-a-dep-2023-07-13-15h50.csv",
-    "dep_sex": "data/vacsi-tot-s-dep-2023-07-13-15h51.csv",
+# --- FICHIERS : cliché le plus récent de chaque type dans data/ (voir vacsi.registry) ---
+# Jeux de données nécessaires à chaque page : chargés au premier affichage de la page
+PAGE_DATASETS = {
+    'nav_intro': ('dep_age', 'fra_age'),  # KPIs : fichier national
+    'nav_geo': ('dep_age',),
+    'nav_demo': ('dep_age', 'dep_sex'),
+    'nav_evol': ('dep_age',),
 }
 
-COLORS = {
-    "dose_primary": "#3182bd", "dose_booster": "#31a354",
-    "male": "#2171b5", "female": "#cb181d",
-    "avg_line": "#e67e22", "gray_neutral": "#e0e0e0",
-}
+# --- CACHE DES SPECS DE GRAPHIQUES ---
+SPEC_CACHE_SIZE = 256
+PREWARM_SPECS = os.environ.get("VACSI_PREWARM_SPECS") == "1"
 
-AGE_MAPPING = {
-    0: 'Tous âges', 4: '0-4 ans', 9: '5-9 ans', 11: '10-11 ans', 17: '12-17 ans',
-    24: '18-24 ans', 29: '25-29 ans', 39: '30-39 ans', 49: '40-49 ans',
-    59: '50-59 ans', 64: '60-64 ans', 69: '65-69 ans', 74: '70-74 ans',
-    79: '75-79 ans', 80: '80 ans et +'
-}
-AGE_ORDER = ['Tous âges', '0-4 ans', '5-9 ans', '10-11 ans', '12-17 ans', '18-24 ans', '25-29 ans',
-             '30-39 ans', '40-49 ans', '50-59 ans', '60-64 ans', '65-69 ans',
-             '70-74 ans', '75-79 ans', '80 ans et +']
-
-TRANSLATIONS = {
-    'Français': {
-        'nav_title': "Navigation",
-        'nav_intro': "Synthèse et Contexte",
-        'nav_geo': "Géographie",
-        'nav_demo': "Démographie",
-        'about': "Auteur",
-        'prof': "Encadrant",
-        
-        'kpi_title': "Panorama National France (Situation à date)",
-        'intro_title': "Vaccination COVID-19 en France",
-        'intro_subtitle': "Analyse comparative de la couverture vaccinale française par territoire et démographie",
-        
-        # TEXTES COMPLETS RESTAURÉS
-        'tab_narrative': "Analyse et Synthèse",
-        'tab_data': "Données et Méthodologie",
-        'tab_quality': "Qualité",
-        'intro_narrative_text': """
-        ### Problématique Centrale
-        La campagne de vaccination contre la COVID-19 **en France** a mobilisé des ressources massives sur tout le territoire.
-        **Cependant, cette couverture a-t-elle été équitable pour tous les Français ?**
-
-        ### Structure de l'Analyse
-        Ce tableau de bord décompose cette question en deux dimensions complémentaires :
-        
-        **Dimension 1 : Variations Territoriales**
-        Certains départements ont-ils bénéficié d'une meilleure couverture que d'autres ? Existe-t-il des patterns régionaux ou une corrélation avec la densité de population ?
-        
-        **Dimension 2 : Variations Démographiques**
-        Comment la vaccination a-t-elle progressé selon l'âge et le sexe ? Quels groupes présentent les taux d'adhésion les plus élevés ou les plus faibles ?
-
-        ### Contexte Temporel
-        * **Janvier 2021 - Juin 2021** : Phase initiale (Doses 1 & 2, ciblage prioritaires)
-        * **Juillet 2021** : Catalyseur majeur avec le Pass Sanitaire
-        * **2022-2023** : Expansion vers les doses de rappel et vaccins adaptés
-        """,
-        
-        'intro_data_text': "Données issues de **data.gouv.fr** (Santé Publique France).",
-        'dq_limitations': "**Limitation technique :** Les taux > 100% (dus aux biais de recensement INSEE) sont plafonnés à 100% pour la lisibilité.",
-        'dq_source': "**Source :** Santé Publique France (Fichiers VACSI)",
-        'dq_license': "**Licence :** Licence Ouverte / Open Licence version 2.0",
-
-        'geo_title': "Analyse Territoriale",
-        'geo_desc': "Comparaison de la couverture vaccinale par département.",
-        'geo_insight': "**Analyse :** On observe des disparités régionales significatives. Les départements urbains présentent des taux de couverture supérieurs à certains territoires moins denses.",
-        'geo_implication': "**Interprétation :** Les zones à faible densité de population présentent des défis logistiques importants pour l'accès à la vaccination.",
-        'geo_choose_dose': "Indicateur :",
-        'geo_map_title': "Carte de France",
-        'geo_rank_title': "Classement des départements",
-        
-        'demo_title': "Analyse Démographique",
-        'demo_desc': "Couverture vaccinale par groupe d'âge et sexe.",
-        'demo_insight_age': "**Analyse Âge :** Les groupes âgés (65+) présentent une couverture élevée (>90%), tandis que la couverture en doses de rappel diminue dans les groupes jeunes adultes.",
-        'demo_implication_age': "**Interprétation :** Les stratégies de communication et d'accès doivent être adaptées aux caractéristiques sociodémographiques des différents groupes d'âge.",
-        'demo_insight_sex': "**Analyse Sexe :** Les taux de couverture présentent une distribution similaire entre hommes et femmes, indiquant une adhésion équilibrée entre les sexes.",
-        
-        'demo_type_label': "Vue par :",
-        'demo_type_age': "Âge",
-        'demo_type_sex': "Sexe",
-        'demo_choose_dose': "Stade vaccinal :",
-        'prop_title': "Couverture par génération",
-        'prop_vaccinated': "Vaccinés",
-        'prop_non_vaccinated': "Non-vaccinés",
-        'pie_title': "Poids démographique des vaccinés",
-        'demo_boxplot_title': "Écarts de couverture (Dispersion)",
-        'demo_boxplot_text': "Plus la boîte est grande, plus l'inégalité entre les départements est forte pour cet âge.",
-        
-        'tooltip_nat': "Moyenne Nationale",
-        'axis_rate': "Taux (%)",
-        'axis_dep': "Département",
-        'axis_pop': "Population",
-        'theme_label': "Mode Nuit",
-        'cap_note': "Note : Les taux sont calculés par rapport à la population ciblée pour chaque stade vaccinal.",
-        'tooltip_max': "Max",
-        'tooltip_min': "Min",
-        'tooltip_med': "Médiane",
-        'axis_sex': "Sexe"
-    },
-    'English': {
-        'nav_title': "Navigation",
-        'nav_intro': "Summary & Context",
-        'nav_geo': "Geography",
-        'nav_demo': "Demographics",
-        'about': "Author",
-        'prof': "Supervisor",
-        
-        'kpi_title': "National Overview - France",
-        'intro_title': "COVID-19 Vaccination Dashboard (France)",
-        'intro_subtitle': "Comparative analysis of French vaccination coverage by territory and demographics",
-        
-        'tab_narrative': "Analysis & Summary",
-        'tab_data': "Data & Methods",
-        'tab_quality': "Quality",
-        'intro_narrative_text': """
-        ### Central Research Question
-        The COVID-19 vaccination campaign in France mobilized massive resources across all territories.
-        **However, was this coverage equitable for all citizens?**
-
-        ### Analysis Structure
-        This dashboard addresses this question across two complementary dimensions:
-        
-        **Dimension 1: Territorial Variations** Did certain departments achieve better coverage than others? Are there regional patterns or correlations with population density?
-        
-        **Dimension 2: Demographic Variations** How did vaccination progress according to age and gender? Which groups showed the highest or lowest uptake rates?
+# --- COURBES D'ÉVOLUTION : niveaux de détail (voir vacsi.lod) ---
+# Largeur supposée du graphique : Streamlit ne transmet pas la largeur réelle au serveur
+EVOL_WIDTH_PX = 900
+LOD_CACHE_SIZE = 512  # Séries (département, âge, indicateur) dont les niveaux sont gardés
 
-        ### Temporal Context
-        * **January 2021 - June 2021**: Initial phase (Doses 1 & 2, targeting priority groups)
-        * **July 2021**: Major catalyst with the Health Pass implementation
-        * **2022-2023**: Expansion to booster doses and adapted vaccines
-        """,
-        
-        'intro_data_text': "Data sourced from **data.gouv.fr** (Public Health France).",
-        'dq_limitations': "**Technical Limit:** Rates > 100% (due to census bias) are capped at 100% for readability.",
-        'dq_source': "**Source:** Public Health France (VACSI files)",
-        'dq_license': "**License:** Open License version 2.0",
-        
-        'geo_title': "Territorial Analysis",
-        'geo_desc': "Vaccination coverage comparison by department.",
-        'geo_insight': "**Analysis:** Significant regional disparities are observed. Urban departments show higher coverage rates than some less densely populated territories.",
-        'geo_implication': "**Interpretation:** Low-density population zones face substantial logistical challenges for vaccination access.",
-        'geo_choose_dose': "Indicator:",
-        'geo_map_title': "Map of France",
-        'geo_rank_title': "Ranking by Department",
-        
-        'demo_title': "Demographic Analysis",
-        'demo_desc': "Vaccination coverage by age group and gender.",
-        'demo_insight_age': "**Age Analysis:** Older age groups (65+) show high coverage (>90%), while booster dose coverage decreases in younger adult cohorts.",
-        'demo_implication_age': "**Interpretation:** Communication and access strategies must be adapted to the sociodemographic characteristics of different age groups.",
-        'demo_insight_sex': "**Gender Analysis:** Coverage rates show similar distribution between men and women, indicating balanced uptake across genders.",
-        
-        'demo_type_label': "View by:",
-        'demo_type_age': "Age",
-        'demo_type_sex': "Gender",
-        'demo_choose_dose': "Stage:",
-        'prop_title': "Coverage by Generation",
-        'prop_vaccinated': "Vaccinated",
-        'prop_non_vaccinated': "Not Vaccinated",
-        'pie_title': "Demographic weight of vaccinated",
-        'demo_boxplot_title': "Coverage Gaps (Dispersion)",
-        'demo_boxplot_text': "The wider the box, the higher the inequality between departments for this age group.",
-        
-        'tooltip_nat': "National Average",
-        'axis_rate': "Rate (%)",
-        'axis_dep': "Department",
-        'axis_pop': "Population",
-        'theme_label': "Night Mode",
-        'cap_note': "Note: Rates are calculated relative to the target population for each vaccination stage.",
-        'tooltip_max': "Max",
-        'tooltip_min': "Min",
-        'tooltip_med': "Median",
-        'axis_sex': "Gender"
-    }
-}
+# --- EXPLORATION GÉOGRAPHIQUE : métropole / outre-mer, vue par région, puis une région dépliée ---
+GEO_ZONES, GEO_REGIONS, GEO_DEPARTMENTS = 'zones', 'regions', 'departements'
+GEO_LEVELS = {GEO_ZONES: 'Zone', GEO_REGIONS: 'Region', GEO_DEPARTMENTS: 'Departement'}
+
+# --- RAFRAÎCHISSEMENT EN ARRIÈRE-PLAN : relevé du dossier data/ (0 = désactivé) ---
+WATCH_SECONDS = float(os.environ.get("VACSI_WATCH_SECONDS", "30"))
+
+# --- INSTRUMENTATION (panneau admin : VACSI_ADMIN=1, ou ?admin=<VACSI_ADMIN_TOKEN> dans l'URL) ---
+ADMIN = os.environ.get("VACSI_ADMIN") == "1"
+ADMIN_TOKEN = os.environ.get("VACSI_ADMIN_TOKEN", "")
+# Mesure mémoire (tracemalloc, tout le processus) : réglage du processus, jamais d'une session
+TRACE_DETAIL = os.environ.get("VACSI_TRACE_DETAIL") == "1"
 
 # ==============================================================================
 # 4. Chargement des Données
 # ==============================================================================
-def fix_dep_code(c: any) -> str:
-    c = str(c).strip()
-    return "0" + c if len(c) == 1 else c
-
-@st.cache_data
-def load_dep_data(filepath):
-    # Gestion des erreurs de fichier
-    if not os.path.exists(filepath):
-        st.error(f"Fichier introuvable : `{filepath}`. Le dossier 'data' est-il bien sur GitHub ?")
-        return None, []
-        
+@st.cache_resource
+def get_registry():
+    return DatasetRegistry()
+
+@st.cache_resource
+def get_dataset():
+    """Jeu de données partagé par toutes les sessions du processus (voir vacsi.dataset)."""
+    from vacsi.dataset import SharedDataset
+    return SharedDataset(get_registry())
+
+@st.cache_resource
+def get_refresher():
+    """Fil de surveillance de data/, un seul par processus (voir vacsi.watch)."""
+    refresher = Refresher(get_dataset(), get_registry(), WATCH_SECONDS)
+    return refresher.start() if WATCH_SECONDS > 0 else refresher
+
+def load_data(needs=('dep_age',)):
+    """Instantané courant contenant au moins ``needs`` ; commun à toutes les sessions, sans copie."""
     try:
-        data = pd.read_csv(filepath, delimiter=';', dtype={'dep': str})
-        data.columns = data.columns.str.lower()
-        if 'jour' in data.columns: data = data[data['jour'] == data['jour'].max()]
-        
-        mapping = {
-            'Dose 1': ['n_tot_dose1', 'n_cum_dose1'], 'Dose 2': ['n_tot_dose2', 'n_cum_dose2', 'n_tot_complet'],
-            'Rappel 1': ['n_tot_rappel', 'n_cum_rappel'], 'Rappel 2': ['n_tot_2_rappel'],
-            'Rappel 3': ['n_tot_3_rappel'], 'Rappel Bivalent': ['n_tot_rappel_biv']
-        }
-        
-        cols_keep = ['dep', 'clage_vacsi', 'pop']
-        rename = {'dep': 'Departement', 'clage_vacsi': 'CodeAge', 'pop': 'Population'}
-        found = []
-        for n, opts in mapping.items():
-            c = next((x for x in data.columns if x in opts), None)
-            if c:
-                cols_keep.append(c); rename[c] = n; found.append(n)
-                
-        data = data[cols_keep].rename(columns=rename)
-        data['Departement'] = data['Departement'].apply(fix_dep_code)
-        data['Population'] = data['Population'].replace(0, np.nan)
-        
-        data['CodeAge'] = pd.to_numeric(data['CodeAge'], errors='coerce').fillna(-1).astype(int)
-        data['Classe dAge'] = data['CodeAge'].map(AGE_MAPPING)
-        data = data.dropna(subset=['Classe dAge'])
-        
-        for c in found:
-            data[f"Taux {c} (%)"] = (data[c] / data['Population'] * 100).clip(upper=100)
-        return data.replace([np.inf, np.nan], 0), found
+        return get_dataset().current(needs)
+    except FileNotFoundError as e:
+        missing = e.filename or get_registry().missing('dep_age')
+        st.error(f"Fichier introuvable : `{missing}`. Le dossier 'data' est-il bien sur GitHub ?")
     except Exception as e:
-        st.error(f"Erreur Load Data: {e}"); return None, []
+        st.error(f"Erreur Load Data: {e}")
+    return None
 
-@st.cache_data
-def load_sex_data(filepath):
-    if not os.path.exists(filepath): return None
-    try:
-        data = pd.read_csv(filepath, delimiter=';', dtype={'dep': str})
-        data.columns = data.columns.str.lower()
-        if 'jour' in data.columns: data = data[data['jour'] == data['jour'].max()]
-        if 'sexe' not in data.columns: return None
-        data['sexe'] = data['sexe'].astype(str).str.replace('.0', '', regex=False)
-        data = data[data['sexe'].isin(['1', '2'])]
-        data['sexe'] = data['sexe'].map({'1': 'Homme', '2': 'Femme'})
-        
-        # --- MAPPING COMPLET ET CORRIGÉ ---
-        map_c = {
-            'Dose 1': ['n_tot_dose1'], 
-            'Dose 2': ['n_tot_dose2', 'n_tot_complet'], 
-            'Rappel 1': ['n_tot_rappel'], 
-            'Rappel 2': ['n_tot_2_rappel'],
-            'Rappel 3': ['n_tot_3_rappel'],
-            'Rappel Bivalent': ['n_tot_rappel_biv']
-        }
-        map_r = {
-            'Dose 1': ['couv_tot_dose1'], 
-            'Dose 2': ['couv_tot_complet'], 
-            'Rappel 1': ['couv_tot_rappel'], 
-            'Rappel 2': ['couv_tot_2_rappel'],
-            'Rappel 3': ['couv_tot_3_rappel'], 
-            'Rappel Bivalent': ['couv_tot_rappel_biv']
-        }
-        
-        cols, rename = ['dep', 'sexe'], {'dep': 'Departement', 'sexe': 'Sexe'}
-        found_c, found_r = {}, {}
-        for n, o in map_c.items():
-            c = next((k for k in data.columns if k in o), None)
-            if c: cols.append(c); rename[c] = n; found_c[n] = n
-        for n, o in map_r.items():
-            c = next((k for k in data.columns if k in o), None)
-            if c: cols.append(c); rename[c] = f"Taux {n} (%)"; found_r[n] = f"Taux {n} (%)"
-                
-        data = data[cols].rename(columns=rename)
-        data['Departement'] = data['Departement'].apply(fix_dep_code)
-        if 'Dose 1' in found_c and 'Dose 1' in found_r:
-            data['Population'] = np.where(data[found_r['Dose 1']] > 0, (data['Dose 1'] / data[found_r['Dose 1']]) * 100, 0).round().astype(int)
-        else: data['Population'] = 1
-        return data.replace([np.inf, np.nan], 0)
-    except: return None
+# ==============================================================================
+# 5. Specs des graphiques (cache LRU partagé)
+# ==============================================================================
+@st.cache_resource
+def get_spec_cache():
+    """Cache des specs sérialisées, commun à toutes les sessions du processus."""
+    from vacsi.charts import SpecCache
+    return trace.register_cache("specs", SpecCache(maxsize=SPEC_CACHE_SIZE))
+
+def _arrow_ready(spec):
+    """Sérialise une fois les jeux de données tabulaires en Arrow, le format que Streamlit transmet au navigateur."""
+    import pyarrow as pa
+    datasets = {}
+    for name, rows in spec.get('datasets', {}).items():
+        if rows and isinstance(rows[0], dict) and rows[0].get('type') == 'Feature':
+            datasets[name] = rows  # GeoJSON : laissé tel quel dans la spec
+            continue
+        table, sink = pa.Table.from_pylist(rows), pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as w: w.write_table(table)
+        datasets[name] = sink.getvalue().to_pybytes()
+    return {**spec, 'datasets': datasets} if datasets else spec
+
+def _cached_specs(key, dark, build):
+    from vacsi.charts import to_spec
+    return get_spec_cache().get(key, lambda: tuple(_arrow_ready(to_spec(c, dark)) for c in build()))
+
+def metric_options(lang):
+    return ["Taux (%)", "Total"] if lang == 'Français' else ["Rate (%)", "Total"]
+
+@trace.traced("specs")
+def geo_specs(cube, dose, metric, lang, dark, zoom=GEO_REGIONS):
+    """``zoom`` : GEO_ZONES, GEO_REGIONS, GEO_DEPARTMENTS ou code d'une région à explorer."""
+    col_target = f"Taux {dose} (%)" if "Taux" in metric or "Rate" in metric else dose
+    level = GEO_LEVELS.get(zoom, 'Departement')
+    region = None if zoom in GEO_LEVELS else zoom
+    from vacsi.charts import geo_charts
+    from vacsi.geo import load_geometry
+    return _cached_specs(('geo', cube.version, dose, metric, zoom, lang, dark), dark,
+                         lambda: geo_charts(cube, load_geometry(), dose, col_target, TRANSLATIONS[lang], dark, level, region))
+
+@trace.traced("specs")
+def demo_age_specs(cube, dose, lang, dark):
+    from vacsi.charts import demo_age_charts
+    return _cached_specs(('demo_age', cube.version, dose, None, lang, dark), dark,
+                         lambda: demo_age_charts(cube, dose, TRANSLATIONS[lang], dark))
+
+@trace.traced("specs")
+def demo_sex_specs(cube, dose, lang, dark):
+    from vacsi.charts import demo_sex_charts
+    return _cached_specs(('demo_sex', cube.version, cube.sex_version, dose, None, lang, dark), dark,
+                         lambda: demo_sex_charts(cube, dose, TRANSLATIONS[lang], dark))
+
+@st.cache_resource
+def get_lod_cache():
+    """Niveaux de détail des séries déjà tracées, communs à toutes les sessions."""
+    from vacsi.charts import SpecCache
+    return trace.register_cache("lod", SpecCache(maxsize=LOD_CACHE_SIZE))
+
+def series_lod(hist, version, key, col):
+    """Niveaux de détail d'une série, calculés une fois par version des données."""
+    from vacsi.lod import SeriesLOD
+    def build():
+        serie = hist.series(key)
+        return SeriesLOD(serie['jour'].to_numpy(), serie[col].to_numpy())
+    return get_lod_cache().get((version, key, col), build)
+
+@trace.traced("specs")
+def evolution_specs(hist, version, dep, age, dose, start, end, lang, dark, width=EVOL_WIDTH_PX):
+    """Courbe sous-échantillonnée : niveau choisi selon la période et la largeur."""
+    from vacsi.charts import evolution_chart
+    col_taux = f"Taux {dose} (%)"
+    def build():
+        pos = series_lod(hist, version, (dep, age), col_taux).pick(start, end, width)
+        serie = hist.series((dep, age)).iloc[pos][['jour', dose, col_taux]]
+        return [evolution_chart(serie, dep, age, dose, TRANSLATIONS[lang], dark)]
+    return _cached_specs(('evol', version, dep, age, dose, start, end, width, lang, dark), dark, build)
+
+@st.cache_resource
+def prewarm_specs(_cube, version):
+    """Construit d'avance toutes les specs (pages × indicateurs × langues × thèmes)."""
+    for lang in TRANSLATIONS:
+        for dark in (True, False):
+            for dose in _cube.doses:
+                for metric in metric_options(lang):
+                    for zoom in GEO_LEVELS: geo_specs(_cube, dose, metric, lang, dark, zoom)
+                demo_age_specs(_cube, dose, lang, dark)
+                if dose in _cube.sex_doses: demo_sex_specs(_cube, dose, lang, dark)
+    return len(get_spec_cache())
+
+def _payload_bytes(spec):
+    """Taille approximative envoyée au navigateur : spec JSON + jeux de données Arrow."""
+    datasets = spec.get('datasets', {})
+    binary = sum(len(v) for v in datasets.values() if isinstance(v, bytes))
+    rest = {**spec, 'datasets': {k: v for k, v in datasets.items() if not isinstance(v, bytes)}}
+    return binary + len(json.dumps(rest, separators=(',', ':'), default=str))
+
+@trace.traced("render")
+def render_spec(spec):
+    if trace.detailed(): trace.add_bytes(_payload_bytes(spec))
+    st.vega_lite_chart(spec, use_container_width=True)
 
 # ==============================================================================
-# 5. Vues
+# 6. Vues
 # ==============================================================================
-def page_introduction(df_dep, dict_fra, cols, lang):
+def quality_table(report, t):
+    """Rapport qualité de l'instantané, libellés traduits, contrôles sans anomalie en dernier."""
+    df = report.assign(fichier=report['fichier'].map(t['dq_files']), check=report['check'].map(t['dq_checks']))
+    if 'part' in df.columns: df['part'] = (df['part'] * 100).round(3)
+    if 'lignes' in df.columns: df = df.sort_values('lignes', ascending=False, kind='stable', na_position='first')
+    return df.rename(columns=t['dq_columns'])
+
+@trace.traced()
+def page_introduction(df_dep, dict_fra, cols, lang, quality=None):
     t = TRANSLATIONS[lang]
     st.markdown(f"<h1 class='hero-title'>{t['intro_title']}</h1>", unsafe_allow_html=True)
     st.markdown(f"<p class='hero-subtitle'>{t['intro_subtitle']}</p>", unsafe_allow_html=True)
@@ -379,58 +289,54 @@ def page_introduction(df_dep, dict_fra, cols, lang):
         st.info(t['intro_data_text'])
         # cols est ici bien la liste de données
         st.markdown(f"**Variables:** {', '.join(cols)}")
-    with t3: st.warning(t['dq_limitations']); st.markdown(t['dq_source']); st.markdown(t['dq_license'])
+    with t3:
+        st.warning(t['dq_limitations']); st.markdown(t['dq_source']); st.markdown(t['dq_license'])
+        if quality is not None and not quality.empty:
+            st.subheader(t['dq_checks_title'])
+            st.caption(t['dq_checks_caption'])
+            st.dataframe(quality_table(quality, t), use_container_width=True, hide_index=True)
 
-def page_geo(df, cols, lang):
+@trace.traced()
+def page_geo(cube, cols, lang):
     t = TRANSLATIONS[lang]
     st.title(t['geo_title'])
     dark = st.session_state.get('dark', True)
-    chart_bg = '#0E1117' if dark else '#ffffff'
     
     with st.container(): st.info(t['geo_insight']); st.success(t['geo_implication'])
     st.markdown(t['geo_desc'])
     
     c1, c2 = st.columns([1, 2])
     with c1: dose = st.radio(t['geo_choose_dose'], cols)
-    with c2: metric = st.radio("Métrique", ["Taux (%)", "Total"] if lang=='Français' else ["Rate (%)", "Total"])
-    col_target = f"Taux {dose} (%)" if "Taux" in metric or "Rate" in metric else dose
-    
-    df_viz = df[df['Classe dAge'] == 'Tous âges'].copy()
-    if df_viz.empty: st.error("Mapping 'Tous âges' vide."); return
-    
-    scheme = 'tealblues' if 'Rappel' in dose else 'yelloworangered'
-    color_bar = COLORS['dose_booster'] if 'Rappel' in dose else COLORS['dose_primary']
-    
-    geo = alt.Data(url=URL_GEOJSON, format=alt.DataFormat(property='features', type='json'))
-    sel = alt.selection_point(fields=['properties.nom'], on='mouseover', empty='none')
-    
-    map_c = alt.Chart(geo).mark_geoshape(stroke='white', strokeWidth=0.5).encode(
-        color=alt.Color(f'{col_target}:Q', scale=alt.Scale(scheme=scheme), legend=alt.Legend(title=t['axis_rate'])),
-        opacity=alt.condition(sel, alt.value(1), alt.value(0.7)),
-        tooltip=['properties.nom:N', alt.Tooltip(f'{col_target}:Q', format=',.1f')]
-    ).transform_lookup(lookup='properties.code', from_=alt.LookupData(df_viz, 'Departement', [col_target])).add_params(sel).properties(width=600, height=500, background=chart_bg).project(type='identity', reflectY=True)
+    with c2: metric = st.radio("Métrique", metric_options(lang))
     
-    bar_c = alt.Chart(df_viz).mark_bar().encode(
-        x=alt.X(col_target, title=""), y=alt.Y('Departement', sort='-x'),
-        color=alt.condition(alt.datum[col_target] >= df_viz[col_target].mean(), alt.value(color_bar), alt.value('#BDC3C7')),
-        tooltip=[col_target]
-    ).transform_window(rank='rank()', sort=[alt.SortField(col_target, order='descending')]).transform_filter(alt.datum.rank <= 20).properties(height=500, title=f"Top 20 ({dose})", background=chart_bg)
+    # Exploration : métropole / outre-mer, vue par région, une région dépliée (métropole d'abord) ou tous les départements
+    from vacsi.regions import METRO, REGION_NAMES, REGION_ZONE
+    regions = sorted(cube.by_region['Region'], key=lambda r: REGION_ZONE.get(r) != METRO)
+    zooms = [GEO_ZONES, GEO_REGIONS, *regions, GEO_DEPARTMENTS]
+    labels = {GEO_ZONES: t['geo_all_zones'], GEO_REGIONS: t['geo_all_regions'], GEO_DEPARTMENTS: t['geo_all_deps'], **REGION_NAMES}
+    zoom = st.selectbox(t['geo_zoom'], zooms, index=zooms.index(GEO_REGIONS), format_func=labels.get, key="geo_zoom")
     
-    if not dark:
-        map_c = map_c.configure_legend(labelColor='#333', titleColor='#333')
-        bar_c = bar_c.configure_axis(labelColor='#333', titleColor='#333').configure_title(color='#333')
+    if cube.by_dep.empty: st.error("Mapping 'Tous âges' vide."); return
+    map_c, bar_c = geo_specs(cube, dose, metric, lang, dark, zoom)
     
     c_a, c_b = st.columns([1.5, 1])
-    with c_a: st.altair_chart(map_c, use_container_width=True)
-    with c_b: st.altair_chart(bar_c, use_container_width=True)
+    with c_a: render_spec(map_c)
+    with c_b: render_spec(bar_c)
 
-def page_demo(df_age, df_sex, cols, lang):
+    # Où se situe mon département ? Lecture directe de l'index de classement du cube
+    st.subheader(t['geo_my_rank'])
+    code = st.selectbox(t['geo_my_dep'], cube.dep_rank.codes, key="geo_my_dep")
+    with trace.stage("rank_lookup"):
+        prof = cube.dep_rank.profile(code, [f"Taux {d} (%)" for d in cols])
+        prof['Rang'] = prof['Rang'].astype(str) + " / " + prof['Sur'].astype(str)
+    st.dataframe(prof.drop(columns='Sur').round({'Valeur': 1, 'Centile': 0}), use_container_width=True, hide_index=True)
+
+@trace.traced()
+def page_demo(cube, cols, lang):
     t = TRANSLATIONS[lang]
     st.title(t['demo_title'])
     st.markdown(t['demo_desc'])
     dark = st.session_state.get('dark', True)
-    chart_bg = '#0E1117' if dark else '#ffffff'
-    txt_col = 'white' if dark else 'black'
     
     mode = st.radio(t['demo_type_label'], [t['demo_type_age'], t['demo_type_sex']], horizontal=True)
     st.markdown("---")
@@ -440,85 +346,119 @@ def page_demo(df_age, df_sex, cols, lang):
         else: st.info(t['demo_insight_sex'])
             
     dose = st.radio(t['demo_choose_dose'], cols, horizontal=True, key="d")
-    col_taux = f"Taux {dose} (%)"
-    color = COLORS['dose_booster'] if 'Rappel' in dose else COLORS['dose_primary']
     
     if mode == t['demo_type_age']:
-        df = df_age[df_age['Classe dAge'] != 'Tous âges'].copy()
-        sort_order = [age for age in AGE_ORDER if age in df['Classe dAge'].unique()]
-        
+        chart_comb, final_chart = demo_age_specs(cube, dose, lang, dark)
         st.subheader(t['prop_title'])
-        agg = df.groupby('Classe dAge')[[dose, 'Population']].sum().reset_index()
-        agg['V'] = agg[dose]; agg['NV'] = (agg['Population'] - agg['V']).clip(lower=0)
-        melt = agg.melt('Classe dAge', ['V', 'NV'], 'S', 'C')
-        melt['L'] = melt['S'].map({'V': t['prop_vaccinated'], 'NV': t['prop_non_vaccinated']})
-        melt['P'] = melt['C'] / melt.groupby('Classe dAge')['C'].transform('sum')
-        
-        base = alt.Chart(melt).encode(x=alt.X('Classe dAge', sort=sort_order), y=alt.Y('C', stack="normalize", axis=alt.Axis(format='%')), order=alt.Order('S', sort='descending'))
-        bars = base.mark_bar().encode(color=alt.Color('L', scale=alt.Scale(range=[color, COLORS['gray_neutral']]), legend=alt.Legend(title="Statut")))
-        text = base.mark_text(dy=10, color=txt_col).encode(text=alt.Text('P', format='.0%'), opacity=alt.condition(alt.datum.P > 0.05, alt.value(1), alt.value(0)))
-        chart_comb = (bars + text).properties(height=350, background=chart_bg).interactive()
-        if not dark: chart_comb = chart_comb.configure_axis(labelColor='#333', titleColor='#333').configure_legend(labelColor='#333', titleColor='#333')
-        st.altair_chart(chart_comb, use_container_width=True)
+        render_spec(chart_comb)
         
         st.subheader(t['demo_boxplot_title'])
         st.caption(t['demo_boxplot_text'])
-        nat = df.groupby('Classe dAge')[[dose, 'Population']].sum().reset_index()
-        nat['R'] = (nat[dose] / nat['Population'] * 100).clip(upper=100)
-        
-        # FIX ALTAIR LAYER : Properties a la fin
-        box = alt.Chart(df).mark_boxplot(extent='min-max', color=color).encode(x=alt.X('Classe dAge', sort=sort_order), y=alt.Y(col_taux))
-        tick = alt.Chart(nat).mark_tick(color=COLORS['avg_line'], thickness=3, size=40).encode(x=alt.X('Classe dAge', sort=sort_order), y='R')
-        
-        final_chart = (box + tick).properties(background=chart_bg)
-        if not dark: final_chart = final_chart.configure_axis(labelColor='#333', titleColor='#333')
-        st.altair_chart(final_chart, use_container_width=True)
+        render_spec(final_chart)
         
     elif mode == t['demo_type_sex']:
-        if df_sex is None: st.error("Données Sexe non disponibles"); return
+        if cube.sex is None: st.error("Données Sexe non disponibles"); return
         
         # FIX KEYERROR : Verification si la colonne existe
-        if dose not in df_sex.columns:
+        if dose not in cube.sex_doses:
             st.warning(f"⚠️ Données non disponibles pour '{dose}' dans le fichier par sexe.")
             return
 
-        nat = df_sex.groupby('Sexe')[[dose, 'Population']].sum().reset_index()
-        nat['R'] = (nat[dose] / nat['Population'] * 100).clip(upper=100)
-        bar = alt.Chart(nat).mark_bar().encode(
-            x=alt.X('Sexe', title=t['axis_sex']), y=alt.Y('R', title=t['axis_rate']),
-            color=alt.Color('Sexe', scale=alt.Scale(range=[COLORS['male'], COLORS['female']])),
-            tooltip=['Sexe', alt.Tooltip('R', format='.1f')]
-        ).properties(height=300, background=chart_bg)
-        
-        if not dark:
-            bar = bar.configure_axis(labelColor='#333', titleColor='#333').configure_legend(labelColor='#333', titleColor='#333')
-        
+        bar, final_chart = demo_sex_specs(cube, dose, lang, dark)
         c1, c2 = st.columns([1, 2])
-        with c1: st.altair_chart(bar, use_container_width=True)
+        with c1: render_spec(bar)
         with c2:
             st.markdown(f"#### {t['demo_boxplot_title']}")
-            base = alt.Chart(df_sex).encode(x='Sexe')
-            box = base.mark_boxplot(extent='min-max', color=color).encode(y=alt.Y(col_taux, title=t['axis_rate']))
-            sel = base.mark_bar(opacity=0).encode(
-                y=alt.Y(col_taux, aggregate='max'), y2=alt.value(0),
-                tooltip=[
-                    alt.Tooltip('Sexe', title=t['axis_sex']),
-                    alt.Tooltip(col_taux, aggregate='max', title=t['tooltip_max']),
-                    alt.Tooltip(col_taux, aggregate='min', title=t['tooltip_min']),
-                    alt.Tooltip(col_taux, aggregate='median', title=t['tooltip_med'])
-                ]
-            )
-            # FIX ALTAIR LAYER
-            final_chart = (box + sel).properties(background=chart_bg)
-            if not dark: final_chart = final_chart.configure_axis(labelColor='#333', titleColor='#333')
-            st.altair_chart(final_chart, use_container_width=True)
+            render_spec(final_chart)
+    st.caption(t['cap_note'])
+
+@trace.traced()
+def page_evolution(hist, version, cols, lang):
+    t = TRANSLATIONS[lang]
+    st.title(t['evol_title'])
+    st.markdown(t['evol_desc'])
+    dark = st.session_state.get('dark', True)
+    
+    deps = hist.key_values('Departement')
+    from vacsi.ingest import AGE_ORDER
+    ages = [age for age in AGE_ORDER if age in hist.key_values('Classe dAge')]
+    c1, c2, c3 = st.columns(3)
+    with c1: dep = st.selectbox(t['evol_dep'], deps)
+    with c2: age = st.selectbox(t['evol_age'], ages)
+    with c3: dose = st.selectbox(t['geo_choose_dose'], cols)
+    
+    if hist.first_day is None: st.error("Aucune date disponible."); return
+    first, last = hist.first_day.date(), hist.last_day.date()
+    if first < last: start, end = st.slider(t['evol_period'], first, last, (first, last))
+    else: start, end = first, last; st.info(t['evol_single_day'])
+    
+    # Tranche (département, âge), puis niveau de détail adapté à la période affichée
+    for spec in evolution_specs(hist, version, dep, age, dose, start, end, lang, dark): render_spec(spec)
     st.caption(t['cap_note'])
 
 # ==============================================================================
-# 6. MAIN
+# 7. MAIN
 # ==============================================================================
+def admin_allowed():
+    """Panneau admin : activé pour le processus, ou jeton secret dans l'URL (comparé à temps constant)."""
+    if ADMIN: return True
+    given = st.query_params.get("admin")
+    return bool(ADMIN_TOKEN and given) and hmac.compare_digest(given.encode(), ADMIN_TOKEN.encode())
+
+
+def admin_panel(tr):
+    """Mesures du rendu qui vient de se terminer (panneau de la barre latérale)."""
+    import pandas as pd
+    from vacsi.ingest import memory_report
+    from vacsi.reconcile import EXCESS_TOLERANCE, TOLERANCE, drift_summary
+    with st.sidebar.expander("⏱️ Instrumentation"):
+        if not TRACE_DETAIL: st.caption("Mémoire et octets : VACSI_TRACE_DETAIL=1 au lancement.")
+        df = pd.DataFrame(tr.stages)
+        if df.empty: st.caption("Aucune étape mesurée."); return
+        df = df.groupby('stage', sort=False).agg(
+            ms=('seconds', lambda x: x.sum() * 1000), appels=('seconds', 'size'),
+            pic_mo=('peak_bytes', lambda x: x.max() / 2**20 if x.notna().any() else None),
+            octets=('payload_bytes', lambda x: x.sum() if x.notna().any() else None))
+        st.metric("Rendu", f"{tr.total_seconds * 1000:.0f} ms")
+        st.dataframe(df.round(2), use_container_width=True)
+        caches = trace.REGISTRY.cache_stats()
+        if caches:
+            st.caption("Caches partagés (succès / échecs depuis le démarrage)")
+            st.dataframe(pd.DataFrame.from_dict(caches, orient='index').assign(hit_rate=lambda d: (d['hit_rate'] * 100).round(1))
+                         .rename(columns={'hits': 'succès', 'misses': 'échecs', 'size': 'entrées', 'maxsize': 'capacité',
+                                          'hit_rate': 'succès %'}), use_container_width=True)
+        st.download_button("Métriques Prometheus", trace.prometheus_text(), "vacsi.prom", "text/plain")
+
+        # Jeu de données partagé : version publiée et mémoire (une copie par réplique)
+        dataset = get_dataset()
+        snap = dataset.current()
+        st.caption(f"Données : version {snap.version} ({len(dataset.history)} publication(s))")
+        if st.button("Recharger les données"):
+            st.toast("Nouvelle version publiée." if dataset.refresh() else "Sources inchangées.")
+        refresher = get_refresher()
+        if refresher.running:
+            st.caption(f"Surveillance de data/ toutes les {refresher.interval:g} s : {refresher.checks} relevé(s), "
+                       f"{refresher.refreshes} publication(s), {refresher.errors} erreur(s)")
+        if refresher.last_error: st.warning(f"Dernier rafraîchissement en échec : {refresher.last_error[0]}")
+        if dataset.rejected: st.warning(f"Version {dataset.rejected['version']} rejetée : {' ; '.join(dataset.rejected['problems'])}")
+        mem = memory_report({
+            "historique âge": snap.dep.frame, "historique sexe": None if snap.sex is None else snap.sex.frame,
+            "dernier jour âge": snap.dep_latest, "dernier jour sexe": snap.sex_latest,
+        })
+        st.dataframe(mem.groupby('frame', sort=False).agg(lignes=('rows', 'first'), mo=('bytes', lambda x: x.sum() / 2**20)).round(2),
+                     use_container_width=True)
+
+        # Rapprochement départements / national (calculé une fois par version)
+        if snap.reconciliation is not None:
+            drift = drift_summary(snap.reconciliation)
+            st.caption(f"Rapprochement national : {len(drift)} écart(s) (déficit > {TOLERANCE:.0%}, excédent > {EXCESS_TOLERANCE:.0%})")
+            st.dataframe((drift if not drift.empty else snap.reconciliation)
+                         .assign(ecart_relatif=lambda d: (d['ecart_relatif'] * 100).round(2)),
+                         use_container_width=True, hide_index=True)
+
 def main():
-    with st.sidebar:
+    # Barre latérale : premier affichage, avant tout chargement de données
+    with trace.stage("sidebar"), st.sidebar:
         st.header("Paramètres")
         lang_select = st.radio("Langue", ["Français", "English"], key="lang")
         dark_mode = st.toggle("Mode Nuit", value=True, key="dark")
@@ -527,8 +467,9 @@ def main():
         st.markdown("<hr class='sidebar-min-sep'>", unsafe_allow_html=True)
         st.markdown("<div class='sidebar-min-title'>Navigation</div>", unsafe_allow_html=True)
         t_temp = TRANSLATIONS[lang_select]
-        menu_options = [t_temp['nav_intro'], t_temp['nav_geo'], t_temp['nav_demo']]
+        menu_options = [t_temp[k] for k in PAGE_DATASETS]
         page = st.radio("Menu", menu_options, label_visibility="collapsed")
+        page_key = list(PAGE_DATASETS)[menu_options.index(page)]
         
         st.divider()
         st.markdown(f"""
@@ -540,21 +481,24 @@ def main():
         </div>
         """, unsafe_allow_html=True)
 
-    data_dep, cols = load_dep_data(FILES['dep_age'])
-    data_sex = load_sex_data(FILES['dep_sex'])
-    fra = {}
-    if data_dep is not None:
-        d = data_dep[data_dep['Classe dAge'] == 'Tous âges']
-        fra = {c: d[c].sum() for c in cols if c in d.columns}
-
-    if data_dep is None: st.stop()
+    # Un seul instantané pour tout le rendu : jamais de mélange de versions
+    with trace.stage("load_data"): snap = load_data(PAGE_DATASETS[page_key])
+    if snap is None: st.stop()
+    get_refresher()  # Démarre la surveillance de data/ au premier rendu
+    data_dep, cube, cols = snap.dep_latest, snap.cube, snap.measures
+    if PREWARM_SPECS:
+        with trace.stage("prewarm"):
+            full = load_data(tuple(k for needs in PAGE_DATASETS.values() for k in needs))
+            if full is not None: prewarm_specs(full.cube, full.version)
     t = TRANSLATIONS[st.session_state.lang]
 
-    if page == t['nav_intro']: page_introduction(data_dep, fra, cols, st.session_state.lang)
-    elif page == t['nav_geo']: page_geo(data_dep, cols, st.session_state.lang)
-    elif page == t['nav_demo']: page_demo(data_dep, data_sex, cols, st.session_state.lang)
+    if page == t['nav_intro']: page_introduction(data_dep, snap.kpis, cols, st.session_state.lang, snap.quality_report())
+    elif page == t['nav_geo']: page_geo(cube, cols, st.session_state.lang)
+    elif page == t['nav_demo']: page_demo(cube, cols, st.session_state.lang)
+    elif page == t['nav_evol']: page_evolution(snap.dep, cube.version, cols, st.session_state.lang)
 
 if __name__ == "__main__":
     if 'lang' not in st.session_state: st.session_state.lang = 'Français'
     if 'dark' not in st.session_state: st.session_state.dark = True
-    main()
\ No newline at end of file
+    with trace.rerun(detailed=TRACE_DETAIL) as tr: main()
+    if admin_allowed(): admin_panel(tr)
\ No newline at end of file
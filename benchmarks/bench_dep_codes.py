@@ -0,0 +1,57 @@
+"""Benchmark : normalisation des codes départementaux.
+
+Compare l'ancien ``Series.apply(fix_dep_code)`` (un appel Python par ligne)
+à ``normalize_dep_codes`` (normalisation des seules valeurs distinctes).
+
+Usage : python benchmarks/bench_dep_codes.py [--rows 1000000] [--repeat 3]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from vacsi.ingest import DEP_CODES, fix_dep_code, normalize_dep_codes  # noqa: E402
+
+
+def make_codes(rows, seed=0):
+    """Codes tels qu'ils arrivent du CSV : quelques codes non paddés ('1') et espaces."""
+    rng = np.random.default_rng(seed)
+    pool = np.array(DEP_CODES + ['1', '2', ' 75', '9'], dtype=object)
+    return pd.Series(pool[rng.integers(0, len(pool), rows)])
+
+
+def best_of(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        t = time.perf_counter(); fn(); best = min(best, time.perf_counter() - t)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    codes = make_codes(args.rows)
+    expected = codes.apply(fix_dep_code)
+    assert (np.asarray(normalize_dep_codes(codes), dtype=object) == expected.to_numpy()).all()
+
+    t_apply = best_of(lambda: codes.apply(fix_dep_code), args.repeat)
+    t_vec = best_of(lambda: normalize_dep_codes(codes), args.repeat)
+    as_cat = codes.astype('category')
+    t_cat = best_of(lambda: normalize_dep_codes(as_cat), args.repeat)
+
+    print(f"{args.rows:,} lignes (meilleur de {args.repeat})")
+    print(f"  apply(fix_dep_code)              : {t_apply * 1000:8.1f} ms")
+    print(f"  normalize_dep_codes (objet)      : {t_vec * 1000:8.1f} ms  (x{t_apply / t_vec:.1f})")
+    print(f"  normalize_dep_codes (catégoriel) : {t_cat * 1000:8.1f} ms  (x{t_apply / t_cat:.1f})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,133 @@
+"""Vérification : les lecteurs ne voient jamais un jeu de données à moitié remplacé.
+
+Plusieurs fils lisent en boucle l'instantané courant de ``SharedDataset``
+pendant qu'un autre remplace alternativement le fichier source par deux
+versions différentes (A, puis B avec des effectifs divisés par deux) et
+appelle ``refresh()``. Chaque lecture vérifie que toutes les pièces de
+l'instantané viennent de la même version :
+
+* version du cube = version de l'instantané ;
+* total national du cube = somme du tableau « dernier jour » = total attendu
+  pour cette version (A ou B) ;
+* historique, dernier jour et cube décrivent le même nombre de départements.
+
+Vérifie aussi que les tableaux partagés refusent l'écriture.
+
+Usage : python benchmarks/check_dataset_swap.py [--seconds 10] [--readers 8]
+Code de sortie non nul en cas d'incohérence.
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+TMP = tempfile.mkdtemp(prefix="vacsi-swap-")
+os.environ["VACSI_CACHE_DIR"] = os.path.join(TMP, "cache")  # Avant l'import de vacsi.cache
+
+from vacsi.dataset import SharedDataset  # noqa: E402
+from vacsi.cube import ALL_AGES  # noqa: E402
+from vacsi.registry import DatasetRegistry  # noqa: E402
+
+SOURCE = DatasetRegistry(os.path.join(ROOT, "data")).newest('dep_age')
+
+
+def make_variants():
+    """Deux versions du fichier âge : l'original et une copie aux effectifs divisés par deux."""
+    a, b = os.path.join(TMP, "a.csv"), os.path.join(TMP, "b.csv")
+    shutil.copy(SOURCE, a)
+    df = pd.read_csv(SOURCE, delimiter=';', dtype={'dep': str, 'clage_vacsi': str})
+    for c in df.columns:
+        if c.startswith('n_'): df[c] = df[c] // 2
+    df.to_csv(b, sep=';', index=False)
+    return a, b
+
+
+def national(path):
+    df = pd.read_csv(path, delimiter=';', dtype={'dep': str, 'clage_vacsi': str})
+    return int(df.loc[df['clage_vacsi'].astype(int) == 0, 'n_tot_dose1'].sum())
+
+
+def check(snap, expected):
+    """Liste des incohérences de l'instantané (vide si tout vient de la même version)."""
+    errors = []
+    if snap.cube.version != snap.part_version('dep_age'): errors.append("version du cube")
+    frame_total = int(snap.dep_latest.loc[snap.dep_latest['Classe dAge'] == ALL_AGES, 'Dose 1'].sum())
+    cube_total = int(snap.cube.national['Dose 1'])
+    if frame_total != cube_total: errors.append(f"cube {cube_total} != dernier jour {frame_total}")
+    if cube_total not in expected: errors.append(f"total {cube_total} inconnu")
+    if len(snap.cube.by_dep) != len(snap.dep.key_values('Departement')): errors.append("départements")
+    return errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--readers', type=int, default=8)
+    args = parser.parse_args()
+
+    a, b = make_variants()
+    expected = {national(a), national(b)}
+    live = os.path.join(TMP, "vacsi-tot-a-dep-live.csv")
+    shutil.copy(a, live)
+    dataset = SharedDataset({'dep_age': live})
+    snap = dataset.current()
+
+    # Les tableaux partagés sont en lecture seule : derniers jours et historiques fraîchement lus
+    writes = {
+        'dernier jour': lambda: snap.dep_latest['Dose 1'].to_numpy().__setitem__(0, 0),
+        'historique': lambda: snap.dep.frame['Dose 1'].to_numpy().__setitem__(0, 0),
+        'historique (jour)': lambda: snap.dep.frame['jour'].to_numpy().__setitem__(0, snap.dep.days[0]),
+        'historique (catégorie)': lambda: snap.dep.frame['Departement'].array.__setitem__(0, '75'),
+        'jours': lambda: snap.dep.days.__setitem__(0, snap.dep.days[-1]),
+    }
+    for name, write in writes.items():
+        try:
+            write()
+            print(f"ÉCHEC : écriture acceptée dans un tableau partagé ({name})"); return 1
+        except ValueError:
+            pass
+
+    stop, failures, reads, seen = threading.Event(), [], [0] * args.readers, set()
+
+    def reader(i):
+        while not stop.is_set():
+            snap = dataset.current()
+            errs = check(snap, expected)
+            if errs: failures.append((snap.version, errs))
+            seen.add(snap.version)
+            reads[i] += 1
+
+    def writer():
+        n = 0
+        while not stop.is_set():
+            src = b if n % 2 == 0 else a
+            tmp = f"{live}.tmp"
+            shutil.copy(src, tmp); os.replace(tmp, live)
+            dataset.refresh()
+            n += 1
+        return n
+
+    threads = [threading.Thread(target=reader, args=(i,)) for i in range(args.readers)]
+    w = threading.Thread(target=writer)
+    for t in threads + [w]: t.start()
+    time.sleep(args.seconds)
+    stop.set()
+    for t in threads + [w]: t.join()
+    shutil.rmtree(TMP, ignore_errors=True)
+
+    print(f"{sum(reads):,} lectures par {args.readers} fils, {len(dataset.history)} publications, "
+          f"{len(seen)} versions vues, {len(failures)} incohérence(s)")
+    for version, errs in failures[:10]: print(f"  {version}: {'; '.join(errs)}")
+    return 1 if failures or len(seen) < 2 else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
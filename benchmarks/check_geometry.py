@@ -0,0 +1,120 @@
+"""Vérification du chemin de la carte locale (``vacsi.geo.GeometryStore``).
+
+Utilise ``data/departements.geojson`` s'il a été récupéré (``python -m
+vacsi.geo fetch``), sinon le fond schématique de ``benchmarks/schematic.py``
+(sans réseau), et le fait passer par le même chemin que la page géographique,
+sur les données réelles :
+
+* A : chaque département métropolitain du cube a une géométrie, à chaque
+  niveau de détail (anneaux fermés, au moins 4 points, anneau extérieur en
+  sens horaire comme l'attend d3-geo) ;
+* B : ``join`` donne une feature par département avec sa valeur ;
+* C : ``grouped`` fusionne les départements en une feature par région
+  métropolitaine, avec le nom de la région et sa valeur ;
+* D : ``geo_charts`` produit des specs autonomes (valeurs intégrées, aucune
+  URL externe) pour la France, les régions et l'exploration d'une région ;
+* E : un fond marqué ``schematic`` déposé dans ``data/`` n'est pas servi
+  (``load_geometry`` renvoie ``None``, la carte garde les contours réels).
+
+Usage : python benchmarks/check_geometry.py
+Code de sortie non nul en cas d'écart.
+"""
+
+import json
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.schematic import schematic_collection  # noqa: E402
+from vacsi.charts import MAP_LEVEL, MAP_LEVEL_REGIONS, geo_charts, to_spec  # noqa: E402
+from vacsi.cube import rate_col  # noqa: E402
+from vacsi.dataset import SharedDataset  # noqa: E402
+from vacsi.geo import GEO_FILE, LEVELS, GeometryStore, load_geometry  # noqa: E402
+from vacsi.i18n import TRANSLATIONS  # noqa: E402
+from vacsi.registry import DatasetRegistry  # noqa: E402
+from vacsi.regions import DEP_REGION, REGION_NAMES, region_departments  # noqa: E402
+
+# Outre-mer : absent du fond simplifié (comme du GeoJSON officiel simplifié)
+OVERSEAS = ('971', '972', '973', '974', '976', '977', '978')
+
+
+def signed_area(ring):
+    return sum(a[0] * b[1] - b[0] * a[1] for a, b in zip(ring, ring[1:])) / 2
+
+
+def ring_problems(geoms):
+    out = []
+    for code, geom in geoms.items():
+        if not geom['coordinates']: out.append(f"{code} : géométrie vide")
+        for poly in geom['coordinates']:
+            for i, ring in enumerate(poly):
+                if len(ring) < 4 or ring[0] != ring[-1]: out.append(f"{code} : anneau ouvert ou trop court")
+                elif i == 0 and signed_area(ring) > 0: out.append(f"{code} : anneau extérieur en sens antihoraire")
+    return out
+
+
+def main():
+    store = load_geometry(os.path.join(ROOT, GEO_FILE))
+    schematic = store is None
+    if schematic: store = GeometryStore(schematic_collection())
+    snap = SharedDataset(DatasetRegistry(os.path.join(ROOT, "data"))).current()
+    cube, t = snap.cube, TRANSLATIONS['Français']
+    col = rate_col(cube.doses[0])
+    failures = 0
+
+    # A : couverture des départements et validité des anneaux, à chaque niveau
+    deps = [str(d) for d in cube.by_dep['Departement'] if str(d) not in OVERSEAS]
+    missing = sorted(set(deps) - set(store.codes))
+    problems = [p for level in LEVELS for p in ring_problems(store.geometries(level))]
+    ok = not missing and not problems
+    failures += not ok
+    print(f"A {'ok' if ok else 'ÉCHEC':<5} {len(store.codes)} géométries{' (fond schématique)' if schematic else ''}, "
+          f"manquantes : {missing or 'aucune'}, anneaux invalides : {problems[:3] or 'aucun'}")
+
+    # B : jointure département -> valeur
+    feats = store.join(cube.by_dep, 'Departement', col, level=MAP_LEVEL)
+    valued = [f for f in feats if f['properties']['value'] is not None]
+    ok = len(feats) == len(store.codes) and len(valued) == len(deps)
+    failures += not ok
+    print(f"B {'ok' if ok else 'ÉCHEC':<5} join : {len(feats)} features, {len(valued)} avec une valeur")
+
+    # C : fusion par région
+    regions = store.join(cube.by_region, 'Region', col, level=MAP_LEVEL_REGIONS, groups=DEP_REGION, names=REGION_NAMES)
+    expected = {DEP_REGION[d] for d in store.codes}
+    ok = ({f['properties']['code'] for f in regions} == expected
+          and all(f['properties']['value'] is not None and f['properties']['nom'] != f['properties']['code'] for f in regions)
+          and not ring_problems(store.grouped(MAP_LEVEL_REGIONS, DEP_REGION)))
+    failures += not ok
+    print(f"C {'ok' if ok else 'ÉCHEC':<5} grouped : {len(regions)} régions "
+          f"({', '.join(sorted(f['properties']['nom'] for f in regions)[:3])}, ...)")
+
+    # D : specs de la page géographique, sans URL externe
+    region = DEP_REGION['69']
+    views = {'France': geo_charts(cube, store, cube.doses[0], col, t, True),
+             'Régions': geo_charts(cube, store, cube.doses[0], col, t, True, 'Region'),
+             REGION_NAMES[region]: geo_charts(cube, store, cube.doses[0], col, t, True, 'Departement', region)}
+    sizes, ok = {}, True
+    for name, charts in views.items():
+        spec = json.dumps(to_spec(charts[0], True))
+        sizes[name] = len(spec)
+        ok = ok and 'raw.githubusercontent.com' not in spec and '"geometry"' in spec
+    failures += not ok
+    n_region = len(store.join(cube.departments(region), 'Departement', col, level=MAP_LEVEL, codes=region_departments(region)))
+    print(f"D {'ok' if ok else 'ÉCHEC':<5} specs autonomes : "
+          + ", ".join(f"{k} {v / 1024:.0f} Ko" for k, v in sizes.items()) + f" ({n_region} départements explorés)")
+
+    # E : le fond schématique n'est jamais servi à l'application
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "departements.geojson")
+        with open(path, 'w', encoding='utf-8') as f: json.dump(schematic_collection(), f)
+        ok = load_geometry(path) is None
+    failures += not ok
+    print(f"E {'ok' if ok else 'ÉCHEC':<5} fond schématique refusé par load_geometry")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
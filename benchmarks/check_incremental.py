@@ -0,0 +1,91 @@
+"""Vérification et mesure de l'ingestion incrémentale (``vacsi.incremental``).
+
+Simule trois clichés successifs du fichier âge × département :
+
+* A : ``--days`` jours d'historique (stock initial, ingestion complète) ;
+* B : A + un jour nouveau (seul ce jour doit être nettoyé) ;
+* C : B avec un jour passé révisé en amont (seul ce jour est renettoyé).
+
+Après chaque étape, l'historique du stock (et son tableau qualité) doit être
+identique à une lecture complète du cliché (``read_dep_history``). Affiche les temps des deux modes.
+Seul le nettoyage est incrémental (voir ``vacsi.incremental``) : lecture du
+cliché, tri, contrôles de l'historique et écriture restent proportionnels à
+l'historique, d'où un gain limité.
+
+Usage : python benchmarks/check_incremental.py [--days 200]
+Code de sortie non nul en cas d'écart.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synth import SOURCES, scale_frame  # noqa: E402
+from vacsi.cache import cached_history  # noqa: E402
+from vacsi.incremental import ingest  # noqa: E402
+from vacsi.ingest import read_dep_history  # noqa: E402
+
+
+def same(a, b):
+    """Les deux historiques contiennent les mêmes lignes, dans le même ordre, et les mêmes compteurs qualité."""
+    fa, fb = a.frame, b.frame[a.frame.columns]
+    if len(fa) != len(fb) or not a.quality.equals(b.quality): return False
+    return all(np.array_equal(fa[c].astype(str).to_numpy() if isinstance(fa[c].dtype, pd.CategoricalDtype) else fa[c].to_numpy(),
+                              fb[c].astype(str).to_numpy() if isinstance(fb[c].dtype, pd.CategoricalDtype) else fb[c].to_numpy())
+               for c in fa.columns)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--days', type=int, default=200)
+    args = parser.parse_args()
+
+    src = pd.read_csv(SOURCES['dep_age'], delimiter=';', dtype={'dep': str, 'clage_vacsi': str})
+    full = scale_frame(src, args.days + 1)
+    days = sorted(full['jour'].unique())
+    revised = full.copy()
+    hit = (revised['jour'] == days[len(days) // 2]) & (revised['dep'] == '75')
+    revised.loc[hit, 'n_tot_dose1'] += 1
+
+    failures = 0
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = os.path.join(tmp, "cache")
+        steps = [("A", full[full['jour'] < days[-1]], ('complet', args.days, 0)),
+                 ("B", full, ('incrémental', 1, 0)),
+                 ("C", revised, ('incrémental', 0, 1))]
+        for name, frame, (mode, n_new, n_rev) in steps:
+            path = os.path.join(tmp, f"vacsi-tot-a-dep-{name}.csv")
+            frame.to_csv(path, sep=';', index=False)
+            t0 = time.perf_counter(); hist, report = ingest('dep_age', path, cache); t_inc = time.perf_counter() - t0
+            # Référence : ce que fait le chargement habituel d'un nouveau cliché (lecture complète + cache)
+            t0 = time.perf_counter(); ref = cached_history(read_dep_history, path, cache); t_full = time.perf_counter() - t0
+            ok = (same(hist, ref) and report['mode'] == mode and len(report['new_days']) == n_new
+                  and len(report['revised_days']) == n_rev)
+            failures += not ok
+            print(f"{name} {'ok' if ok else 'ÉCHEC':<5} {report['mode']:<12} +{len(report['new_days'])} jour(s), "
+                  f"{len(report['revised_days'])} révisé(s), {report['rows_cleaned']:,}/{report['rows_read']:,} lignes nettoyées ; "
+                  f"incrémental {t_inc * 1000:.0f} ms, lecture complète + cache {t_full * 1000:.0f} ms")
+
+        # Même contenu sous un autre nom : seules les métadonnées changent
+        path = os.path.join(tmp, "vacsi-tot-a-dep-D.csv")
+        revised.to_csv(path, sep=';', index=False)
+        _, report = ingest('dep_age', path, cache)
+        ok = report['rows_cleaned'] == 0 and not report['new_days']
+        failures += not ok
+        print(f"D {'ok' if ok else 'ÉCHEC':<5} cliché renommé : {report['rows_cleaned']} ligne nettoyée")
+        _, report = ingest('dep_age', path, cache)
+        ok = report['mode'] == 'inchangé'
+        failures += not ok
+        print(f"E {'ok' if ok else 'ÉCHEC':<5} même fichier : {report['mode']}")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
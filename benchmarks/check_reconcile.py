@@ -0,0 +1,83 @@
+"""Vérification du rapprochement départements / national (``vacsi/reconcile.py``).
+
+Sur les données versionnées de ``data/`` :
+
+* A : la publication de référence se rapproche sans bruit — aucune ligne en
+  dérive et aucun avertissement du journal ``vacsi.dataset`` au chargement ;
+* B : un lot perdu (départements retirés du dernier jour) est signalé ;
+* C : des lignes en double (un département compté deux fois) sont signalées.
+
+Usage : python benchmarks/check_reconcile.py
+Code de sortie non nul en cas d'écart.
+"""
+
+import logging
+import os
+import sys
+
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from vacsi.dataset import SharedDataset  # noqa: E402
+from vacsi.reconcile import MIN_COUNT, drift_summary, reconcile  # noqa: E402
+from vacsi.registry import DatasetRegistry  # noqa: E402
+
+# Départements retirés pour simuler un lot perdu (environ 10 % de la population)
+LOST = ('59', '75', '13', '69', '92')
+DUPLICATED = '33'
+
+
+class Collect(logging.Handler):
+    def __init__(self):
+        super().__init__(logging.WARNING)
+        self.records = []
+
+    def emit(self, record): self.records.append(record)
+
+
+def worst(drift):
+    if drift.empty: return "aucune"
+    row = drift.iloc[0]
+    return f"{len(drift)} ligne(s), max {row['Classe dAge']} {row['Indicateur']} {row['ecart_relatif']:+.1%}"
+
+
+def main():
+    handler = Collect()
+    logging.getLogger('vacsi.dataset').addHandler(handler)
+    snap = SharedDataset(DatasetRegistry(os.path.join(ROOT, "data"))).current(('dep_age', 'fra_age'))
+    logging.getLogger('vacsi.dataset').removeHandler(handler)
+    if snap.fra_latest is None:
+        print("ÉCHEC fichier national absent de data/")
+        return 1
+    dep, fra, measures = snap.dep_latest, snap.fra_latest, snap.measures
+    failures = 0
+
+    # A : publication saine, aucun signalement
+    report = snap.reconciliation if snap.reconciliation is not None else reconcile(dep, fra, measures)
+    drift = drift_summary(report)
+    judged = report[report['national'] >= MIN_COUNT]
+    ok = drift.empty and not handler.records
+    failures += not ok
+    print(f"A {'ok' if ok else 'ÉCHEC':<5} {len(report)} lignes ({len(judged)} jugées), dérive : {worst(drift)}, "
+          f"avertissements : {len(handler.records)}, écart max jugé {judged['ecart_relatif'].abs().max():.1%}")
+
+    # B : lot perdu
+    lost = dep[~dep['Departement'].astype(str).isin(LOST)]
+    drift = drift_summary(reconcile(lost, fra, measures))
+    ok = not drift.empty and (drift['ecart_relatif'] < 0).all()
+    failures += not ok
+    print(f"B {'ok' if ok else 'ÉCHEC':<5} départements {', '.join(LOST)} retirés : {worst(drift)}")
+
+    # C : lignes en double
+    doubled = pd.concat([dep, dep[dep['Departement'].astype(str) == DUPLICATED]], ignore_index=True)
+    drift = drift_summary(reconcile(doubled, fra, measures))
+    ok = not drift.empty and (drift['ecart_relatif'] > 0).all()
+    failures += not ok
+    print(f"C {'ok' if ok else 'ÉCHEC':<5} département {DUPLICATED} en double : {worst(drift)}")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,118 @@
+"""Vérification du rafraîchissement en arrière-plan (``vacsi.watch.Refresher``).
+
+Un dossier de données temporaire contient un cliché âge × département ; le
+fil de surveillance tourne pendant que des lecteurs mesurent la durée de
+``SharedDataset.current()`` :
+
+* A : un cliché plus récent est copié en deux temps (fichier incomplet, puis
+  complet) : une seule publication, celle du fichier complet ;
+* B : un cliché plus récent mais tronqué (quelques départements) est rejeté
+  par la validation, la version servie reste en place ;
+* C : un cliché illisible est ignoré (erreur comptée), sans interruption.
+
+Les lecteurs n'attendent jamais le chargement : le pire temps de
+``current()`` pendant les rechargements est affiché (sous la milliseconde).
+
+Usage : python benchmarks/check_refresher.py [--interval 0.2]
+Code de sortie non nul en cas d'écart.
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+TMP = tempfile.mkdtemp(prefix="vacsi-watch-")
+os.environ["VACSI_CACHE_DIR"] = os.path.join(TMP, "cache")  # Avant l'import de vacsi.cache
+
+from vacsi.dataset import SharedDataset  # noqa: E402
+from vacsi.registry import DatasetRegistry  # noqa: E402
+from vacsi.watch import Refresher  # noqa: E402
+
+SOURCE = DatasetRegistry(os.path.join(ROOT, "data")).newest('dep_age')
+
+
+def wait_for(cond, timeout):
+    end = time.time() + timeout
+    while time.time() < end:
+        if cond(): return True
+        time.sleep(0.05)
+    return cond()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--interval', type=float, default=0.2)
+    parser.add_argument('--readers', type=int, default=4)
+    args = parser.parse_args()
+
+    data = os.path.join(TMP, "data")
+    os.makedirs(data)
+    shutil.copy(SOURCE, os.path.join(data, "vacsi-tot-a-dep-2023-07-13-15h50.csv"))
+    df = pd.read_csv(SOURCE, delimiter=';', dtype={'dep': str, 'clage_vacsi': str})
+    registry = DatasetRegistry(data, kinds={'dep_age': "vacsi-tot-a-dep-*.csv"})
+    dataset = SharedDataset(registry)
+    first = dataset.current().version
+    refresher = Refresher(dataset, registry, args.interval).start()
+
+    stop, worst, reads = threading.Event(), [0.0] * args.readers, [0] * args.readers
+
+    def reader(i):
+        while not stop.is_set():
+            t0 = time.perf_counter(); dataset.current(); worst[i] = max(worst[i], time.perf_counter() - t0)
+            reads[i] += 1
+            time.sleep(0.0005)
+
+    threads = [threading.Thread(target=reader, args=(i,)) for i in range(args.readers)]
+    for t in threads: t.start()
+    failures = 0
+    timeout = 30 * args.interval + 30
+
+    # A : copie en deux temps d'un cliché plus récent (effectifs + 1)
+    newer = df.copy()
+    for c in newer.columns:
+        if c.startswith('n_'): newer[c] += 1
+    text = newer.to_csv(sep=';', index=False)
+    path = os.path.join(data, "vacsi-tot-a-dep-2023-07-20-15h50.csv")
+    with open(path, 'w') as f:
+        f.write(text[:len(text) // 3]); f.flush()
+        time.sleep(args.interval * 0.5)
+        f.write(text[len(text) // 3:])
+    ok = wait_for(lambda: refresher.refreshes == 1, timeout) and dataset.version != first
+    time.sleep(args.interval * 4)
+    ok = ok and refresher.refreshes == 1 and len(dataset.history) == 2
+    failures += not ok
+    print(f"A {'ok' if ok else 'ÉCHEC':<5} cliché copié en deux temps : {refresher.refreshes} publication(s), "
+          f"version {first} -> {dataset.version}")
+
+    # B : cliché tronqué (trois départements) : rejeté par la validation
+    served = dataset.version
+    newer[newer['dep'].isin(['01', '02', '03'])].to_csv(os.path.join(data, "vacsi-tot-a-dep-2023-07-27-15h50.csv"), sep=';', index=False)
+    ok = wait_for(lambda: dataset.rejected is not None, timeout) and dataset.version == served
+    failures += not ok
+    print(f"B {'ok' if ok else 'ÉCHEC':<5} cliché tronqué : {dataset.rejected and dataset.rejected['problems']}")
+
+    # C : cliché illisible : erreur comptée, version inchangée
+    with open(os.path.join(data, "vacsi-tot-a-dep-2023-08-03-15h50.csv"), 'w') as f: f.write("pas;un;fichier\nvacsi\n")
+    ok = wait_for(lambda: refresher.errors >= 1, timeout) and dataset.version == served
+    failures += not ok
+    print(f"C {'ok' if ok else 'ÉCHEC':<5} cliché illisible : {refresher.last_error and refresher.last_error[0]}")
+
+    stop.set()
+    for t in threads: t.join()
+    refresher.stop()
+    shutil.rmtree(TMP, ignore_errors=True)
+    print(f"{sum(reads):,} lectures par {args.readers} fils, {refresher.checks} relevés, "
+          f"pire current() {max(worst) * 1e6:.0f} µs")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,137 @@
+"""Test de charge de l'API JSON locale (``vacsi.api``) : requêtes par seconde et latences.
+
+Sans ``--url``, une instance est lancée dans un processus séparé (port libre,
+surveillance de data/ désactivée) pour que les clients ne partagent pas le
+GIL du serveur. Chaque client garde une connexion HTTP/1.1 persistante et
+enchaîne les requêtes d'un mélange de routes pendant ``--duration`` secondes.
+
+``--revalidate`` : les clients renvoient l'ETag reçu (``If-None-Match``),
+comme un outil qui interroge périodiquement l'API ; les réponses sont alors
+des ``304`` sans corps tant que la version des données ne change pas.
+``--min-rps`` : code de sortie non nul sous ce débit.
+
+Usage : python benchmarks/load_api.py [--clients 8] [--duration 10] [--revalidate] [--url http://127.0.0.1:8600]
+"""
+
+import argparse
+import collections
+import http.client
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from urllib.parse import urlsplit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Mélange de requêtes : index, KPIs, un département, une région, âges et sexes filtrés
+PATHS = (
+    "/api/v1/",
+    "/api/v1/kpis",
+    "/api/v1/kpis?dose=rappel-bivalent",
+    "/api/v1/departements?dose=dose-1&departement=75",
+    "/api/v1/departements?region=84",
+    "/api/v1/ages?dose=dose-2",
+    "/api/v1/ages?departement=13&dose=rappel-1",
+    "/api/v1/sexes?dose=dose-1",
+    "/api/v1/sexes?departement=2A",
+)
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(timeout=300):
+    """Lance ``python -m vacsi.api`` et attend qu'il réponde ; retourne (processus, URL)."""
+    port = free_port()
+    env = {**os.environ, 'PYTHONPATH': os.pathsep.join(filter(None, [ROOT, os.environ.get('PYTHONPATH')]))}
+    proc = subprocess.Popen([sys.executable, "-m", "vacsi.api", "--port", str(port), "--watch", "0"],
+                            cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None: raise SystemExit(f"Le serveur s'est arrêté :\n{proc.stderr.read().decode()[-2000:]}")
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+            conn.request("GET", "/api/v1/")
+            if conn.getresponse().status == 200: return proc, f"http://127.0.0.1:{port}"
+        except OSError:
+            time.sleep(0.2)
+    proc.kill()
+    raise SystemExit("Le serveur n'a pas répondu à temps")
+
+
+def client(url, paths, stop, revalidate, out):
+    """Un client : connexion persistante, routes parcourues en boucle jusqu'à ``stop``."""
+    parts = urlsplit(url)
+    conn = http.client.HTTPConnection(parts.hostname, parts.port, timeout=30)
+    tags, latencies, statuses, nbytes, i = {}, [], collections.Counter(), 0, 0
+    while not stop.is_set():
+        path = paths[i % len(paths)]; i += 1
+        headers = {'If-None-Match': tags[path]} if revalidate and path in tags else {}
+        t0 = time.perf_counter()
+        try:
+            conn.request("GET", path, headers=headers)
+            resp = conn.getresponse()
+            body = resp.read()
+        except (OSError, http.client.HTTPException):
+            statuses['erreur'] += 1
+            conn.close()
+            conn = http.client.HTTPConnection(parts.hostname, parts.port, timeout=30)
+            continue
+        latencies.append(time.perf_counter() - t0)
+        statuses[resp.status] += 1
+        nbytes += len(body)
+        if resp.getheader('ETag'): tags[path] = resp.getheader('ETag')
+    conn.close()
+    out.append((latencies, statuses, nbytes))
+
+
+def run(url, clients=8, duration=10.0, revalidate=False, paths=PATHS):
+    stop, out = threading.Event(), []
+    threads = [threading.Thread(target=client, args=(url, paths, stop, revalidate, out)) for _ in range(clients)]
+    start = time.perf_counter()
+    for t in threads: t.start()
+    time.sleep(duration)
+    stop.set()
+    for t in threads: t.join()
+    elapsed = time.perf_counter() - start
+    latencies = sorted(x for lat, _, _ in out for x in lat)
+    statuses = sum((s for _, s, _ in out), collections.Counter())
+    q = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else [0.0] * 99
+    return {'requests': len(latencies), 'rps': len(latencies) / elapsed, 'p50': q[49], 'p95': q[94], 'p99': q[98],
+            'statuses': dict(statuses), 'bytes': sum(b for _, _, b in out)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--url', default=None, help="instance déjà lancée (défaut : une instance locale est démarrée)")
+    parser.add_argument('--clients', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=10.0)
+    parser.add_argument('--revalidate', action='store_true', help="renvoyer l'ETag reçu (If-None-Match)")
+    parser.add_argument('--min-rps', type=float, default=None, help="débit minimal attendu (requêtes/s)")
+    args = parser.parse_args()
+
+    proc, url = (None, args.url) if args.url else start_server()
+    try:
+        res = run(url, args.clients, args.duration, args.revalidate)
+    finally:
+        if proc is not None: proc.terminate(); proc.wait()
+
+    print(f"{url} : {args.clients} client(s), {args.duration:.0f} s{', revalidation ETag' if args.revalidate else ''}")
+    print(f"  {res['requests']} requêtes, {res['rps']:.0f} req/s, {res['bytes'] / 2**20:.1f} Mo reçus")
+    print(f"  latence p50 {res['p50'] * 1000:.1f} ms, p95 {res['p95'] * 1000:.1f} ms, p99 {res['p99'] * 1000:.1f} ms")
+    print("  statuts : " + ", ".join(f"{k} × {v}" for k, v in sorted(res['statuses'].items(), key=str)))
+    if args.min_rps is not None and res['rps'] < args.min_rps:
+        print(f"DÉBIT INSUFFISANT : {res['rps']:.0f} req/s < {args.min_rps:.0f}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,118 @@
+"""Fond de carte schématique des départements, pour les vérifications hors ligne.
+
+Sans réseau, le GeoJSON officiel simplifié (``python -m vacsi.geo fetch``)
+n'est pas disponible ; les benchmarks exercent alors ``GeometryStore`` sur ce
+fond : chaque département est la cellule de Voronoï de son centre approximatif,
+découpée par un contour simplifié de la métropole et de la Corse. Les
+limites sont inventées, seules la disposition, les voisinages et les régions
+(fusion des départements) suivent la carte réelle. La collection est marquée
+``schematic`` : ``vacsi.geo.load_geometry`` refuse de la servir à
+l'application, qui garde alors le GeoJSON distant.
+
+Usage : ``from benchmarks.schematic import schematic_collection``
+"""
+
+import math
+
+# Code -> (nom, longitude, latitude du centre approximatif du département)
+CENTERS = {
+    '01': ("Ain", 5.35, 46.10), '02': ("Aisne", 3.56, 49.56), '03': ("Allier", 3.19, 46.39),
+    '04': ("Alpes-de-Haute-Provence", 6.24, 44.10), '05': ("Hautes-Alpes", 6.26, 44.66),
+    '06': ("Alpes-Maritimes", 7.12, 43.93), '07': ("Ardèche", 4.42, 44.75), '08': ("Ardennes", 4.64, 49.62),
+    '09': ("Ariège", 1.50, 42.92), '10': ("Aube", 4.16, 48.30), '11': ("Aude", 2.41, 43.10),
+    '12': ("Aveyron", 2.68, 44.28), '13': ("Bouches-du-Rhône", 5.08, 43.55), '14': ("Calvados", -0.36, 49.09),
+    '15': ("Cantal", 2.67, 45.05), '16': ("Charente", 0.20, 45.72), '17': ("Charente-Maritime", -0.75, 45.80),
+    '18': ("Cher", 2.49, 47.06), '19': ("Corrèze", 1.88, 45.36), '21': ("Côte-d'Or", 4.77, 47.42),
+    '22': ("Côtes-d'Armor", -2.86, 48.44), '23': ("Creuse", 2.02, 46.09), '24': ("Dordogne", 0.74, 45.10),
+    '25': ("Doubs", 6.36, 47.16), '26': ("Drôme", 5.17, 44.68), '27': ("Eure", 0.99, 49.11),
+    '28': ("Eure-et-Loir", 1.37, 48.39), '29': ("Finistère", -4.05, 48.25), '2A': ("Corse-du-Sud", 8.99, 41.86),
+    '2B': ("Haute-Corse", 9.21, 42.39), '30': ("Gard", 4.18, 44.00), '31': ("Haute-Garonne", 1.17, 43.35),
+    '32': ("Gers", 0.45, 43.69), '33': ("Gironde", -0.58, 44.83), '34': ("Hérault", 3.37, 43.58),
+    '35': ("Ille-et-Vilaine", -1.64, 48.15), '36': ("Indre", 1.58, 46.78), '37': ("Indre-et-Loire", 0.69, 47.26),
+    '38': ("Isère", 5.58, 45.26), '39': ("Jura", 5.70, 46.73), '40': ("Landes", -0.78, 44.00),
+    '41': ("Loir-et-Cher", 1.43, 47.62), '42': ("Loire", 4.17, 45.73), '43': ("Haute-Loire", 3.81, 45.13),
+    '44': ("Loire-Atlantique", -1.68, 47.35), '45': ("Loiret", 2.34, 47.91), '46': ("Lot", 1.60, 44.62),
+    '47': ("Lot-et-Garonne", 0.46, 44.37), '48': ("Lozère", 3.50, 44.52), '49': ("Maine-et-Loire", -0.56, 47.39),
+    '50': ("Manche", -1.33, 49.08), '51': ("Marne", 4.24, 48.95), '52': ("Haute-Marne", 5.22, 48.11),
+    '53': ("Mayenne", -0.66, 48.15), '54': ("Meurthe-et-Moselle", 6.17, 48.79), '55': ("Meuse", 5.38, 48.99),
+    '56': ("Morbihan", -2.81, 47.85), '57': ("Moselle", 6.66, 49.04), '58': ("Nièvre", 3.50, 47.11),
+    '59': ("Nord", 3.22, 50.45), '60': ("Oise", 2.43, 49.41), '61': ("Orne", 0.13, 48.62),
+    '62': ("Pas-de-Calais", 2.29, 50.49), '63': ("Puy-de-Dôme", 3.14, 45.73),
+    '64': ("Pyrénées-Atlantiques", -0.76, 43.26), '65': ("Hautes-Pyrénées", 0.16, 43.05),
+    '66': ("Pyrénées-Orientales", 2.52, 42.60), '67': ("Bas-Rhin", 7.55, 48.67), '68': ("Haut-Rhin", 7.27, 47.86),
+    '69': ("Rhône", 4.64, 45.87), '70': ("Haute-Saône", 6.08, 47.64), '71': ("Saône-et-Loire", 4.54, 46.64),
+    '72': ("Sarthe", 0.22, 47.99), '73': ("Savoie", 6.44, 45.48), '74': ("Haute-Savoie", 6.43, 46.03),
+    '75': ("Paris", 2.34, 48.86), '76': ("Seine-Maritime", 1.03, 49.66), '77': ("Seine-et-Marne", 2.93, 48.63),
+    '78': ("Yvelines", 1.84, 48.82), '79': ("Deux-Sèvres", -0.32, 46.56), '80': ("Somme", 2.28, 49.96),
+    '81': ("Tarn", 2.17, 43.79), '82': ("Tarn-et-Garonne", 1.28, 44.08), '83': ("Var", 6.22, 43.46),
+    '84': ("Vaucluse", 5.18, 44.01), '85': ("Vendée", -1.30, 46.67), '86': ("Vienne", 0.46, 46.56),
+    '87': ("Haute-Vienne", 1.24, 45.89), '88': ("Vosges", 6.38, 48.19), '89': ("Yonne", 3.56, 47.84),
+    '90': ("Territoire de Belfort", 6.93, 47.63), '91': ("Essonne", 2.24, 48.52), '92': ("Hauts-de-Seine", 2.25, 48.85),
+    '93': ("Seine-Saint-Denis", 2.48, 48.91), '94': ("Val-de-Marne", 2.47, 48.78), '95': ("Val-d'Oise", 2.13, 49.08),
+}
+
+# Contours simplifiés (longitude, latitude), sens horaire
+MAINLAND = [
+    (2.55, 51.09), (3.20, 50.75), (4.15, 50.28), (4.85, 50.15), (4.85, 49.80), (5.80, 49.55), (6.40, 49.46),
+    (7.60, 49.05), (8.20, 48.97), (7.80, 48.50), (7.55, 47.60), (6.95, 47.45), (6.10, 46.60), (6.10, 46.20),
+    (6.80, 46.40), (7.00, 45.90), (6.80, 45.20), (7.00, 44.85), (6.95, 44.25), (7.53, 43.78), (6.90, 43.40),
+    (6.20, 43.10), (5.00, 43.35), (4.50, 43.45), (3.50, 43.25), (3.00, 42.90), (3.17, 42.45), (2.00, 42.40),
+    (1.45, 42.60), (0.70, 42.80), (-0.30, 42.80), (-1.10, 43.00), (-1.78, 43.37), (-1.45, 43.60), (-1.25, 44.50),
+    (-1.20, 45.60), (-1.20, 46.20), (-2.10, 46.80), (-2.50, 47.30), (-3.50, 47.70), (-4.40, 47.80), (-4.75, 48.35),
+    (-4.60, 48.65), (-3.50, 48.85), (-2.50, 48.60), (-1.60, 48.65), (-1.60, 49.20), (-1.95, 49.70), (-1.30, 49.70),
+    (-1.10, 49.40), (0.10, 49.45), (0.20, 49.70), (1.40, 50.05), (1.60, 50.90),
+]
+CORSICA = [(9.35, 43.00), (9.55, 42.55), (9.40, 41.95), (9.25, 41.40), (8.80, 41.55), (8.60, 42.00), (8.55, 42.35),
+           (9.00, 42.65), (9.30, 42.70)]
+ISLANDS = {'2A', '2B'}
+
+# Les longitudes sont resserrées (cosinus de la latitude moyenne) pour des cellules non déformées
+_KX = math.cos(math.radians(46.5))
+
+
+def _clip(poly, p, q):
+    """Partie de ``poly`` plus proche de ``p`` que de ``q`` (demi-plan, Sutherland-Hodgman)."""
+    mx, my = (p[0] + q[0]) / 2, (p[1] + q[1]) / 2
+    nx, ny = q[0] - p[0], q[1] - p[1]
+
+    def side(a): return (a[0] - mx) * nx + (a[1] - my) * ny  # < 0 : côté de p
+
+    out = []
+    for i, a in enumerate(poly):
+        b = poly[(i + 1) % len(poly)]
+        sa, sb = side(a), side(b)
+        if sa <= 0: out.append(a)
+        if (sa < 0 < sb) or (sb < 0 < sa):
+            t = sa / (sa - sb)
+            out.append((a[0] + t * (b[0] - a[0]), a[1] + t * (b[1] - a[1])))
+    return out
+
+
+def _area(ring):
+    return sum(a[0] * b[1] - b[0] * a[1] for a, b in zip(ring, ring[1:] + ring[:1])) / 2
+
+
+def _cells(outline, codes):
+    outline = [(x * _KX, y) for x, y in outline]
+    sites = {c: (CENTERS[c][1] * _KX, CENTERS[c][2]) for c in codes}
+    out = {}
+    for c, p in sites.items():
+        poly = outline
+        for other, q in sites.items():
+            if other != c and poly: poly = _clip(poly, p, q)
+        ring = [(round(x / _KX, 4), round(y, 4)) for x, y in poly]
+        if _area(ring) > 0: ring.reverse()  # Anneau extérieur en sens horaire (convention de d3-geo)
+        out[c] = ring + ring[:1]
+    return out
+
+
+def schematic_collection():
+    """FeatureCollection des départements métropolitains (propriétés ``code`` et ``nom``)."""
+    cells = {**_cells(MAINLAND, [c for c in CENTERS if c not in ISLANDS]), **_cells(CORSICA, sorted(ISLANDS))}
+    features = [{'type': 'Feature', 'properties': {'code': c, 'nom': CENTERS[c][0]},
+                 'geometry': {'type': 'Polygon', 'coordinates': [[list(pt) for pt in cells[c]]]}}
+                for c in sorted(cells)]
+    return {'type': 'FeatureCollection', 'schematic': True,
+            'description': "Fond schématique (cellules de Voronoï des centres départementaux) ; "
+                           "remplacer par le GeoJSON officiel avec python -m vacsi.geo fetch",
+            'features': features}
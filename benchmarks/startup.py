@@ -0,0 +1,120 @@
+"""Démarrage à froid : temps d'import et temps jusqu'au premier affichage.
+
+Chaque mesure tourne dans un processus neuf (``-X importtime``), comme une
+nouvelle réplique : l'application est rejouée via ``streamlit.testing`` et
+les étapes du premier rendu sont relues dans ``vacsi.trace``.
+
+* ``streamlit``   : import de Streamlit (incompressible, hors budget) ;
+* ``script``      : lancement du script par ``AppTest`` jusqu'à l'ouverture de
+  la trace (imports du haut de ``app_streamlit.py``, configuration de la page) ;
+* ``first_paint`` : lancement du script jusqu'à la fin de la barre latérale
+  (premier contenu visible) ;
+* ``first_run``   : premier rendu complet de la page d'accueil (données comprises) ;
+* ``heavy``       : modules lourds importés avant le premier affichage.
+
+``--budget-paint`` / ``--budget-run`` : secondes à ne pas dépasser (médiane),
+code de sortie non nul sinon — à brancher dans le contrôle des nouvelles
+répliques. ``--cold-cache`` : cache disque vide (premier démarrage après une
+nouvelle publication des données).
+
+Usage : python benchmarks/startup.py [--repeat 3] [--cold-cache] [--budget-paint 1.0] [--budget-run 5.0]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP = os.path.join(ROOT, "app_streamlit.py")
+HEAVY = ('pandas', 'numpy', 'altair', 'pyarrow')
+
+
+def child():
+    """Un démarrage : imprime les mesures en JSON sur la dernière ligne."""
+    t0 = time.perf_counter()
+    import streamlit  # noqa: F401
+    t_streamlit = time.perf_counter() - t0
+    from streamlit.testing.v1 import AppTest
+    sys.path.insert(0, ROOT)
+    from vacsi import trace
+
+    seen = {}
+    original = trace.Trace.stage
+
+    def stage(self, name):
+        # Modules lourds déjà chargés quand la barre latérale commence
+        if name == 'sidebar': seen.update({m: m in sys.modules for m in HEAVY})
+        return original(self, name)
+    trace.Trace.stage = stage
+
+    os.chdir(ROOT)
+    at = AppTest.from_file(APP, default_timeout=300)
+    start = time.perf_counter()
+    wall = time.time()
+    at.run()
+    first_run = time.perf_counter() - start
+    if at.exception: raise SystemExit(f"Erreur de l'application : {at.exception[0].message}")
+    tr = trace.REGISTRY.last()
+    script = tr['started'] - wall
+    sidebar = next(s for s in tr['stages'] if s['stage'] == 'sidebar')
+    print(json.dumps({'streamlit': t_streamlit, 'script': script, 'first_paint': script + sidebar['offset'] + sidebar['seconds'],
+                      'first_run': first_run, 'heavy': [m for m, loaded in seen.items() if loaded]}))
+
+
+def import_times(stderr):
+    """Temps cumulé (s) des modules lourds dans la sortie de ``-X importtime`` (premier import)."""
+    out = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line: continue
+        _, cumulative, name = line.split("|")
+        name = name.strip()
+        if name in HEAVY and name not in out: out[name] = int(cumulative) / 1e6
+    return out
+
+
+def run_once(cold_cache):
+    env = dict(os.environ)
+    if cold_cache: env['VACSI_CACHE_DIR'] = tempfile.mkdtemp(prefix="vacsi-startup-")
+    env['VACSI_WATCH_SECONDS'] = '0'  # Pas de fil de surveillance dans la mesure
+    proc = subprocess.run([sys.executable, "-X", "importtime", __file__, "--child"], env=env,
+                          capture_output=True, text=True, cwd=ROOT)
+    if proc.returncode: raise SystemExit(proc.stderr[-2000:])
+    res = json.loads(proc.stdout.strip().splitlines()[-1])
+    res['imports'] = import_times(proc.stderr)
+    return res
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--cold-cache', action='store_true', help="cache disque vide à chaque démarrage")
+    parser.add_argument('--budget-paint', type=float, default=None, help="secondes max jusqu'au premier affichage")
+    parser.add_argument('--budget-run', type=float, default=None, help="secondes max pour le premier rendu complet")
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child: return child()
+
+    runs = [run_once(args.cold_cache) for _ in range(args.repeat)]
+    med = {k: statistics.median(r[k] for r in runs) for k in ('streamlit', 'script', 'first_paint', 'first_run')}
+    print(f"{args.repeat} démarrage(s){' (cache disque vide)' if args.cold_cache else ''}, médianes :")
+    for k, v in med.items(): print(f"  {k:<12} {v * 1000:8.0f} ms")
+    imports = runs[-1]['imports']
+    print("  imports     " + ", ".join(f"{m} {imports[m] * 1000:.0f} ms" for m in HEAVY if m in imports))
+    print(f"  avant le premier affichage : {', '.join(runs[-1]['heavy']) or 'aucun module lourd'}")
+
+    failures = []
+    if args.budget_paint is not None and med['first_paint'] > args.budget_paint:
+        failures.append(f"premier affichage {med['first_paint']:.2f} s > {args.budget_paint:.2f} s")
+    if args.budget_run is not None and med['first_run'] > args.budget_run:
+        failures.append(f"premier rendu {med['first_run']:.2f} s > {args.budget_run:.2f} s")
+    for f in failures: print(f"BUDGET DÉPASSÉ : {f}")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,228 @@
+"""Suite de benchmarks hors serveur : chargement, agrégation et graphiques.
+
+Pour chaque facteur d'échelle (fichiers synthétiques de ``benchmarks/synth.py``),
+mesure séparément :
+
+* ``parse_dep``    : lecture CSV brute (``pd.read_csv``), pour référence ;
+* ``load_dep`` / ``load_sex`` : lecture par blocs + nettoyage + tri (``read_*_history``) ;
+* ``cache_write`` / ``cache_read`` : cache disque colonnaire ;
+* ``cube``         : agrégats précalculés à partir du dernier jour ;
+* mémoire occupée par les historiques nettoyés (``memory_report``) ;
+* ``specs_geo`` / ``specs_demo_age`` / ``specs_demo_sex`` : construction Altair
+  et sérialisation de toutes les specs d'une page (tous indicateurs), avec la
+  taille JSON transmise au navigateur ; ``specs_geo_regions`` pour la vue
+  par région (agrégats régionaux, contours fusionnés) ;
+* ``evolution``    : requête d'historique + spec de la courbe complète ;
+  ``evolution_lod`` : même courbe sous-échantillonnée (``vacsi.lod``, niveaux
+  compris), dont la taille reste bornée quelle que soit l'échelle.
+
+Avec ``--apptest``, rejoue aussi l'application complète (données de ``data/``)
+via ``streamlit.testing`` : premier affichage puis chaque page.
+
+Les résultats sont écrits en JSON (``benchmarks/results/``) ; ``--compare``
+affiche le rapport à un fichier précédent pour repérer les régressions.
+
+Usage : python benchmarks/suite.py [--scales 1 10 100] [--age-factor 1] [--repeat 3]
+                                   [--apptest] [--compare ANCIEN.json]
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import altair as alt
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.schematic import schematic_collection  # noqa: E402
+from benchmarks.synth import ROOT, write_scaled  # noqa: E402
+from vacsi import memory_report, read_dep_history, read_sex_history  # noqa: E402
+from vacsi.cache import load_history, save_history  # noqa: E402
+from vacsi.charts import demo_age_charts, demo_sex_charts, evolution_chart, geo_charts, to_spec  # noqa: E402
+from vacsi.cube import Cube, rate_col  # noqa: E402
+from vacsi.geo import GeometryStore, load_geometry  # noqa: E402
+from vacsi.i18n import TRANSLATIONS  # noqa: E402
+from vacsi.lod import SeriesLOD  # noqa: E402
+
+APP = os.path.join(ROOT, "app_streamlit.py")
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+
+
+def app_translations(lang='Français'):
+    """Textes de l'application (module sans Streamlit)."""
+    return TRANSLATIONS[lang]
+
+
+def best_of(fn, repeat):
+    """(meilleur temps en secondes, dernier résultat) sur ``repeat`` exécutions."""
+    best, out = float('inf'), None
+    for _ in range(repeat):
+        t = time.perf_counter(); out = fn(); best = min(best, time.perf_counter() - t)
+    return best, out
+
+
+def spec_bytes(specs):
+    return sum(len(json.dumps(s, separators=(',', ':'), default=str)) for s in specs)
+
+
+# ============================================================================
+# 1. Étapes mesurées
+# ============================================================================
+def bench_scale(days, age_factor, repeat, t, dark=True):
+    dep_path, sex_path = write_scaled('dep_age', days, age_factor), write_scaled('dep_sex', days)
+    res = {'days': days, 'age_factor': age_factor, 'stages': {}}
+
+    def record(name, fn):
+        sec, out = best_of(fn, repeat)
+        res['stages'][name] = {'seconds': round(sec, 6)}
+        return out
+
+    raw = record('parse_dep', lambda: pd.read_csv(dep_path, delimiter=';', dtype={'dep': str}))
+    res['rows_dep'], res['bytes_dep'] = len(raw), os.path.getsize(dep_path)
+    del raw
+    dep = record('load_dep', lambda: read_dep_history(dep_path))
+    sex = record('load_sex', lambda: read_sex_history(sex_path))
+    res['rows_clean'] = len(dep.frame)
+    mem = memory_report({'dep': dep.frame, 'sex': sex.frame})
+    res['memory_bytes'] = {k: int(v) for k, v in mem.groupby('frame')['bytes'].sum().items()}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "dep")
+        record('cache_write', lambda: save_history(dep, path))
+        record('cache_read', lambda: load_history(path))
+
+    cube = record('cube', lambda: Cube(dep.latest(), sex.latest(), dep.measures))
+    # Sans le GeoJSON officiel (hors ligne) : fond schématique, même chemin de calcul
+    store = load_geometry(os.path.join(ROOT, "data", "departements.geojson")) or GeometryStore(schematic_collection())
+
+    def build(charts):
+        return [to_spec(c, dark) for group in charts for c in group]
+
+    geo = [(d, c) for d in cube.doses for c in (rate_col(d), d)]
+    specs = record('specs_geo', lambda: build(geo_charts(cube, store, d, c, t, dark) for d, c in geo))
+    res['stages']['specs_geo']['payload_bytes'] = spec_bytes(specs)
+    specs = record('specs_geo_regions', lambda: build(geo_charts(cube, store, d, c, t, dark, 'Region') for d, c in geo))
+    res['stages']['specs_geo_regions']['payload_bytes'] = spec_bytes(specs)
+    specs = record('specs_demo_age', lambda: build(demo_age_charts(cube, d, t, dark) for d in cube.doses))
+    res['stages']['specs_demo_age']['payload_bytes'] = spec_bytes(specs)
+    specs = record('specs_demo_sex', lambda: build(demo_sex_charts(cube, d, t, dark) for d in cube.sex_doses))
+    res['stages']['specs_demo_sex']['payload_bytes'] = spec_bytes(specs)
+
+    key, dose = (dep.key_values('Departement')[0], 'Tous âges'), dep.measures[0]
+
+    def evolution():
+        serie = dep.series(key, dep.first_day, dep.last_day)[['jour', dose, rate_col(dose)]]
+        return [to_spec(evolution_chart(serie, *key, dose, t, dark), dark)]
+    specs = record('evolution', evolution)
+    res['stages']['evolution']['payload_bytes'] = spec_bytes(specs)
+
+    def evolution_lod():
+        serie = dep.series(key)
+        pos = SeriesLOD(serie['jour'].to_numpy(), serie[rate_col(dose)].to_numpy()).pick(dep.first_day, dep.last_day)
+        return [to_spec(evolution_chart(serie.iloc[pos][['jour', dose, rate_col(dose)]], *key, dose, t, dark), dark)]
+    specs = record('evolution_lod', evolution_lod)
+    res['stages']['evolution_lod']['payload_bytes'] = spec_bytes(specs)
+    return res
+
+
+def bench_apptest(repeat):
+    """Temps de rendu de l'application complète, premier passage puis chaque page."""
+    from streamlit.testing.v1 import AppTest
+    out, cwd = {}, os.getcwd()
+    os.chdir(ROOT)  # Le registre cherche les fichiers dans data/, relatif à la racine
+    try:
+        at = AppTest.from_file(APP, default_timeout=300)
+        t = time.perf_counter(); at.run(); out['first_run'] = round(time.perf_counter() - t, 6)
+        for page in at.sidebar.radio[1].options:
+            best = float('inf')
+            for _ in range(repeat):
+                t = time.perf_counter(); at.sidebar.radio[1].set_value(page).run()
+                best = min(best, time.perf_counter() - t)
+            if at.exception: raise RuntimeError(f"{page}: {at.exception[0].message}")
+            out[page] = round(best, 6)
+    finally:
+        os.chdir(cwd)
+    return out
+
+
+# ============================================================================
+# 2. Résultats
+# ============================================================================
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment():
+    return {'python': platform.python_version(), 'platform': platform.platform(),
+            'pandas': pd.__version__, 'numpy': np.__version__, 'altair': alt.__version__}
+
+
+def print_scale(res, baseline=None):
+    print(f"\n{res['days']} jour(s) × {res['age_factor']} : {res['rows_dep']:,} lignes, {res['bytes_dep']:,} octets")
+    print("  mémoire : " + ", ".join(f"{k} {v / 2**20:.1f} Mo" for k, v in res['memory_bytes'].items()))
+    for name, st in res['stages'].items():
+        line = f"  {name:<15} {st['seconds'] * 1000:10.1f} ms"
+        if 'payload_bytes' in st: line += f"  {st['payload_bytes']:>12,} octets"
+        old = (baseline or {}).get(name)
+        if old: line += f"  (x{st['seconds'] / old['seconds']:.2f} vs référence)"
+        print(line)
+
+
+def baseline_for(previous, res):
+    for old in (previous or {}).get('scales', []):
+        if old['days'] == res['days'] and old['age_factor'] == res['age_factor']: return old['stages']
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scales', type=int, nargs='+', default=[1, 10, 100],
+                        help="nombres de jours d'historique (10 à 1000 pour ×10 à ×1000)")
+    parser.add_argument('--age-factor', type=int, default=1, help="multiplicateur du nombre de classes d'âge")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--apptest', action='store_true', help="rejoue aussi l'application via streamlit.testing")
+    parser.add_argument('--out', default=None, help="fichier JSON de sortie (défaut : benchmarks/results/)")
+    parser.add_argument('--compare', default=None, help="résultats précédents à comparer")
+    args = parser.parse_args()
+
+    previous = None
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f: previous = json.load(f)
+
+    t = app_translations()
+    report = {'created': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+              'revision': git_revision(), 'environment': environment(), 'repeat': args.repeat, 'scales': []}
+    for days in args.scales:
+        res = bench_scale(days, args.age_factor, args.repeat, t)
+        report['scales'].append(res)
+        print_scale(res, baseline_for(previous, res))
+    if args.apptest:
+        report['apptest'] = bench_apptest(args.repeat)
+        print("\nApplication (streamlit.testing) :")
+        for name, sec in report['apptest'].items(): print(f"  {name:<25} {sec * 1000:10.1f} ms")
+    report['peak_rss_mb'] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+    out = args.out
+    if out is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = datetime.datetime.now().strftime('%Y%m%d-%H%M%S')
+        out = os.path.join(RESULTS_DIR, f"{stamp}-{report['revision'] or 'local'}.json")
+    with open(out, 'w', encoding='utf-8') as f: json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"\nPic mémoire : {report['peak_rss_mb']} Mo — résultats : {out}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+"""Générateur de fichiers VACSI synthétiques à plus grande échelle.
+
+Part des fichiers réels de ``data/`` (un seul jour) et les multiplie :
+
+* ``days`` : nombre de jours d'historique ; les effectifs et taux montent
+  linéairement jusqu'aux valeurs réelles, atteintes le dernier jour ;
+* ``age_factor`` (fichier âge uniquement) : chaque classe d'âge est déclinée en
+  ``age_factor`` classes, les supplémentaires portant des codes (>= 1000) que
+  l'application ne connaît pas (lus, puis écartés au nettoyage).
+
+Le nombre de lignes est multiplié par ``days × age_factor``.
+
+Usage : python benchmarks/synth.py --days 100 [--age-factor 2] [--out benchmarks/.data]
+"""
+
+import argparse
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from vacsi.registry import DatasetRegistry  # noqa: E402
+
+# Cliché le plus récent de chaque type dans data/
+SOURCES = {k: v for k, v in DatasetRegistry(os.path.join(ROOT, "data")).discover().items() if k in ('dep_age', 'dep_sex')}
+DATA_DIR = os.path.join(ROOT, "benchmarks", ".data")
+
+
+def scale_frame(frame, days=1, age_factor=1):
+    """Réplique ``frame`` (un jour) sur ``days`` jours et ``age_factor`` classes d'âge."""
+    frame = frame.copy()
+    if age_factor > 1 and 'clage_vacsi' in frame.columns:
+        # Codes fins : 04 -> 1400, 1401... (inconnus de AGE_MAPPING)
+        base = pd.to_numeric(frame['clage_vacsi'])
+        extra = [frame.assign(clage_vacsi=(1000 + base * 100 + k).astype(str)) for k in range(age_factor - 1)]
+        frame = pd.concat([frame, *extra], ignore_index=True)
+
+    last = pd.to_datetime(frame['jour']).max()
+    n = len(frame)
+    out = frame.loc[np.tile(np.arange(n), days)].reset_index(drop=True)
+    step = np.repeat(np.arange(days), n)
+    out['jour'] = (last - pd.to_timedelta(days - 1 - step, unit='D')).strftime('%Y-%m-%d')
+
+    ramp = (step + 1) / days
+    for c in out.columns:
+        if c.startswith('n_'): out[c] = np.floor(out[c].to_numpy() * ramp).astype(np.int64)
+        elif c.startswith('couv_'): out[c] = np.round(out[c].to_numpy() * ramp, 1)
+    return out
+
+
+def synth_path(key, days, age_factor, out_dir=DATA_DIR):
+    stem = os.path.splitext(os.path.basename(SOURCES[key]))[0]
+    return os.path.join(out_dir, f"{stem}-d{days}-a{age_factor}.csv")
+
+
+def write_scaled(key, days=1, age_factor=1, out_dir=DATA_DIR):
+    """Écrit (une seule fois) le fichier synthétique et retourne son chemin."""
+    path = synth_path(key, days, age_factor, out_dir)
+    if os.path.exists(path): return path
+    os.makedirs(out_dir, exist_ok=True)
+    src = pd.read_csv(SOURCES[key], delimiter=';', dtype={'dep': str, 'clage_vacsi': str, 'sexe': str})
+    factor = age_factor if key == 'dep_age' else 1
+    tmp = f"{path}.tmp"
+    scale_frame(src, days, factor).to_csv(tmp, sep=';', index=False)
+    os.replace(tmp, path)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--days', type=int, default=10)
+    parser.add_argument('--age-factor', type=int, default=1)
+    parser.add_argument('--out', default=DATA_DIR)
+    args = parser.parse_args()
+    for key in SOURCES:
+        path = write_scaled(key, args.days, args.age_factor, args.out)
+        print(f"{key:<8} {os.path.getsize(path):>14,} octets  {path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,21 @@
+"""Couche données du tableau de bord VACSI (indépendante de Streamlit).
+
+Les modules de ce paquet peuvent être importés sans serveur Streamlit
+(scripts, benchmarks, exports) : l'application se contente de les envelopper
+dans ses propres caches.
+
+Les noms ci-dessous viennent de ``vacsi.ingest``, importé au premier accès
+seulement : ``from vacsi import trace`` ne charge pas pandas.
+"""
+
+__all__ = [
+    "AGE_MAPPING", "AGE_ORDER", "DEP_CODES", "TimeSeries", "fix_dep_code", "memory_report",
+    "normalize_dep_codes", "read_dep_history", "read_fra_history", "read_sex_history", "unknown_dep_codes",
+]
+
+
+def __getattr__(name):
+    if name in __all__:
+        from vacsi import ingest
+        return getattr(ingest, name)
+    raise AttributeError(f"module 'vacsi' has no attribute {name!r}")
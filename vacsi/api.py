@@ -0,0 +1,333 @@
+"""API HTTP/JSON locale sur les agrégats précalculés (hors Streamlit).
+
+Les outils internes qui ont besoin des KPIs nationaux, des taux par
+département ou de la couverture par âge et par sexe les interrogent ici
+plutôt que de lire l'interface. Le serveur partage la couche données du
+tableau de bord (``SharedDataset`` et son cube) et suit les nouveaux clichés
+de ``data/`` avec le même fil de surveillance (``vacsi.watch``).
+
+Usage : python -m vacsi.api [--host 127.0.0.1] [--port 8600] [--watch 30]
+
+Routes (GET ou HEAD) ::
+
+    /api/v1/                 version, dernier jour, valeurs acceptées par les filtres
+    /api/v1/kpis             KPIs nationaux                         ?dose=
+    /api/v1/zones            dernier jour, métropole / outre-mer    ?dose= &zone=
+    /api/v1/regions          dernier jour par région                ?dose= &region= &zone=
+    /api/v1/departements     dernier jour par département           ?dose= &departement= &region=
+    /api/v1/ages             couverture par classe d'âge            ?dose= &age= &departement=
+    /api/v1/sexes            couverture par sexe                    ?dose= &sexe= &departement=
+
+Un filtre accepte plusieurs valeurs (répétées ou séparées par des virgules) ;
+doses, âges et sexes se donnent en toutes lettres ou en slug (``rappel-bivalent``).
+Les lignes sont au format long : une ligne par (clés, dose) avec ``effectif``,
+``population`` et ``taux`` (%). Les lignes nationales (KPIs, âges sans filtre
+``departement``) viennent du fichier national quand il est chargé (il compte
+aussi les résidences inconnues), sinon de la somme des départements.
+
+Chaque réponse porte l'ETag de la version des données : un client qui renvoie
+``If-None-Match`` reçoit ``304`` sans corps tant que les données n'ont pas changé.
+Les corps encodés sont gardés dans un cache LRU indexé par version et requête.
+"""
+
+import argparse
+import json
+import logging
+import os
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import pandas as pd
+
+from vacsi.charts import SpecCache
+from vacsi.cube import ALL_AGES, rate_col
+from vacsi.dataset import SharedDataset
+from vacsi.export import slug
+from vacsi.ingest import fix_dep_code
+from vacsi.registry import DatasetRegistry
+from vacsi.regions import REGION_ZONE
+from vacsi.watch import Refresher
+
+logger = logging.getLogger("vacsi.api")
+
+PREFIX = "/api/v1"
+NEEDS = ('dep_age', 'dep_sex', 'fra_age')
+RESPONSE_CACHE_SIZE = 1024
+WATCH_SECONDS = float(os.environ.get("VACSI_WATCH_SECONDS", "30"))
+
+
+class QueryError(ValueError):
+    """Requête invalide : code HTTP et corps JSON de l'erreur."""
+
+    def __init__(self, status, message, allowed=None):
+        super().__init__(message)
+        self.status, self.allowed = status, allowed
+
+    def payload(self):
+        out = {'error': str(self)}
+        if self.allowed is not None: out['allowed'] = self.allowed
+        return out
+
+
+# ============================================================================
+# 1. Requêtes sur l'instantané (sans HTTP)
+# ============================================================================
+def _values(params, name):
+    """Valeurs d'un filtre : paramètres répétés et listes séparées par des virgules."""
+    return [v.strip() for raw in params.get(name, []) for v in raw.split(',') if v.strip()]
+
+
+def _pick(params, name, choices, normalize=slug):
+    """Valeurs demandées parmi ``choices`` (toutes si le filtre est absent)."""
+    wanted = _values(params, name)
+    if not wanted: return list(choices)
+    by_key = {normalize(c): c for c in choices}
+    unknown = [v for v in wanted if normalize(v) not in by_key]
+    if unknown: raise QueryError(400, f"{name} inconnu : {', '.join(unknown)}", list(choices))
+    return list(dict.fromkeys(by_key[normalize(v)] for v in wanted))
+
+
+def _dep_key(code):
+    return fix_dep_code(code).upper()
+
+
+def _long(frame, keys, doses):
+    """Tableau large (une colonne par dose et par taux) -> lignes (clés, dose, effectif, population, taux)."""
+    parts = []
+    # Arrondi comme ``GeometryStore.join`` : pas de 80.57000732421875 (float32) dans le JSON
+    population = frame['Population'].astype(float).round(4).to_numpy()
+    for d in doses:
+        part = frame[keys].copy()
+        part['dose'] = d
+        part['effectif'] = frame[d].to_numpy().astype('int64')  # Sommes régionales en float64 : effectifs entiers
+        part['population'] = population
+        part['taux'] = frame[rate_col(d)].astype(float).round(4).to_numpy()
+        parts.append(part)
+    out = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(columns=[*keys, 'dose', 'effectif', 'population', 'taux'])
+    return out.rename(columns={'Departement': 'departement', 'Region': 'region', 'Nom': 'nom', 'Zone': 'zone',
+                               'Classe dAge': 'age', 'Sexe': 'sexe'})
+
+
+def _records(frame):
+    return [{k: (v.item() if hasattr(v, 'item') else v) for k, v in row.items()}
+            for row in frame.astype(object).where(frame.notna(), None).to_dict('records')]
+
+
+def _in(frame, col, values):
+    return frame[frame[col].astype(str).isin(values).to_numpy()]
+
+
+def describe(snap):
+    """Index de l'API : version, dernier jour et valeurs acceptées par chaque filtre."""
+    cube = snap.cube
+    return {'version': snap.version, 'jour': str(snap.dep.days[-1])[:10] if snap.dep.days.size else None,
+            'charge_le': snap.loaded_at, 'sources': {k: v and os.path.basename(v) for k, v in snap.sources.items()},
+            'routes': ROUTES,
+            'doses': cube.doses, 'ages': [*cube.age_order, ALL_AGES], 'sexes': [] if cube.by_sex is None else list(map(str, cube.by_sex.index)),
+            'departements': list(map(str, cube.by_dep['Departement'])), 'regions': list(map(str, cube.by_region['Region'])),
+            'zones': list(map(str, cube.by_zone['Zone']))}
+
+
+def kpis(snap, params):
+    """KPIs nationaux du tableau de bord : effectif, population et taux de la même source.
+
+    Ligne 'Tous âges' du fichier national quand il est chargé, sinon somme des
+    départements (``Snapshot.national``).
+    """
+    national = snap.national
+    doses = _pick(params, 'dose', snap.cube.doses)
+    return [{'dose': d, 'effectif': int(national[d]), 'population': round(float(national['Population']), 4),
+             'taux': round(float(national[rate_col(d)]), 4)} for d in doses if d in snap.kpis]
+
+
+def zones(snap, params):
+    cube = snap.cube
+    doses = _pick(params, 'dose', cube.doses)
+    wanted = _pick(params, 'zone', list(map(str, cube.by_zone['Zone'])))
+    return _records(_long(_in(cube.by_zone, 'Zone', wanted), ['Zone'], doses))
+
+
+def regions(snap, params):
+    cube = snap.cube
+    doses = _pick(params, 'dose', cube.doses)
+    frame = cube.by_region.assign(Zone=cube.by_region['Region'].map(REGION_ZONE).to_numpy())
+    wanted = _pick(params, 'region', list(map(str, frame['Region'])), _dep_key)
+    zone = _pick(params, 'zone', list(map(str, cube.by_zone['Zone'])))
+    frame = _in(_in(frame, 'Region', wanted), 'Zone', zone)
+    return _records(_long(frame, ['Region', 'Nom', 'Zone'], doses))
+
+
+def departements(snap, params):
+    cube = snap.cube
+    doses = _pick(params, 'dose', cube.doses)
+    frame = cube.by_dep.assign(Region=cube.dep_region.astype(str).to_numpy())
+    deps = _pick(params, 'departement', list(map(str, frame['Departement'])), _dep_key)
+    regions = _pick(params, 'region', list(map(str, cube.by_region['Region'])), _dep_key)
+    frame = _in(_in(frame, 'Departement', deps), 'Region', regions)
+    return _records(_long(frame, ['Departement', 'Region'], doses))
+
+
+def _national_ages(snap):
+    """Lignes nationales par classe d'âge (dont 'Tous âges'), indexées par classe d'âge.
+
+    Fichier national quand il est chargé, comme ``kpis`` ; sinon somme des
+    départements (cube).
+    """
+    if snap.fra_latest is not None:
+        return snap.fra_latest.set_index(snap.fra_latest['Classe dAge'].astype(str))
+    cube = snap.cube
+    total = cube.national.to_frame(ALL_AGES).T.astype({d: 'int64' for d in cube.doses})
+    return pd.concat([cube.by_age, total])
+
+
+def ages(snap, params):
+    """National sans filtre ``departement`` (même source que ``kpis``), sinon lignes départementales."""
+    cube = snap.cube
+    doses = _pick(params, 'dose', cube.doses)
+    wanted = _pick(params, 'age', [*cube.age_order, ALL_AGES])
+    if not _values(params, 'departement'):
+        national = _national_ages(snap)
+        doses = [d for d in doses if d in national.columns]
+        frame = national.loc[[a for a in wanted if a in national.index], ['Population', *doses, *map(rate_col, doses)]]
+        return _records(_long(frame.rename_axis('Classe dAge').reset_index(), ['Classe dAge'], doses))
+    deps = _pick(params, 'departement', list(map(str, cube.by_dep['Departement'])), _dep_key)
+    frame = _in(_in(snap.dep_latest, 'Departement', deps), 'Classe dAge', wanted)
+    return _records(_long(frame, ['Departement', 'Classe dAge'], doses))
+
+
+def sexes(snap, params):
+    cube = snap.cube
+    if cube.by_sex is None: raise QueryError(503, "Données par sexe indisponibles")
+    doses = _pick(params, 'dose', cube.sex_doses)
+    wanted = _pick(params, 'sexe', list(map(str, cube.by_sex.index)))
+    if not _values(params, 'departement'):
+        return _records(_long(cube.by_sex.loc[wanted].reset_index(), ['Sexe'], doses))
+    deps = _pick(params, 'departement', list(map(str, cube.sex['Departement'].unique())), _dep_key)
+    frame = _in(_in(cube.sex, 'Departement', deps), 'Sexe', wanted)
+    return _records(_long(frame, ['Departement', 'Sexe'], doses))
+
+
+RESOURCES = {'kpis': kpis, 'zones': zones, 'regions': regions, 'departements': departements, 'ages': ages, 'sexes': sexes}
+ROUTES = [f"{PREFIX}/{r}" for r in RESOURCES]
+
+
+def query(snap, resource, params):
+    """Corps JSON (dict) d'une route ; lève ``QueryError`` pour une requête invalide."""
+    if resource == '': return describe(snap)
+    if resource not in RESOURCES: raise QueryError(404, f"Route inconnue : {PREFIX}/{resource}", ROUTES)
+    return {'version': snap.version, 'rows': RESOURCES[resource](snap, params)}
+
+
+def encode(body):
+    return json.dumps(body, ensure_ascii=False, separators=(',', ':'), default=str).encode('utf-8')
+
+
+# ============================================================================
+# 2. Serveur HTTP
+# ============================================================================
+def etag(version):
+    return f'"{version}"'
+
+
+def not_modified(header, tag):
+    """``If-None-Match`` correspond-il à ``tag`` (liste, ``*`` et ETags faibles acceptés) ?"""
+    if not header: return False
+    tags = [t.strip() for t in header.split(',')]
+    return '*' in tags or tag in (t[2:] if t.startswith('W/') else t for t in tags)
+
+
+class ApiHandler(BaseHTTPRequestHandler):
+    """Une requête : instantané pris une fois, ETag vérifié avant de construire le corps."""
+
+    protocol_version = "HTTP/1.1"  # Connexions persistantes (Content-Length toujours envoyé)
+    server_version = "vacsi-api/1"
+    # En-têtes et corps écrits d'un seul envoi (sinon Nagle + ACK différé : ~40 ms par réponse)
+    wbufsize = -1
+    disable_nagle_algorithm = True
+
+    def do_GET(self): self._respond(head=False)
+
+    def do_HEAD(self): self._respond(head=True)
+
+    def _respond(self, head):
+        server = self.server
+        url = urlsplit(self.path)
+        path = url.path.rstrip('/')
+        if path != PREFIX and not path.startswith(PREFIX + '/'):
+            return self._send(404, encode({'error': f"Route inconnue : {url.path}"}), head=head)
+        resource = path[len(PREFIX) + 1:]
+        if resource and resource not in RESOURCES:
+            return self._send(404, encode(QueryError(404, f"Route inconnue : {url.path}", ROUTES).payload()), head=head)
+        snap = server.dataset.current(NEEDS)
+        tag = etag(snap.version)
+        if not_modified(self.headers.get('If-None-Match'), tag):
+            server.not_modified += 1
+            return self._send(304, b'', tag, head=True)
+        params = parse_qs(url.query)
+        key = (snap.version, resource, tuple(sorted((k, tuple(v)) for k, v in params.items())))
+        try:
+            body = server.responses.get(key, lambda: encode(query(snap, resource, params)))
+        except QueryError as e:
+            return self._send(e.status, encode(e.payload()), head=head)
+        self._send(200, body, tag, head=head)
+
+    def _send(self, status, body, tag=None, head=False):
+        self.send_response(status)
+        if tag:
+            self.send_header('ETag', tag)
+            self.send_header('Cache-Control', 'no-cache')  # Le client revalide à chaque fois (304 si inchangé)
+        if status != 304:
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if not head: self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug("%s " + format, self.address_string(), *args)
+
+
+class ApiServer(ThreadingHTTPServer):
+    """Serveur multi-fils autour d'un ``SharedDataset`` ; compteurs pour le test de charge."""
+
+    daemon_threads = True
+
+    def __init__(self, address, dataset, cache_size=RESPONSE_CACHE_SIZE):
+        super().__init__(address, ApiHandler)
+        self.dataset = dataset
+        self.responses = SpecCache(cache_size)
+        self.not_modified = 0
+
+
+def serve(host="127.0.0.1", port=8600, registry=None, watch=WATCH_SECONDS):
+    """Charge l'instantané, démarre la surveillance de ``data/`` et sert jusqu'à l'interruption."""
+    registry = registry or DatasetRegistry()
+    dataset = SharedDataset(registry)
+    start = time.perf_counter()
+    dataset.current(NEEDS)
+    refresher = Refresher(dataset, registry, watch)
+    if watch > 0: refresher.start()
+    server = ApiServer((host, port), dataset)
+    logger.info("API prête sur http://%s:%d%s/ (version %s, chargée en %.1f s)",
+                host, server.server_port, PREFIX, dataset.version, time.perf_counter() - start)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        refresher.stop(timeout=1)
+        server.server_close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m vacsi.api", description="API JSON locale sur les agrégats VACSI.")
+    parser.add_argument('--host', default="127.0.0.1")
+    parser.add_argument('--port', type=int, default=8600)
+    parser.add_argument('--watch', type=float, default=WATCH_SECONDS, help="secondes entre deux relevés de data/ (0 : désactivé)")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(message)s")
+    serve(args.host, args.port, watch=args.watch)
+
+
+if __name__ == '__main__':
+    main()
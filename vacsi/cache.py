@@ -0,0 +1,140 @@
+"""Cache disque colonnaire des historiques nettoyés.
+
+Chaque historique est écrit colonne par colonne en ``.npy`` (codes pour les
+colonnes catégorielles) dans un dossier nommé d'après le fichier source, son
+empreinte et la version du schéma de nettoyage. Un worker à froid relit ces
+colonnes en mémoire projetée (``mmap``) au lieu de réanalyser le CSV ; toute
+modification du fichier ou du nettoyage change la clé et invalide le cache.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+from vacsi import quality
+from vacsi.ingest import SCHEMA_VERSION, TimeSeries
+
+# Par défaut, le cache est rangé à côté du fichier source (``data/.cache``)
+CACHE_DIR = os.environ.get("VACSI_CACHE_DIR")
+DIGEST_BLOCK = 1 << 20
+
+
+# ============================================================================
+# 1. Clé de cache
+# ============================================================================
+def file_digest(filepath):
+    """Empreinte BLAKE2 du contenu du fichier (lecture par blocs de 1 Mo)."""
+    h = hashlib.blake2b(digest_size=16)
+    with open(filepath, 'rb') as f:
+        for block in iter(lambda: f.read(DIGEST_BLOCK), b''): h.update(block)
+    return h.hexdigest()
+
+
+def _stem(filepath):
+    return os.path.splitext(os.path.basename(filepath))[0]
+
+
+def _cache_root(filepath, cache_dir):
+    return cache_dir or CACHE_DIR or os.path.join(os.path.dirname(filepath), ".cache")
+
+
+def cache_path(filepath, digest, cache_dir=None):
+    name = f"{_stem(filepath)}-{digest}-s{SCHEMA_VERSION}"
+    return os.path.join(_cache_root(filepath, cache_dir), name)
+
+
+# ============================================================================
+# 2. Écriture / lecture
+# ============================================================================
+def save_history(hist, path, extra=None):
+    """Écrit une ``TimeSeries`` en colonnes ``.npy`` (écriture atomique par renommage).
+
+    ``extra`` : métadonnées libres (JSON) écrites avec les colonnes, relues par ``load_meta``.
+    """
+    tmp = f"{path}.tmp-{os.getpid()}"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    meta = {'schema': SCHEMA_VERSION, 'keys': hist.keys, 'measures': hist.measures, 'columns': [], 'extra': extra or {},
+            'quality': quality.to_json(hist.quality)}
+    for i, col in enumerate(hist.frame.columns):
+        s = hist.frame[col]
+        entry = {'name': col, 'file': f"c{i}.npy"}
+        if isinstance(s.dtype, pd.CategoricalDtype):
+            entry['categories'] = [str(c) for c in s.cat.categories]
+            values = s.cat.codes.to_numpy()
+        else:
+            values = s.to_numpy()
+            if values.dtype == object: raise TypeError(f"Colonne non cachable : {col}")
+        np.save(os.path.join(tmp, entry['file']), values)
+        meta['columns'].append(entry)
+    np.save(os.path.join(tmp, "days.npy"), hist.days)
+    with open(os.path.join(tmp, "meta.json"), 'w', encoding='utf-8') as f: json.dump(meta, f)
+    shutil.rmtree(path, ignore_errors=True)
+    os.replace(tmp, path)
+
+
+def load_meta(path):
+    """Métadonnées d'une entrée du cache (``extra`` de ``save_history``) ; ``{}`` si absente."""
+    try:
+        with open(os.path.join(path, "meta.json"), encoding='utf-8') as f: meta = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return meta.get('extra', {}) if meta.get('schema') == SCHEMA_VERSION else {}
+
+
+def update_meta(path, extra):
+    """Remplace les métadonnées ``extra`` d'une entrée sans réécrire ses colonnes."""
+    with open(os.path.join(path, "meta.json"), encoding='utf-8') as f: meta = json.load(f)
+    meta['extra'] = extra
+    tmp = os.path.join(path, f"meta.json.tmp-{os.getpid()}")
+    with open(tmp, 'w', encoding='utf-8') as f: json.dump(meta, f)
+    os.replace(tmp, os.path.join(path, "meta.json"))
+
+
+def load_history(path):
+    """Relit une ``TimeSeries`` en mémoire projetée ; ``None`` si le cache est absent ou invalide."""
+    try:
+        with open(os.path.join(path, "meta.json"), encoding='utf-8') as f: meta = json.load(f)
+        if meta.get('schema') != SCHEMA_VERSION: return None
+        cols = {}
+        for entry in meta['columns']:
+            values = np.asarray(np.load(os.path.join(path, entry['file']), mmap_mode='r'))
+            if 'categories' in entry: values = pd.Categorical.from_codes(values, categories=entry['categories'])
+            cols[entry['name']] = values
+        days = np.load(os.path.join(path, "days.npy"))
+    except (OSError, ValueError, KeyError):
+        return None
+    frame = pd.DataFrame(cols, copy=False)
+    hist = TimeSeries(frame, meta['keys'], meta['measures'], presorted=True, days=days)
+    hist.quality = quality.from_json(meta.get('quality'))
+    return hist
+
+
+def _purge_stale(filepath, keep, cache_dir):
+    """Supprime les anciennes entrées du même fichier source (autre empreinte ou schéma)."""
+    root, prefix = _cache_root(filepath, cache_dir), f"{_stem(filepath)}-"
+    if not os.path.isdir(root): return
+    for name in os.listdir(root):
+        full = os.path.join(root, name)
+        if name.startswith(prefix) and '.tmp-' not in name and full != keep:
+            shutil.rmtree(full, ignore_errors=True)
+
+
+def cached_history(reader, filepath, cache_dir=None):
+    """Retourne ``reader(filepath)`` en passant par le cache disque colonnaire."""
+    path = cache_path(filepath, file_digest(filepath), cache_dir)
+    hist = load_history(path)
+    if hist is not None: return hist
+    hist = reader(filepath)
+    if hist is None: return None
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        save_history(hist, path)
+        _purge_stale(filepath, path, cache_dir)
+    except OSError:
+        pass  # Disque en lecture seule : on garde simplement le résultat en mémoire
+    return hist
@@ -0,0 +1,234 @@
+"""Construction des graphiques Altair et cache des specs sérialisées.
+
+Les fonctions ``*_charts`` ne dépendent que du cube, des textes traduits et
+du thème : elles tournent aussi bien dans l'application que dans un script.
+``SpecCache`` mémorise les specs Vega-Lite finales par combinaison
+(page, indicateur, métrique, langue, thème) pour qu'une interaction déjà vue
+ne repasse ni par pandas ni par la sérialisation Altair/JSON.
+"""
+
+import threading
+from collections import OrderedDict
+
+import altair as alt
+
+from vacsi.cube import rate_col
+from vacsi.geo import URL_GEOJSON, URL_GEOJSON_REGIONS
+from vacsi.regions import DEP_REGION, DEP_ZONE, REGION_NAMES, REGION_ZONE, region_departments
+
+COLORS = {
+    "dose_primary": "#3182bd", "dose_booster": "#31a354",
+    "male": "#2171b5", "female": "#cb181d",
+    "avg_line": "#e67e22", "gray_neutral": "#e0e0e0",
+}
+
+# Niveau de détail du fond de carte local (voir vacsi.geo.LEVELS)
+MAP_LEVEL = "medium"
+MAP_LEVEL_REGIONS = "coarse"  # Vue d'ensemble par région : contours fusionnés, moins de points
+# Nombre de départements du classement national
+TOP_N = 20
+
+# Les thèmes Altair sont globaux au processus : la sérialisation est protégée
+_altair_lock = threading.Lock()
+
+
+def _bg(dark): return '#0E1117' if dark else '#ffffff'
+
+
+def _dose_color(dose): return COLORS['dose_booster'] if 'Rappel' in dose else COLORS['dose_primary']
+
+
+# ============================================================================
+# 1. Géographie
+# ============================================================================
+def geo_charts(cube, store, dose, col_target, t, dark, level='Departement', region=None):
+    """Carte choroplèthe et classement, par zone, par région ou par département.
+
+    ``level='Zone'`` : métropole / outre-mer, une forme et une barre par zone.
+    ``level='Region'`` : vue d'ensemble, une forme et une barre par région.
+    ``level='Departement'`` : tous les départements (Top ``TOP_N``), ou seulement
+    ceux de ``region`` quand on explore une région.
+    """
+    chart_bg = _bg(dark)
+    scheme = 'tealblues' if 'Rappel' in dose else 'yelloworangered'
+    color_bar = _dose_color(dose)
+
+    if level == 'Zone':
+        df_viz, key, label, codes = cube.by_zone, 'Zone', 'Zone', None
+        threshold, title = cube.zone_mean[col_target], f"{t['geo_rank_zones']} ({dose})"
+    elif level == 'Region':
+        df_viz, key, label, codes = cube.by_region, 'Region', 'Nom', None
+        threshold, title = cube.region_mean[col_target], f"{t['geo_rank_regions']} ({dose})"
+    elif region is not None:
+        df_viz, key, label, codes = cube.departments(region), 'Departement', 'Departement', region_departments(region)
+        # Comparaison à la moyenne de la région explorée
+        threshold = float(cube.by_region.loc[cube.by_region['Region'] == region, col_target].iloc[0])
+        title = f"{REGION_NAMES[region]} ({dose})"
+    else:
+        df_viz, key, label, codes = cube.by_dep, 'Departement', 'Departement', None
+        threshold, title = cube.dep_mean[col_target], f"Top {TOP_N} ({dose})"
+    # Classement : seules les lignes affichées partent vers le navigateur
+    bars = cube.dep_rank.top(col_target, TOP_N) if level == 'Departement' and region is None else df_viz
+
+    # Fond de carte local : features jointes côté serveur (spec autonome, sans lookup)
+    if store is not None:
+        if level == 'Zone':
+            values = store.join(df_viz, key, col_target, level=MAP_LEVEL_REGIONS, groups=DEP_ZONE)
+        elif level == 'Region':
+            values = store.join(df_viz, key, col_target, level=MAP_LEVEL_REGIONS, groups=DEP_REGION, names=REGION_NAMES)
+        else:
+            values = store.join(df_viz, key, col_target, level=MAP_LEVEL, codes=codes)
+        geo, field = alt.Data(values=values), 'properties.value'
+    else:
+        url = URL_GEOJSON_REGIONS if level in ('Region', 'Zone') else URL_GEOJSON
+        geo, field = alt.Data(url=url, format=alt.DataFormat(property='features', type='json')), col_target
+    sel = alt.selection_point(fields=['properties.nom'], on='mouseover', empty='none')
+
+    map_c = alt.Chart(geo).mark_geoshape(stroke='white', strokeWidth=0.5).encode(
+        color=alt.Color(f'{field}:Q', scale=alt.Scale(scheme=scheme), legend=alt.Legend(title=t['axis_rate'])),
+        opacity=alt.condition(sel, alt.value(1), alt.value(0.7)),
+        tooltip=['properties.nom:N', alt.Tooltip(f'{field}:Q', title=col_target, format=',.1f')]
+    ).add_params(sel).properties(width=600, height=500, background=chart_bg).project(type='identity', reflectY=True)
+    if store is None:
+        if codes is not None: map_c = map_c.transform_filter(alt.FieldOneOfPredicate(field='properties.code', oneOf=codes))
+        lookup, lookup_key = df_viz, key
+        if level == 'Zone':
+            # Contours régionaux distants : chaque région prend la valeur de sa zone
+            zone_values = cube.by_zone.set_index('Zone')[col_target]
+            lookup = cube.by_region[['Region']].assign(**{col_target: cube.by_region['Region'].map(REGION_ZONE).map(zone_values).to_numpy()})
+            lookup_key = 'Region'
+        map_c = map_c.transform_lookup(lookup='properties.code', from_=alt.LookupData(lookup, lookup_key, [col_target]))
+
+    bar_c = alt.Chart(bars).mark_bar().encode(
+        x=alt.X(col_target, title=""), y=alt.Y(label, sort='-x'),
+        color=alt.condition(alt.datum[col_target] >= threshold, alt.value(color_bar), alt.value('#BDC3C7')),
+        tooltip=[label, col_target]
+    ).properties(height=500, title=title, background=chart_bg)
+
+    if not dark:
+        map_c = map_c.configure_legend(labelColor='#333', titleColor='#333')
+        bar_c = bar_c.configure_axis(labelColor='#333', titleColor='#333').configure_title(color='#333')
+    return map_c, bar_c
+
+
+# ============================================================================
+# 2. Démographie
+# ============================================================================
+def _boxplot(stats, x, color, y_title, t):
+    """Boîte à moustaches min-max dessinée à partir des cinq nombres précalculés."""
+    base = alt.Chart(stats).encode(x=x)
+    whisker = base.mark_rule(color=color).encode(y=alt.Y('min:Q', title=y_title), y2='max:Q')
+    box = base.mark_bar(size=14, color=color).encode(
+        y='q1:Q', y2='q3:Q',
+        tooltip=[
+            alt.Tooltip('max:Q', title=t['tooltip_max'], format='.1f'),
+            alt.Tooltip('min:Q', title=t['tooltip_min'], format='.1f'),
+            alt.Tooltip('median:Q', title=t['tooltip_med'], format='.1f')
+        ]
+    )
+    median = base.mark_tick(color='white', size=14).encode(y='median:Q')
+    return whisker + box + median
+
+
+def demo_age_charts(cube, dose, t, dark):
+    """Barres empilées vaccinés / non-vaccinés et dispersion par classe d'âge."""
+    chart_bg, txt_col, color = _bg(dark), 'white' if dark else 'black', _dose_color(dose)
+    sort_order = cube.age_order
+
+    melt = cube.age_props[dose].assign(L=lambda m: m['S'].map({'V': t['prop_vaccinated'], 'NV': t['prop_non_vaccinated']}))
+    base = alt.Chart(melt).encode(x=alt.X('Classe dAge', sort=sort_order), y=alt.Y('C', stack="normalize", axis=alt.Axis(format='%')), order=alt.Order('S', sort='descending'))
+    bars = base.mark_bar().encode(color=alt.Color('L', scale=alt.Scale(range=[color, COLORS['gray_neutral']]), legend=alt.Legend(title="Statut")))
+    text = base.mark_text(dy=10, color=txt_col).encode(text=alt.Text('P', format='.0%'), opacity=alt.condition(alt.datum.P > 0.05, alt.value(1), alt.value(0)))
+    chart_comb = (bars + text).properties(height=350, background=chart_bg).interactive()
+    if not dark: chart_comb = chart_comb.configure_axis(labelColor='#333', titleColor='#333').configure_legend(labelColor='#333', titleColor='#333')
+
+    nat = cube.age_rates(dose)
+    # FIX ALTAIR LAYER : Properties a la fin
+    box = _boxplot(cube.age_box[dose], alt.X('Classe dAge', sort=sort_order), color, rate_col(dose), t)
+    tick = alt.Chart(nat).mark_tick(color=COLORS['avg_line'], thickness=3, size=40).encode(x=alt.X('Classe dAge', sort=sort_order), y='R')
+    final_chart = (box + tick).properties(background=chart_bg)
+    if not dark: final_chart = final_chart.configure_axis(labelColor='#333', titleColor='#333')
+    return chart_comb, final_chart
+
+
+def demo_sex_charts(cube, dose, t, dark):
+    """Taux national par sexe et dispersion départementale par sexe."""
+    chart_bg, color = _bg(dark), _dose_color(dose)
+
+    nat = cube.sex_rates(dose)
+    bar = alt.Chart(nat).mark_bar().encode(
+        x=alt.X('Sexe', title=t['axis_sex']), y=alt.Y('R', title=t['axis_rate']),
+        color=alt.Color('Sexe', scale=alt.Scale(range=[COLORS['male'], COLORS['female']])),
+        tooltip=['Sexe', alt.Tooltip('R', format='.1f')]
+    ).properties(height=300, background=chart_bg)
+    if not dark:
+        bar = bar.configure_axis(labelColor='#333', titleColor='#333').configure_legend(labelColor='#333', titleColor='#333')
+
+    # FIX ALTAIR LAYER
+    final_chart = _boxplot(cube.sex_box[dose], alt.X('Sexe', title=t['axis_sex']), color, t['axis_rate'], t).properties(background=chart_bg)
+    if not dark: final_chart = final_chart.configure_axis(labelColor='#333', titleColor='#333')
+    return bar, final_chart
+
+
+# ============================================================================
+# 3. Évolution
+# ============================================================================
+def evolution_chart(serie, dep, age, dose, t, dark):
+    """Courbe d'un département et d'une classe d'âge dans le temps."""
+    col_taux = rate_col(dose)
+    line = alt.Chart(serie).mark_line(point=True, color=_dose_color(dose)).encode(
+        x=alt.X('jour:T', title=t['axis_date']), y=alt.Y(f'{col_taux}:Q', title=t['axis_rate']),
+        tooltip=[alt.Tooltip('jour:T', title=t['axis_date']), alt.Tooltip(f'{dose}:Q', format=','), alt.Tooltip(f'{col_taux}:Q', format='.1f')]
+    ).properties(height=400, title=f"{dep} - {age} ({dose})", background=_bg(dark))
+    if not dark: line = line.configure_axis(labelColor='#333', titleColor='#333').configure_title(color='#333')
+    return line
+
+
+# ============================================================================
+# 4. Sérialisation et cache des specs
+# ============================================================================
+def to_spec(chart, dark):
+    """Spec Vega-Lite (dict JSON) d'un graphique, avec le thème Altair de l'application.
+
+    En mode clair, Streamlit remplace le thème 'default' par 'none' ; on fait
+    de même pour obtenir la même spec que ``st.altair_chart``.
+    """
+    with _altair_lock, alt.themes.enable("dark" if dark else "none"):
+        return chart.to_dict()
+
+
+class SpecCache:
+    """Cache LRU borné de specs sérialisées, avec compteurs de succès / échecs."""
+
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self.hits = self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, build):
+        """Retourne la valeur associée à ``key``, en la construisant avec ``build()`` au premier appel."""
+        with self._lock:
+            if key in self._data:
+                self.hits += 1
+                self._data.move_to_end(key)
+                return self._data[key]
+            self.misses += 1
+        value = build()
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize: self._data.popitem(last=False)
+        return value
+
+    def __contains__(self, key): return key in self._data
+
+    def __len__(self): return len(self._data)
+
+    def clear(self):
+        with self._lock: self._data.clear()
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {'hits': self.hits, 'misses': self.misses, 'size': len(self._data),
+                'maxsize': self.maxsize, 'hit_rate': self.hits / total if total else 0.0}
@@ -0,0 +1,119 @@
+"""Cube d'agrégats précalculés (stade vaccinal × âge × département × sexe).
+
+Le cube est construit une seule fois par jeu de données : les pages n'y font
+plus que des lectures par clé, sans ``groupby`` à chaque interaction.
+"""
+
+import copy
+import uuid
+
+import numpy as np
+
+from vacsi.ingest import AGE_ORDER
+from vacsi.quantiles import box_stats
+from vacsi.ranking import RankingIndex
+from vacsi.regions import REGION_NAMES, hierarchy
+
+ALL_AGES = 'Tous âges'
+
+
+def rate_col(dose):
+    return f"Taux {dose} (%)"
+
+
+def _with_rates(sums, doses):
+    """Ajoute les taux agrégés (somme des doses / somme des populations), plafonnés à 100 %."""
+    pop = sums['Population'].replace(0, np.nan)
+    for d in doses:
+        sums[rate_col(d)] = (sums[d] / pop * 100).clip(upper=100).fillna(0)
+    return sums
+
+
+def _rollup(by_dep, keys, doses):
+    """Sommes des effectifs par ``keys`` (région ou zone) et taux recalculés à ce niveau."""
+    counts = by_dep[['Population', *doses]].astype('float64')
+    sums = counts.groupby(keys.to_numpy(), dropna=True).sum()
+    return _with_rates(sums, doses)
+
+
+class Cube:
+    """Sommes et taux nationaux, par âge, par département (et région, zone) et par sexe."""
+
+    def __init__(self, dep, sex, doses, version=None, sex_version=None):
+        # Identifiants des jeux de données : servent de clés aux caches construits sur le cube
+        self.version = version or uuid.uuid4().hex[:12]
+        self.doses = list(doses)
+
+        # --- Départements (lignes 'Tous âges') ---
+        all_ages = dep[dep['Classe dAge'] == ALL_AGES]
+        self.by_dep = all_ages[['Departement', 'Population', *self.doses, *map(rate_col, self.doses)]].reset_index(drop=True)
+        self.dep_mean = {c: float(self.by_dep[c].mean()) for c in self.by_dep.columns if c != 'Departement'}
+
+        # --- Régions et zones : mêmes sommes, niveaux plus grossiers ---
+        levels = hierarchy(self.by_dep['Departement'])
+        self.dep_region = levels['Region']
+        self.by_region = _rollup(self.by_dep, levels['Region'], self.doses).rename_axis('Region').reset_index()
+        self.by_region.insert(1, 'Nom', self.by_region['Region'].map(REGION_NAMES))
+        self.by_zone = _rollup(self.by_dep, levels['Zone'], self.doses).rename_axis('Zone').reset_index()
+        self.region_mean = {c: float(self.by_region[c].mean()) for c in self.by_region.columns if c not in ('Region', 'Nom')}
+        self.zone_mean = {c: float(self.by_zone[c].mean()) for c in self.by_zone.columns if c != 'Zone'}
+
+        # --- Classement des départements (Top N, rang d'un département) ---
+        self.dep_rank = RankingIndex(self.by_dep, 'Departement', [*self.doses, *map(rate_col, self.doses)])
+
+        # --- National ---
+        self.national = _with_rates(all_ages[['Population', *self.doses]].sum().to_frame().T, self.doses).iloc[0]
+        self.kpis = {d: self.national[d] for d in self.doses}
+
+        # --- Âges (hors 'Tous âges') ---
+        self.ages = dep[dep['Classe dAge'] != ALL_AGES].reset_index(drop=True)
+        by_age = self.ages.groupby('Classe dAge', observed=True)[['Population', *self.doses]].sum()
+        self.age_order = [a for a in AGE_ORDER if a in by_age.index]
+        self.by_age = _with_rates(by_age.reindex(self.age_order), self.doses)
+        self.age_props = {d: self._proportions(d) for d in self.doses}
+        self.age_box = self._split_box(box_stats(self.ages, 'Classe dAge', [rate_col(d) for d in self.doses]))
+
+        self._set_sex(sex, sex_version)
+
+    def _set_sex(self, sex, sex_version):
+        """Partie sexe du cube, indépendante des agrégats départementaux."""
+        self.sex, self.sex_version = sex, sex_version
+        self.sex_doses = [d for d in self.doses if sex is not None and d in sex.columns]
+        self.by_sex, self.sex_box = None, {}
+        if sex is not None:
+            self.by_sex = _with_rates(sex.groupby('Sexe', observed=True)[['Population', *self.sex_doses]].sum(), self.sex_doses)
+            self.sex_box = self._split_box(box_stats(sex, 'Sexe', [rate_col(d) for d in self.sex_doses]))
+
+    def with_sex(self, sex, sex_version=None):
+        """Copie du cube avec une autre partie sexe ; les agrégats départementaux sont partagés."""
+        out = copy.copy(self)
+        out._set_sex(sex, sex_version)
+        return out
+
+    def _split_box(self, stats):
+        """Statistiques de boîte par stade vaccinal (une petite table par dose)."""
+        return {d: stats[stats['Indicateur'] == rate_col(d)].drop(columns='Indicateur').reset_index(drop=True)
+                for d in self.doses if rate_col(d) in set(stats['Indicateur'])}
+
+    def _proportions(self, dose):
+        """Vaccinés / non-vaccinés par classe d'âge, au format long attendu par les barres empilées."""
+        agg = self.by_age[[dose, 'Population']].reset_index()
+        # Effectifs non signés : soustraction en entiers signés
+        agg['V'] = agg[dose].astype('int64'); agg['NV'] = (agg['Population'].astype('int64') - agg['V']).clip(lower=0)
+        melt = agg.melt('Classe dAge', ['V', 'NV'], 'S', 'C')
+        total = melt['Classe dAge'].map(agg.set_index('Classe dAge')[['V', 'NV']].sum(axis=1))
+        melt['P'] = melt['C'] / total.astype(float)
+        return melt
+
+    def departments(self, region):
+        """Lignes départementales d'une région (niveau inférieur de l'exploration)."""
+        return self.by_dep[(self.dep_region == region).to_numpy()].reset_index(drop=True)
+
+    def age_rates(self, dose):
+        """Taux national par classe d'âge pour ``dose`` (colonnes 'Classe dAge', 'R')."""
+        return self.by_age[rate_col(dose)].rename('R').reset_index()
+
+    def sex_rates(self, dose):
+        """Sommes et taux national par sexe pour ``dose`` (colonnes 'Sexe', dose, 'Population', 'R')."""
+        out = self.by_sex[[dose, 'Population', rate_col(dose)]].rename(columns={rate_col(dose): 'R'})
+        return out.reset_index()
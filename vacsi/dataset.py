@@ -0,0 +1,322 @@
+"""Jeu de données partagé par toutes les sessions, en lecture seule.
+
+Un ``Snapshot`` regroupe tout ce que lisent les pages (historiques, dernier
+jour, cube) ; il est construit entièrement, ses tableaux NumPy sont marqués
+non modifiables, puis il est publié d'un seul coup par ``SharedDataset``.
+Un lecteur prend la référence courante une fois par rendu et n'a donc jamais
+sous les yeux un mélange de deux versions : un rafraîchissement n'altère pas
+l'ancien instantané, il le remplace.
+
+Contrairement à ``st.cache_data`` (copie désérialisée à chaque appel), les
+sessions reçoivent les mêmes objets : aucune copie par rendu. Chaque type de
+fichier n'est chargé que la première fois qu'une page le demande.
+"""
+
+import hashlib
+import logging
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from vacsi import quality
+from vacsi.cache import cached_history, file_digest
+from vacsi.cube import ALL_AGES, Cube
+from vacsi.incremental import incremental_history
+from vacsi.ingest import read_dep_history, read_fra_history, read_sex_history
+from vacsi.reconcile import drift_summary, reconcile
+
+logger = logging.getLogger("vacsi.dataset")
+
+# Rapprochement départements / national à chaque nouvelle version (0 pour désactiver)
+RECONCILE = os.environ.get("VACSI_RECONCILE", "1") != "0"
+# Ingestion incrémentale : un nouveau cliché ne renettoie que ses jours nouveaux ou révisés
+INCREMENTAL = os.environ.get("VACSI_INCREMENTAL", "0") == "1"
+# Part minimale des départements de la version servie qu'une nouvelle version doit garder
+MIN_DEP_SHARE = 0.9
+
+
+def _readonly(arr):
+    if arr.flags.writeable:
+        arr = arr.view(); arr.flags.writeable = False
+    return arr
+
+
+def freeze(frame):
+    """Même tableau, colonnes numériques et codes catégoriels en lecture seule (sans copie).
+
+    Une écriture accidentelle dans un tableau partagé lève une erreur au lieu
+    de modifier les données de toutes les sessions.
+    """
+    cols = {}
+    for c in frame.columns:
+        s = frame[c]
+        if isinstance(s.dtype, pd.CategoricalDtype):
+            cols[c] = pd.Categorical.from_codes(_readonly(s.array.codes), dtype=s.dtype)
+        elif s.dtype == object:
+            cols[c] = s.array
+        else:
+            cols[c] = _readonly(s.to_numpy())
+    return pd.DataFrame(cols, copy=False)
+
+
+def freeze_history(hist):
+    """Historique publié : tableau, dates et jours en lecture seule, comme les derniers jours."""
+    if hist is None: return None
+    hist.frame = freeze(hist.frame)
+    hist._jour = hist.frame['jour'].to_numpy()
+    hist.days = _readonly(np.asarray(hist.days))
+    return hist
+
+
+def snapshot_version(digests):
+    """Version déterministe : même fichiers sources -> même version, dans tous les processus."""
+    return hashlib.blake2b("|".join(f"{k}={v}" for k, v in sorted(digests.items())).encode(), digest_size=6).hexdigest()
+
+
+# ============================================================================
+# 1. Instantané
+# ============================================================================
+class Part:
+    """Un fichier source chargé : chemin, empreinte et historique (``None`` si indisponible).
+
+    ``error`` : motif de l'indisponibilité d'un fichier présent mais illisible.
+    """
+
+    def __init__(self, kind, path, digest, data, error=None):
+        self.kind, self.path, self.digest, self.data, self.error = kind, path, digest, data, error
+
+
+def load_part(kind, path):
+    """Lit un fichier source via le cache disque (ou le stock incrémental, ``VACSI_INCREMENTAL=1``).
+
+    Le fichier âge × département est obligatoire ; un fichier sexe ou national
+    absent ou illisible donne une partie vide : les pages qui en dépendent affichent
+    alors leur message d'indisponibilité.
+    """
+    if kind == 'dep_age':
+        if path is None: raise FileNotFoundError(2, "Aucun fichier âge × département", None)
+        return Part(kind, path, file_digest(path), _history(kind, path))
+    if path is None: return Part(kind, None, None, None)
+    try:
+        return Part(kind, path, file_digest(path), _history(kind, path))
+    except (OSError, ValueError, KeyError) as e:
+        logger.warning("Jeu de données %s indisponible (%s) : %s", kind, path, e)
+        return Part(kind, path, None, None, f"{type(e).__name__}: {e}")
+
+
+LOADERS = {'dep_age': read_dep_history, 'dep_sex': read_sex_history, 'fra_age': read_fra_history}
+
+
+def _history(kind, path):
+    """Historique publié dans un instantané : toujours gelé, qu'il vienne du CSV, du cache ou du stock."""
+    hist = incremental_history(kind, path) if INCREMENTAL else cached_history(LOADERS[kind], path)
+    return freeze_history(hist)
+
+
+class Snapshot:
+    """Version figée du jeu de données : parties chargées, dernier jour et cube.
+
+    Les parties sont chargées à la demande ; ajouter ou remplacer une partie
+    produit un nouvel instantané (``with_parts``) qui réutilise le reste.
+
+    Les KPIs viennent du fichier national quand il est chargé (il compte aussi
+    les personnes sans département de résidence), sinon de la somme des
+    départements du cube. ``national`` est la ligne retenue : effectifs,
+    population et taux d'une même source.
+    """
+
+    def __init__(self, parts, cube=None):
+        self.parts = dict(parts)
+        self.sources = {k: p.path for k, p in self.parts.items()}
+        self.digests = {k: p.digest for k, p in self.parts.items()}
+        self.version = snapshot_version(self.digests)
+        self.loaded_at = time.time()
+        self.dep, self.sex = self._data('dep_age'), self._data('dep_sex')
+        self.measures = list(self.dep.measures)
+        self.dep_latest = freeze(self.dep.latest())
+        self.sex_latest = None if self.sex is None else freeze(self.sex.latest())
+        if cube is None:
+            cube = Cube(self.dep_latest, self.sex_latest, self.measures,
+                        version=self.part_version('dep_age'), sex_version=self.part_version('dep_sex'))
+        self.cube = cube
+        self._set_fra()
+
+    def _set_fra(self):
+        """Dernier jour national, KPIs et rapprochement avec les départements."""
+        self.fra = self._data('fra_age')
+        self.fra_latest = None if self.fra is None else freeze(self.fra.latest())
+        self.national, self.kpis = self.cube.national, self.cube.kpis
+        self.reconciliation = None
+        if self.fra_latest is None: return
+        national = self.fra_latest[self.fra_latest['Classe dAge'] == ALL_AGES]
+        if not national.empty:
+            self.national = national.iloc[0]
+            self.kpis = {d: self.national[d] for d in self.cube.doses if d in national.columns}
+        if RECONCILE:
+            self.reconciliation = reconcile(self.dep_latest, self.fra_latest, self.measures)
+            drift = drift_summary(self.reconciliation)
+            if not drift.empty:
+                worst = drift.iloc[0]
+                logger.warning("Écart départements / national au-delà de la tolérance : %d ligne(s), max %s %s %+.1f%%",
+                               len(drift), worst['Classe dAge'], worst['Indicateur'], worst['ecart_relatif'] * 100)
+
+    def _data(self, kind):
+        part = self.parts.get(kind)
+        return None if part is None else part.data
+
+    def part_version(self, kind):
+        """Version d'une seule partie (le cube est indexé par partie, pas par instantané)."""
+        part = self.parts.get(kind)
+        return None if part is None or part.digest is None else snapshot_version({kind: part.digest})
+
+    def has(self, kind): return kind in self.parts
+
+    def quality_report(self):
+        """Contrôles qualité des fichiers chargés : une ligne par (fichier, contrôle).
+
+        Compteurs calculés à l'ingestion et gardés avec l'historique (cache
+        disque) : rien n'est recalculé ici. Un fichier illisible donne une
+        ligne 'chargement' avec le motif.
+        """
+        frames = []
+        for kind, part in self.parts.items():
+            if part.data is None:
+                if part.error: frames.append(pd.DataFrame([{'fichier': kind, 'check': 'chargement', 'motif': part.error}]))
+                continue
+            hist = part.data
+            frames.append(quality.summary(hist.quality, len(hist), quality.checks_for(hist.frame.columns)).assign(fichier=kind))
+        if not frames: return pd.DataFrame(columns=['fichier', 'check'])
+        out = pd.concat(frames, ignore_index=True)
+        return out[['fichier', *[c for c in out.columns if c != 'fichier']]]
+
+    def with_parts(self, parts):
+        """Nouvel instantané où ``parts`` remplacent ou complètent les parties actuelles."""
+        merged = {**self.parts, **parts}
+        if 'dep_age' in parts: return Snapshot(merged)
+        snap = Snapshot.__new__(Snapshot)
+        snap.__dict__.update(self.__dict__)
+        snap.parts = merged
+        snap.sources = {k: p.path for k, p in merged.items()}
+        snap.digests = {k: p.digest for k, p in merged.items()}
+        snap.version, snap.loaded_at = snapshot_version(snap.digests), time.time()
+        if 'dep_sex' in parts:
+            snap.sex = snap._data('dep_sex')
+            snap.sex_latest = None if snap.sex is None else freeze(snap.sex.latest())
+            snap.cube = self.cube.with_sex(snap.sex_latest, snap.part_version('dep_sex'))
+        if 'fra_age' in parts: snap._set_fra()
+        return snap
+
+
+def validate(snap, previous=None):
+    """Contrôles avant publication d'une nouvelle version ; liste des problèmes (vide si valide).
+
+    Un cliché tronqué ou régressif ne doit pas remplacer la version servie :
+    dernier jour vide, date antérieure à la version actuelle, départements
+    disparus en nombre.
+    """
+    problems = []
+    if snap.dep_latest.empty: return ["historique âge × département vide"]
+    if previous is None: return problems
+    days, old_days = snap.dep.days, previous.dep.days
+    if days.size and old_days.size and days[-1] < old_days[-1]:
+        problems.append(f"dernier jour {str(days[-1])[:10]} antérieur à la version servie ({str(old_days[-1])[:10]})")
+    n, old_n = len(snap.cube.by_dep), len(previous.cube.by_dep)
+    if n < old_n * MIN_DEP_SHARE:
+        problems.append(f"{n} départements au lieu de {old_n}")
+    return problems
+
+
+# ============================================================================
+# 2. Publication, chargement paresseux et rafraîchissement
+# ============================================================================
+class SharedDataset:
+    """Instantané courant, complété à la demande et remplacé atomiquement.
+
+    ``sources`` : dict type -> chemin, ou registre (``DatasetRegistry``) dont
+    ``discover()`` est rappelé à chaque rafraîchissement pour suivre les
+    nouveaux clichés.
+    """
+
+    def __init__(self, sources, loader=load_part):
+        self._registry = sources if hasattr(sources, 'discover') else None
+        self._fixed = None if self._registry else dict(sources)
+        self._loader = loader
+        self._current = None
+        self._lock = threading.Lock()  # Sérialise les chargements, pas les lectures
+        self.history = []              # (version, horodatage) des instantanés publiés
+        self.rejected = None           # Dernière version refusée par validate()
+
+    @property
+    def sources(self):
+        return self._registry.discover() if self._registry else dict(self._fixed)
+
+    def current(self, needs=('dep_age',)):
+        """Instantané à utiliser pour tout un rendu, contenant au moins les types ``needs``.
+
+        Les types manquants sont chargés à ce moment-là (une seule fois pour
+        tout le processus), puis un instantané complété est publié.
+        """
+        needs = ('dep_age', *needs)
+        snap = self._current
+        if snap is not None and all(snap.has(k) for k in needs): return snap
+        with self._lock:
+            snap = self._current
+            missing = [k for k in dict.fromkeys(needs) if snap is None or not snap.has(k)]
+            if missing:
+                sources = self.sources
+                parts = {k: self._loader(k, sources.get(k)) for k in missing}
+                self._publish(Snapshot(parts) if snap is None else snap.with_parts(parts))
+            return self._current
+
+    @property
+    def version(self):
+        snap = self._current
+        return None if snap is None else snap.version
+
+    def _changed(self, snap, sources, force=False):
+        """Types chargés dont le fichier a changé (nouveau cliché ou contenu modifié)."""
+        changed = []
+        for kind, part in snap.parts.items():
+            path = sources.get(kind)
+            try:
+                if force or path != part.path or (path is not None and file_digest(path) != part.digest):
+                    changed.append(kind)
+            except OSError:
+                pass  # Fichier en cours de remplacement : on garde la version actuelle
+        return changed
+
+    def stale(self):
+        """Vrai si un fichier chargé a changé ou si un cliché plus récent est apparu."""
+        snap = self._current
+        return snap is None or bool(self._changed(snap, self.sources))
+
+    def refresh(self, force=False):
+        """Recharge les types déjà chargés dont la source a changé ; True si une version est publiée.
+
+        La nouvelle version est entièrement construite et validée (``validate``)
+        avant publication : rejetée, elle est notée dans ``rejected`` et
+        l'instantané courant reste servi.
+        """
+        with self._lock:
+            snap = self._current
+            if snap is None: return False  # Rien de chargé : le premier rendu chargera la version du moment
+            sources = self.sources
+            changed = self._changed(snap, sources, force)
+            if not changed: return False
+            new = snap.with_parts({k: self._loader(k, sources.get(k)) for k in changed})
+            problems = validate(new, snap)
+            if problems:
+                self.rejected = {'version': new.version, 'at': time.time(), 'problems': problems}
+                logger.warning("Version %s rejetée : %s", new.version, " ; ".join(problems))
+                return False
+            self._publish(new)
+            return True
+
+    def _publish(self, snap):
+        # Une seule affectation : les lecteurs voient l'ancien ou le nouvel instantané, jamais un mélange
+        self._current = snap
+        self.history.append((snap.version, snap.loaded_at))
+        logger.info("Jeu de données publié : version %s", snap.version)
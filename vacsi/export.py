@@ -0,0 +1,217 @@
+"""Export statique : chaque état des pages en Vega-Lite JSON, HTML et KPIs JSON.
+
+Toutes les combinaisons page × langue × thème × indicateur (× métrique et
+niveau pour la géographie) sont rendues hors Streamlit, réparties sur un pool
+de processus, puis publiées d'un coup dans le dossier de sortie : un simple
+serveur de fichiers peut servir le résultat pendant les pics de trafic.
+
+Usage : python -m vacsi.export --out site [--workers 4]
+
+Arborescence produite ::
+
+    site/index.html                    liens vers chaque langue et thème
+    site/kpis.json                     KPIs nationaux et version des données
+    site/manifest.json                 liste des fichiers, version, durée
+    site/<fr|en>/<dark|light>/index.html
+    site/<fr|en>/<dark|light>/intro.html
+    site/<fr|en>/<dark|light>/geo/<dose>-<metrique>-<niveau>.html (+ .map/.bar.vl.json)
+    site/<fr|en>/<dark|light>/demo/<age|sexe>-<dose>.html (+ .vl.json)
+"""
+
+import argparse
+import datetime
+import html
+import json
+import os
+import re
+import shutil
+import time
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+
+from vacsi.charts import demo_age_charts, demo_sex_charts, geo_charts, to_spec
+from vacsi.cube import rate_col
+from vacsi.dataset import SharedDataset
+from vacsi.geo import load_geometry
+from vacsi.i18n import TRANSLATIONS
+from vacsi.registry import DatasetRegistry
+
+LANGS = {'Français': 'fr', 'English': 'en'}
+THEMES = {True: 'dark', False: 'light'}
+# Niveau de la carte -> argument ``level`` de geo_charts
+ZOOMS = {'zones': 'Zone', 'regions': 'Region', 'departements': 'Departement'}
+NEEDS = ('dep_age', 'dep_sex', 'fra_age')
+
+VEGA_SCRIPTS = ("https://cdn.jsdelivr.net/npm/vega@5",
+                "https://cdn.jsdelivr.net/npm/vega-lite@5",
+                "https://cdn.jsdelivr.net/npm/vega-embed@6")
+
+# Instantané chargé une fois par processus du pool (voir _init_worker)
+_worker = {}
+
+
+def slug(text):
+    """'Rappel Bivalent' -> 'rappel-bivalent' (noms de fichiers sans accents)."""
+    text = unicodedata.normalize('NFKD', str(text)).encode('ascii', 'ignore').decode()
+    return re.sub(r'[^a-z0-9]+', '-', text.lower()).strip('-')
+
+
+# ============================================================================
+# 1. Pages HTML
+# ============================================================================
+def _dump(spec):
+    return json.dumps(spec, separators=(',', ':'), ensure_ascii=False, default=str)
+
+
+def _script_json(spec):
+    return _dump(spec).replace("</", "<\\/")
+
+
+def page_html(title, dark, body='', specs=()):
+    """Page autonome : specs intégrées, rendues par vega-embed côté navigateur."""
+    bg, fg = ('#0E1117', '#FAFAFA') if dark else ('#FFFFFF', '#333333')
+    scripts = "".join(f'<script src="{u}"></script>' for u in VEGA_SCRIPTS) if specs else ""
+    divs = "".join(f'<div id="vis{i}"></div>' for i in range(len(specs)))
+    # '</' échappé : une chaîne des données ne peut pas fermer la balise <script>
+    embeds = "".join(f'vegaEmbed("#vis{i}", {_script_json(s)}, {{actions: false}});' for i, s in enumerate(specs))
+    return (f'<!DOCTYPE html><html><head><meta charset="utf-8"><title>{html.escape(title)}</title>{scripts}'
+            f'<style>body{{background:{bg};color:{fg};font-family:"Segoe UI",sans-serif;margin:2rem}}'
+            f'a{{color:#3a8ee6}}</style></head><body><h1>{html.escape(title)}</h1>{body}{divs}'
+            + (f'<script>{embeds}</script>' if embeds else '') + '</body></html>')
+
+
+def kpi_cards(kpis):
+    items = []
+    for label, value in kpis.items():
+        if label == "Rappel Biv.": label = "Rappel Bivalent"
+        items.append(f'<li><b>{html.escape(label)}</b> : {int(value):,}</li>')
+    return f'<ul>{"".join(items)}</ul>'
+
+
+def _write(root, rel, text):
+    path = os.path.join(root, rel)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f: f.write(text)
+    return {'path': rel, 'bytes': len(text.encode('utf-8'))}
+
+
+def _write_state(root, rel, title, dark, charts, names):
+    """Une vue : ses specs Vega-Lite (une par graphique) et la page HTML qui les affiche."""
+    specs = [to_spec(c, dark) for c in charts]
+    out = [_write(root, f"{rel}.{n}.vl.json", _dump(s)) for n, s in zip(names, specs)]
+    out.append(_write(root, f"{rel}.html", page_html(title, dark, specs=specs)))
+    return out
+
+
+# ============================================================================
+# 2. Rendu d'une tâche (dans un processus du pool)
+# ============================================================================
+def _init_worker(sources, root):
+    """Charge l'instantané (cache disque : lecture projetée, pas de nouveau parsing)."""
+    _worker['snap'] = SharedDataset(sources).current(NEEDS)
+    _worker['store'] = load_geometry()
+    _worker['root'] = root
+
+
+def jobs(cube):
+    """Tâches (page, langue, thème, dose) : une par graphique à paramètre unique."""
+    out = []
+    for lang in LANGS:
+        for dark in THEMES:
+            out.append(('intro', lang, dark, None))
+            out += [('geo', lang, dark, d) for d in cube.doses]
+            out += [('demo', lang, dark, d) for d in cube.doses]
+    return out
+
+
+def render(job):
+    """Écrit les fichiers d'une tâche ; retourne leurs entrées de manifeste."""
+    page, lang, dark, dose = job
+    snap, store, root = _worker['snap'], _worker['store'], _worker['root']
+    cube, t = snap.cube, TRANSLATIONS[lang]
+    base = f"{LANGS[lang]}/{THEMES[dark]}"
+
+    if page == 'intro':
+        return [_write(root, f"{base}/intro.html", page_html(t['intro_title'], dark, kpi_cards(snap.kpis)))]
+
+    out = []
+    if page == 'geo':
+        for metric, col in (('taux', rate_col(dose)), ('total', dose)):
+            for zoom, level in ZOOMS.items():
+                charts = geo_charts(cube, store, dose, col, t, dark, level)
+                out += _write_state(root, f"{base}/geo/{slug(dose)}-{metric}-{zoom}",
+                                    f"{t['geo_title']} — {dose}", dark, charts, ('map', 'bar'))
+    elif page == 'demo':
+        out += _write_state(root, f"{base}/demo/age-{slug(dose)}", f"{t['demo_title']} — {dose}", dark,
+                            demo_age_charts(cube, dose, t, dark), ('proportions', 'box'))
+        if dose in cube.sex_doses:
+            out += _write_state(root, f"{base}/demo/sexe-{slug(dose)}", f"{t['demo_title']} — {dose}", dark,
+                                demo_sex_charts(cube, dose, t, dark), ('box',))
+    return out
+
+
+# ============================================================================
+# 3. Export complet
+# ============================================================================
+def _index(root, files):
+    """Pages d'accueil : une par langue et thème, plus la racine."""
+    out, roots = [], []
+    for lang, code in LANGS.items():
+        for dark, theme in THEMES.items():
+            base = f"{code}/{theme}/"
+            links = [f['path'][len(base):] for f in files if f['path'].startswith(base) and f['path'].endswith('.html')]
+            body = "<ul>" + "".join(f'<li><a href="{html.escape(p)}">{html.escape(p[:-5])}</a></li>' for p in sorted(links)) + "</ul>"
+            out.append(_write(root, f"{base}index.html", page_html(f"{TRANSLATIONS[lang]['intro_title']} ({theme})", dark, body)))
+            roots.append(f'<li><a href="{base}index.html">{code} / {theme}</a></li>')
+    out.append(_write(root, "index.html", page_html("COVID-19 Tracker France", True, f"<ul>{''.join(roots)}</ul>")))
+    return out
+
+
+def export(out_dir, sources=None, workers=None):
+    """Rend toutes les vues dans ``out_dir`` ; retourne le manifeste.
+
+    Le rendu se fait dans un dossier temporaire voisin, puis remplace
+    ``out_dir`` : le serveur de fichiers ne sert jamais un export partiel.
+    """
+    start = time.perf_counter()
+    sources = DatasetRegistry().discover() if sources is None else sources
+    # Premier chargement dans le parent : remplit le cache disque pour les processus du pool
+    snap = SharedDataset(sources).current(NEEDS)
+    out_dir = os.path.abspath(out_dir)
+    tmp = f"{out_dir}.tmp-{os.getpid()}"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+
+    todo = jobs(snap.cube)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(sources, tmp)) as pool:
+        files = [f for written in pool.map(render, todo) for f in written]
+
+    kpis = {'version': snap.version, 'sources': {k: v and os.path.basename(v) for k, v in snap.sources.items()},
+            'kpis': {d: int(v) for d, v in snap.kpis.items()}}
+    files.append(_write(tmp, "kpis.json", json.dumps(kpis, ensure_ascii=False, indent=1)))
+    files += _index(tmp, files)
+    manifest = {'version': snap.version, 'created': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+                'jobs': len(todo), 'seconds': round(time.perf_counter() - start, 2),
+                'bytes': sum(f['bytes'] for f in files), 'files': files}
+    _write(tmp, "manifest.json", json.dumps(manifest, ensure_ascii=False, indent=1))
+
+    # Publication : l'ancien export est écarté puis supprimé après le renommage
+    old = f"{out_dir}.old-{os.getpid()}"
+    if os.path.exists(out_dir): os.replace(out_dir, old)
+    os.replace(tmp, out_dir)
+    shutil.rmtree(old, ignore_errors=True)
+    return manifest
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m vacsi.export", description="Export statique de toutes les vues.")
+    parser.add_argument('--out', default="site", help="dossier de sortie (remplacé en fin d'export)")
+    parser.add_argument('--workers', type=int, default=None, help="processus du pool (défaut : nombre de cœurs)")
+    args = parser.parse_args(argv)
+    manifest = export(args.out, workers=args.workers)
+    print(f"{len(manifest['files'])} fichiers, {manifest['bytes'] / 2**20:.1f} Mo, "
+          f"{manifest['jobs']} tâches en {manifest['seconds']:.1f} s -> {args.out} (version {manifest['version']})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,181 @@
+"""Géométries départementales locales, simplifiées et quantifiées.
+
+Le fond de carte est lu depuis ``data/departements.geojson`` (récupéré une
+fois avec ``python -m vacsi.geo fetch``) au lieu d'être téléchargé par chaque
+navigateur ; en son absence, la carte garde le GeoJSON distant. Un fond
+marqué ``schematic`` (vérifications hors ligne, ``benchmarks/schematic.py``)
+n'est jamais servi. Les géométries sont indexées par code département, simplifiées
+(Douglas-Peucker) à plusieurs niveaux de détail et quantifiées sur une grille
+à la manière de TopoJSON. La carte reçoit directement les features jointes
+avec l'indicateur choisi : la spec est autonome et bien plus légère.
+"""
+
+import argparse
+import functools
+import json
+import os
+import urllib.request
+
+import numpy as np
+
+URL_GEOJSON = "https://raw.githubusercontent.com/gregoiredavid/france-geojson/master/departements-version-simplifiee.geojson"
+URL_GEOJSON_REGIONS = "https://raw.githubusercontent.com/gregoiredavid/france-geojson/master/regions-version-simplifiee.geojson"
+GEO_FILE = os.path.join("data", "departements.geojson")
+
+# Tolérance de simplification (degrés) par niveau de détail
+LEVELS = {'fine': 0.0, 'medium': 0.004, 'coarse': 0.015}
+# Taille de la grille de quantification (comme le paramètre ``quantization`` de TopoJSON)
+QUANTIZATION = 10_000
+
+
+# ============================================================================
+# 1. Simplification et quantification
+# ============================================================================
+def simplify_ring(ring, tolerance):
+    """Douglas-Peucker sur un anneau fermé ; conserve au moins 4 points."""
+    if tolerance <= 0 or len(ring) <= 4: return ring
+    keep = np.zeros(len(ring), dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(ring) - 1)]
+    while stack:
+        a, b = stack.pop()
+        if b - a < 2: continue
+        seg, pts = ring[b] - ring[a], ring[a + 1:b] - ring[a]
+        norm = np.hypot(*seg)
+        if norm == 0: dist = np.hypot(pts[:, 0], pts[:, 1])
+        else: dist = np.abs(seg[0] * pts[:, 1] - seg[1] * pts[:, 0]) / norm
+        i = int(np.argmax(dist))
+        if dist[i] > tolerance:
+            keep[a + 1 + i] = True
+            stack += [(a, a + 1 + i), (a + 1 + i, b)]
+    if keep.sum() < 4:
+        # Anneau dégénéré : on garde quatre points régulièrement espacés
+        keep[np.linspace(0, len(ring) - 1, 4).astype(int)] = True
+    return ring[keep]
+
+
+def quantize_ring(ring, origin, step):
+    """Aligne les points sur la grille et supprime les doublons consécutifs créés."""
+    q = np.round((ring - origin) / step)
+    dup = np.r_[False, (np.diff(q, axis=0) == 0).all(axis=1)]
+    q = q[~dup]
+    if len(q) < 4: return None
+    decimals = max(0, int(np.ceil(-np.log10(step))))
+    return np.round(origin + q * step, decimals)
+
+
+# ============================================================================
+# 2. Magasin de géométries
+# ============================================================================
+class GeometryStore:
+    """Polygones des départements indexés par code, déclinés par niveau de détail."""
+
+    def __init__(self, collection):
+        self.names, self._polygons = {}, {}
+        for f in collection['features']:
+            code, geom = f['properties']['code'], f['geometry']
+            polys = [geom['coordinates']] if geom['type'] == 'Polygon' else geom['coordinates']
+            self.names[code] = f['properties'].get('nom', code)
+            self._polygons[code] = [[np.asarray(r, dtype=float) for r in p] for p in polys]
+        pts = np.concatenate([r for polys in self._polygons.values() for p in polys for r in p])
+        self.origin = pts.min(axis=0)
+        self.step = float((pts.max(axis=0) - self.origin).max()) / QUANTIZATION
+        self._levels = {}
+
+    @classmethod
+    def from_file(cls, path=GEO_FILE):
+        with open(path, encoding='utf-8') as f: return cls(json.load(f))
+
+    @property
+    def codes(self): return list(self.names)
+
+    def geometries(self, level='medium'):
+        """Géométries GeoJSON (simplifiées, quantifiées) par code, calculées une fois par niveau."""
+        if level not in self._levels:
+            tol, out = LEVELS[level], {}
+            for code, polys in self._polygons.items():
+                coords = []
+                for p in polys:
+                    rings = [quantize_ring(simplify_ring(r, tol), self.origin, self.step) for r in p]
+                    if rings[0] is None: continue
+                    coords.append([r.tolist() for r in rings if r is not None])
+                out[code] = {'type': 'MultiPolygon', 'coordinates': coords}
+            self._levels[level] = out
+        return self._levels[level]
+
+    def grouped(self, level, groups):
+        """Géométries fusionnées par groupe (``groups`` : code département -> code du groupe).
+
+        Les polygones des départements d'un même groupe sont réunis dans un
+        seul MultiPolygon : une région devient une seule feature.
+        """
+        key = (level, frozenset(groups.items()))
+        if key not in self._levels:
+            out = {}
+            for code, geom in self.geometries(level).items():
+                if code in groups: out.setdefault(groups[code], []).extend(geom['coordinates'])
+            self._levels[key] = {g: {'type': 'MultiPolygon', 'coordinates': c} for g, c in out.items()}
+        return self._levels[key]
+
+    def join(self, table, key, column, level='medium', codes=None, groups=None, names=None):
+        """Features prêtes pour Vega : géométrie + nom + valeur de ``column`` pour chaque code.
+
+        Avec ``groups`` (et ``names`` pour leurs libellés), une feature par
+        groupe au lieu d'une par département.
+        """
+        geoms = self.geometries(level) if groups is None else self.grouped(level, groups)
+        names = self.names if names is None else names
+        # Arrondi : les taux float32 ne doivent pas s'écrire 73.30000305175781 dans le JSON
+        values = dict(zip(table[key].astype(str), table[column].astype(float).round(4)))
+        wanted = list(geoms) if codes is None else [c for c in codes if c in geoms]
+        return [{'type': 'Feature', 'geometry': geoms[c],
+                 'properties': {'code': c, 'nom': names.get(c, c), 'value': values.get(c)}}
+                for c in wanted]
+
+    def payload_bytes(self, level):
+        return len(json.dumps(list(self.geometries(level).values()), separators=(',', ':')))
+
+
+@functools.lru_cache(maxsize=4)
+def load_geometry(path=GEO_FILE):
+    """Magasin partagé par le processus ; ``None`` si le fond de carte local est absent ou schématique."""
+    if not os.path.exists(path): return None
+    with open(path, encoding='utf-8') as f: collection = json.load(f)
+    # Limites inventées : la carte garde alors les contours réels (URL_GEOJSON)
+    if collection.get('schematic'): return None
+    return GeometryStore(collection)
+
+
+def fetch_geojson(dest=GEO_FILE, url=URL_GEOJSON):
+    """Télécharge le fond de carte une fois pour l'embarquer dans ``data/``."""
+    with urllib.request.urlopen(url, timeout=60) as r: payload = r.read()
+    json.loads(payload)  # Refuse d'écrire une réponse qui n'est pas du JSON
+    tmp = f"{dest}.tmp"
+    with open(tmp, 'wb') as f: f.write(payload)
+    os.replace(tmp, dest)
+    return dest
+
+
+# ============================================================================
+# 3. Ligne de commande
+# ============================================================================
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m vacsi.geo", description="Fond de carte local des départements.")
+    sub = parser.add_subparsers(dest='cmd', required=True)
+    p_fetch = sub.add_parser('fetch', help="télécharge le GeoJSON des départements dans data/")
+    p_fetch.add_argument('--url', default=URL_GEOJSON)
+    p_fetch.add_argument('--dest', default=GEO_FILE)
+    p_stats = sub.add_parser('stats', help="taille de la géométrie par niveau de détail")
+    p_stats.add_argument('--path', default=GEO_FILE)
+    args = parser.parse_args(argv)
+
+    if args.cmd == 'fetch':
+        print(f"Écrit : {fetch_geojson(args.dest, args.url)}")
+    else:
+        store = GeometryStore.from_file(args.path)
+        print(f"Source : {os.path.getsize(args.path):,} octets, {len(store.codes)} départements")
+        for level in LEVELS: print(f"  {level:<7} {store.payload_bytes(level):>10,} octets")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,217 @@
+"""Textes de l'interface, par langue.
+
+Module sans dépendance : l'application, l'export statique et les benchmarks
+partagent les mêmes libellés sans exécuter le script Streamlit.
+"""
+
+TRANSLATIONS = {
+    'Français': {
+        'nav_title': "Navigation",
+        'nav_intro': "Synthèse et Contexte",
+        'nav_geo': "Géographie",
+        'nav_demo': "Démographie",
+        'about': "Auteur",
+        'prof': "Encadrant",
+        
+        'kpi_title': "Panorama National France (Situation à date)",
+        'intro_title': "Vaccination COVID-19 en France",
+        'intro_subtitle': "Analyse comparative de la couverture vaccinale française par territoire et démographie",
+        
+        # TEXTES COMPLETS RESTAURÉS
+        'tab_narrative': "Analyse et Synthèse",
+        'tab_data': "Données et Méthodologie",
+        'tab_quality': "Qualité",
+        'intro_narrative_text': """
+        ### Problématique Centrale
+        La campagne de vaccination contre la COVID-19 **en France** a mobilisé des ressources massives sur tout le territoire.
+        **Cependant, cette couverture a-t-elle été équitable pour tous les Français ?**
+
+        ### Structure de l'Analyse
+        Ce tableau de bord décompose cette question en deux dimensions complémentaires :
+        
+        **Dimension 1 : Variations Territoriales**
+        Certains départements ont-ils bénéficié d'une meilleure couverture que d'autres ? Existe-t-il des patterns régionaux ou une corrélation avec la densité de population ?
+        
+        **Dimension 2 : Variations Démographiques**
+        Comment la vaccination a-t-elle progressé selon l'âge et le sexe ? Quels groupes présentent les taux d'adhésion les plus élevés ou les plus faibles ?
+
+        ### Contexte Temporel
+        * **Janvier 2021 - Juin 2021** : Phase initiale (Doses 1 & 2, ciblage prioritaires)
+        * **Juillet 2021** : Catalyseur majeur avec le Pass Sanitaire
+        * **2022-2023** : Expansion vers les doses de rappel et vaccins adaptés
+        """,
+        
+        'intro_data_text': "Données issues de **data.gouv.fr** (Santé Publique France).",
+        'dq_limitations': "**Limitation technique :** Les taux > 100% (dus aux biais de recensement INSEE) sont plafonnés à 100% pour la lisibilité.",
+        'dq_source': "**Source :** Santé Publique France (Fichiers VACSI)",
+        'dq_license': "**Licence :** Licence Ouverte / Open Licence version 2.0",
+        'dq_checks_title': "Contrôles à l'ingestion",
+        'dq_checks_caption': "Lignes corrigées ou écartées par le nettoyage, comptées à chaque chargement des fichiers.",
+        'dq_columns': {'fichier': "Fichier", 'check': "Contrôle", 'lignes': "Lignes", 'part': "Part (%)",
+                       'jours': "Jours", 'premier': "Premier jour", 'dernier': "Dernier jour", 'motif': "Motif"},
+        'dq_checks': {
+            'effectif_invalide': "Effectif vide ou négatif (mis à 0)",
+            'taux_sup_100': "Taux > 100 % (plafonné)", 'taux_non_fini': "Taux non calculable (mis à 0)",
+            'age_inconnu': "Classe d'âge inconnue (écartée)", 'sexe_inconnu': "Sexe inconnu (écarté)",
+            'population_nulle': "Population nulle", 'departement_inconnu': "Département inconnu",
+            'cumul_decroissant': "Cumul en baisse d'un jour à l'autre", 'chargement': "Fichier illisible",
+        },
+        'dq_files': {'dep_age': "Âge × département", 'dep_sex': "Sexe × département", 'fra_age': "Âge, France entière"},
+
+        'geo_title': "Analyse Territoriale",
+        'geo_desc': "Comparaison de la couverture vaccinale par département.",
+        'geo_insight': "**Analyse :** On observe des disparités régionales significatives. Les départements urbains présentent des taux de couverture supérieurs à certains territoires moins denses.",
+        'geo_implication': "**Interprétation :** Les zones à faible densité de population présentent des défis logistiques importants pour l'accès à la vaccination.",
+        'geo_choose_dose': "Indicateur :",
+        'geo_map_title': "Carte de France",
+        'geo_rank_title': "Classement des départements",
+        'geo_rank_regions': "Régions",
+        'geo_rank_zones': "Métropole / outre-mer",
+        'geo_zoom': "Niveau :",
+        'geo_my_rank': "Où se situe mon département ?",
+        'geo_my_dep': "Département :",
+        'geo_all_zones': "France — métropole / outre-mer",
+        'geo_all_regions': "France — régions",
+        'geo_all_deps': "France — tous les départements",
+        
+        'demo_title': "Analyse Démographique",
+        'demo_desc': "Couverture vaccinale par groupe d'âge et sexe.",
+        'demo_insight_age': "**Analyse Âge :** Les groupes âgés (65+) présentent une couverture élevée (>90%), tandis que la couverture en doses de rappel diminue dans les groupes jeunes adultes.",
+        'demo_implication_age': "**Interprétation :** Les stratégies de communication et d'accès doivent être adaptées aux caractéristiques sociodémographiques des différents groupes d'âge.",
+        'demo_insight_sex': "**Analyse Sexe :** Les taux de couverture présentent une distribution similaire entre hommes et femmes, indiquant une adhésion équilibrée entre les sexes.",
+        
+        'demo_type_label': "Vue par :",
+        'demo_type_age': "Âge",
+        'demo_type_sex': "Sexe",
+        'demo_choose_dose': "Stade vaccinal :",
+        'prop_title': "Couverture par génération",
+        'prop_vaccinated': "Vaccinés",
+        'prop_non_vaccinated': "Non-vaccinés",
+        'pie_title': "Poids démographique des vaccinés",
+        'demo_boxplot_title': "Écarts de couverture (Dispersion)",
+        'demo_boxplot_text': "Plus la boîte est grande, plus l'inégalité entre les départements est forte pour cet âge.",
+        
+        'tooltip_nat': "Moyenne Nationale",
+        'axis_rate': "Taux (%)",
+        'axis_dep': "Département",
+        'axis_pop': "Population",
+        'theme_label': "Mode Nuit",
+        'cap_note': "Note : Les taux sont calculés par rapport à la population ciblée pour chaque stade vaccinal.",
+        'tooltip_max': "Max",
+        'tooltip_min': "Min",
+        'tooltip_med': "Médiane",
+        'axis_sex': "Sexe",
+
+        'nav_evol': "Évolution",
+        'evol_title': "Évolution dans le temps",
+        'evol_desc': "Progression de la couverture vaccinale jour par jour, pour un département et une classe d'âge.",
+        'evol_dep': "Département :",
+        'evol_age': "Classe d'âge :",
+        'evol_period': "Période :",
+        'evol_single_day': "Un seul jour est disponible dans les données chargées.",
+        'axis_date': "Date"
+    },
+    'English': {
+        'nav_title': "Navigation",
+        'nav_intro': "Summary & Context",
+        'nav_geo': "Geography",
+        'nav_demo': "Demographics",
+        'about': "Author",
+        'prof': "Supervisor",
+        
+        'kpi_title': "National Overview - France",
+        'intro_title': "COVID-19 Vaccination Dashboard (France)",
+        'intro_subtitle': "Comparative analysis of French vaccination coverage by territory and demographics",
+        
+        'tab_narrative': "Analysis & Summary",
+        'tab_data': "Data & Methods",
+        'tab_quality': "Quality",
+        'intro_narrative_text': """
+        ### Central Research Question
+        The COVID-19 vaccination campaign in France mobilized massive resources across all territories.
+        **However, was this coverage equitable for all citizens?**
+
+        ### Analysis Structure
+        This dashboard addresses this question across two complementary dimensions:
+        
+        **Dimension 1: Territorial Variations** Did certain departments achieve better coverage than others? Are there regional patterns or correlations with population density?
+        
+        **Dimension 2: Demographic Variations** How did vaccination progress according to age and gender? Which groups showed the highest or lowest uptake rates?
+
+        ### Temporal Context
+        * **January 2021 - June 2021**: Initial phase (Doses 1 & 2, targeting priority groups)
+        * **July 2021**: Major catalyst with the Health Pass implementation
+        * **2022-2023**: Expansion to booster doses and adapted vaccines
+        """,
+        
+        'intro_data_text': "Data sourced from **data.gouv.fr** (Public Health France).",
+        'dq_limitations': "**Technical Limit:** Rates > 100% (due to census bias) are capped at 100% for readability.",
+        'dq_source': "**Source:** Public Health France (VACSI files)",
+        'dq_license': "**License:** Open License version 2.0",
+        'dq_checks_title': "Ingestion checks",
+        'dq_checks_caption': "Rows corrected or dropped by cleaning, counted each time the files are loaded.",
+        'dq_columns': {'fichier': "File", 'check': "Check", 'lignes': "Rows", 'part': "Share (%)",
+                       'jours': "Days", 'premier': "First day", 'dernier': "Last day", 'motif': "Reason"},
+        'dq_checks': {
+            'effectif_invalide': "Empty or negative count (set to 0)",
+            'taux_sup_100': "Rate > 100% (capped)", 'taux_non_fini': "Rate not computable (set to 0)",
+            'age_inconnu': "Unknown age group (dropped)", 'sexe_inconnu': "Unknown sex (dropped)",
+            'population_nulle': "Zero population", 'departement_inconnu': "Unknown department",
+            'cumul_decroissant': "Cumulative count decreasing day to day", 'chargement': "Unreadable file",
+        },
+        'dq_files': {'dep_age': "Age × department", 'dep_sex': "Sex × department", 'fra_age': "Age, all France"},
+        
+        'geo_title': "Territorial Analysis",
+        'geo_desc': "Vaccination coverage comparison by department.",
+        'geo_insight': "**Analysis:** Significant regional disparities are observed. Urban departments show higher coverage rates than some less densely populated territories.",
+        'geo_implication': "**Interpretation:** Low-density population zones face substantial logistical challenges for vaccination access.",
+        'geo_choose_dose': "Indicator:",
+        'geo_map_title': "Map of France",
+        'geo_rank_title': "Ranking by Department",
+        'geo_rank_regions': "Regions",
+        'geo_rank_zones': "Mainland / overseas",
+        'geo_zoom': "Level:",
+        'geo_my_rank': "Where does my department rank?",
+        'geo_my_dep': "Department:",
+        'geo_all_zones': "France — mainland / overseas",
+        'geo_all_regions': "France — regions",
+        'geo_all_deps': "France — all departments",
+        
+        'demo_title': "Demographic Analysis",
+        'demo_desc': "Vaccination coverage by age group and gender.",
+        'demo_insight_age': "**Age Analysis:** Older age groups (65+) show high coverage (>90%), while booster dose coverage decreases in younger adult cohorts.",
+        'demo_implication_age': "**Interpretation:** Communication and access strategies must be adapted to the sociodemographic characteristics of different age groups.",
+        'demo_insight_sex': "**Gender Analysis:** Coverage rates show similar distribution between men and women, indicating balanced uptake across genders.",
+        
+        'demo_type_label': "View by:",
+        'demo_type_age': "Age",
+        'demo_type_sex': "Gender",
+        'demo_choose_dose': "Stage:",
+        'prop_title': "Coverage by Generation",
+        'prop_vaccinated': "Vaccinated",
+        'prop_non_vaccinated': "Not Vaccinated",
+        'pie_title': "Demographic weight of vaccinated",
+        'demo_boxplot_title': "Coverage Gaps (Dispersion)",
+        'demo_boxplot_text': "The wider the box, the higher the inequality between departments for this age group.",
+        
+        'tooltip_nat': "National Average",
+        'axis_rate': "Rate (%)",
+        'axis_dep': "Department",
+        'axis_pop': "Population",
+        'theme_label': "Night Mode",
+        'cap_note': "Note: Rates are calculated relative to the target population for each vaccination stage.",
+        'tooltip_max': "Max",
+        'tooltip_min': "Min",
+        'tooltip_med': "Median",
+        'axis_sex': "Gender",
+
+        'nav_evol': "Evolution",
+        'evol_title': "Evolution over Time",
+        'evol_desc': "Day-by-day progression of vaccination coverage for one department and age group.",
+        'evol_dep': "Department:",
+        'evol_age': "Age group:",
+        'evol_period': "Period:",
+        'evol_single_day': "Only one day is available in the loaded data.",
+        'axis_date': "Date"
+    }
+}
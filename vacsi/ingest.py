@@ -0,0 +1,482 @@
+"""Ingestion des fichiers VACSI : historique complet, lecture par blocs.
+
+Les fichiers VACSI contiennent une ligne par (clé, jour) depuis décembre 2020.
+Plutôt que de tout lire pour ne garder que le dernier jour, on lit le CSV par
+blocs avec des types compacts, on nettoie chaque bloc au fil de l'eau et on
+conserve tout l'historique dans une ``TimeSeries`` interrogeable par période.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from vacsi import quality
+
+# ============================================================================
+# 1. Constantes
+# ============================================================================
+CHUNK_ROWS = 250_000
+
+# À incrémenter à chaque changement du nettoyage : invalide les caches disque
+SCHEMA_VERSION = 5
+
+AGE_MAPPING = {
+    0: 'Tous âges', 4: '0-4 ans', 9: '5-9 ans', 11: '10-11 ans', 17: '12-17 ans',
+    24: '18-24 ans', 29: '25-29 ans', 39: '30-39 ans', 49: '40-49 ans',
+    59: '50-59 ans', 64: '60-64 ans', 69: '65-69 ans', 74: '70-74 ans',
+    79: '75-79 ans', 80: '80 ans et +'
+}
+AGE_ORDER = ['Tous âges', '0-4 ans', '5-9 ans', '10-11 ans', '12-17 ans', '18-24 ans', '25-29 ans',
+             '30-39 ans', '40-49 ans', '50-59 ans', '60-64 ans', '65-69 ans',
+             '70-74 ans', '75-79 ans', '80 ans et +']
+
+# Colonnes sources possibles pour chaque stade vaccinal (la première trouvée gagne)
+DEP_COUNT_MAPPING = {
+    'Dose 1': ['n_tot_dose1', 'n_cum_dose1'], 'Dose 2': ['n_tot_dose2', 'n_cum_dose2', 'n_tot_complet'],
+    'Rappel 1': ['n_tot_rappel', 'n_cum_rappel'], 'Rappel 2': ['n_tot_2_rappel'],
+    'Rappel 3': ['n_tot_3_rappel'], 'Rappel Bivalent': ['n_tot_rappel_biv']
+}
+SEX_COUNT_MAPPING = {
+    'Dose 1': ['n_tot_dose1'],
+    'Dose 2': ['n_tot_dose2', 'n_tot_complet'],
+    'Rappel 1': ['n_tot_rappel'],
+    'Rappel 2': ['n_tot_2_rappel'],
+    'Rappel 3': ['n_tot_3_rappel'],
+    'Rappel Bivalent': ['n_tot_rappel_biv']
+}
+SEX_RATE_MAPPING = {
+    'Dose 1': ['couv_tot_dose1'],
+    'Dose 2': ['couv_tot_complet'],
+    'Rappel 1': ['couv_tot_rappel'],
+    'Rappel 2': ['couv_tot_2_rappel'],
+    'Rappel 3': ['couv_tot_3_rappel'],
+    'Rappel Bivalent': ['couv_tot_rappel_biv']
+}
+
+# Codes départementaux valides : métropole (dont 2A/2B), DROM puis COM
+DEP_CODES = ([f"{i:02d}" for i in range(1, 20)] + ['2A', '2B'] + [f"{i:02d}" for i in range(21, 96)]
+             + ['971', '972', '973', '974', '975', '976', '977', '978', '986', '987', '988'])
+
+SEX_LABELS = {'1': 'Homme', '2': 'Femme'}
+SEXES = ['Femme', 'Homme']
+
+# Schéma compact : clés catégorielles, effectifs entiers non signés 32 bits,
+# taux et populations flottants 32 bits (les taux sont au dixième dans les sources)
+COUNT_DTYPE = 'uint32'
+# Effectifs lus en flottants : une cellule vide ou négative est corrigée par _counts, pas rejetée
+RAW_COUNT_DTYPE = 'float64'
+FLOAT_DTYPE = 'float32'
+CATEGORY_COLUMNS = ('dep', 'clage_vacsi', 'sexe')
+KEY_COLUMNS = (*CATEGORY_COLUMNS, 'jour')
+
+
+# ============================================================================
+# 2. Lecture par blocs
+# ============================================================================
+def fix_dep_code(c: any) -> str:
+    c = str(c).strip()
+    return "0" + c if len(c) == 1 else c
+
+
+def normalize_dep_codes(values):
+    """Version vectorisée de ``fix_dep_code`` ; retourne un ``Categorical``.
+
+    La normalisation n'est appliquée qu'aux valeurs distinctes (une centaine),
+    puis propagée aux lignes par réindexation des codes. Les catégories sont
+    ``DEP_CODES`` suivies des codes inconnus, repérables par
+    ``unknown_dep_codes``.
+    """
+    cat = values.array if isinstance(values, pd.Series) and isinstance(values.dtype, pd.CategoricalDtype) else pd.Categorical(values)
+    fixed = [fix_dep_code(c).upper() for c in cat.categories]
+    extra = sorted(set(fixed) - set(DEP_CODES))
+    categories = pd.Index(DEP_CODES + extra)
+    # Le -1 final fait correspondre les valeurs manquantes (code -1) à elles-mêmes
+    indexer = np.append(categories.get_indexer(fixed), -1).astype(np.int16)
+    return pd.Categorical.from_codes(indexer[cat.codes], categories=categories)
+
+
+def unknown_dep_codes(values):
+    """Codes départementaux présents mais absents de ``DEP_CODES``, avec leur effectif."""
+    counts = pd.Series(values).value_counts()
+    return counts[~counts.index.isin(DEP_CODES) & (counts > 0)]
+
+
+def _read_header(filepath):
+    """Retourne les noms de colonnes d'origine et leur version en minuscules."""
+    header = pd.read_csv(filepath, delimiter=';', nrows=0).columns
+    return list(header), [c.lower() for c in header]
+
+
+def _match(columns, mapping):
+    """Associe chaque indicateur à la première colonne source disponible."""
+    found = {}
+    for n, opts in mapping.items():
+        c = next((x for x in columns if x in opts), None)
+        if c: found[n] = c
+    return found
+
+
+def _dtype_for(col):
+    if col in CATEGORY_COLUMNS: return 'category'
+    if col in KEY_COLUMNS: return str
+    if col.startswith('n_'): return RAW_COUNT_DTYPE
+    return FLOAT_DTYPE
+
+
+def _iter_chunks(filepath, wanted, chunksize):
+    """Lit uniquement les colonnes ``wanted`` (noms en minuscules), bloc par bloc.
+
+    ``filepath`` peut aussi être un fichier ouvert (``io.BytesIO``), relu depuis le début.
+    """
+    raw, lower = _read_header(filepath)
+    if hasattr(filepath, 'seek'): filepath.seek(0)
+    usecols = [r for r, l in zip(raw, lower) if l in wanted]
+    dtype = {r: _dtype_for(r.lower()) for r in usecols}
+    reader = pd.read_csv(filepath, delimiter=';', usecols=usecols, dtype=dtype, chunksize=chunksize)
+    for chunk in reader:
+        chunk.columns = chunk.columns.str.lower()
+        yield chunk
+
+
+def _concat(chunks, categorical):
+    """Concatène les blocs en conservant les colonnes catégorielles compactes."""
+    if not chunks: return pd.DataFrame()
+    cats = {c: union_categoricals([ch[c] for ch in chunks], ignore_order=True) for c in categorical}
+    data = pd.concat([ch.drop(columns=list(categorical)) for ch in chunks], ignore_index=True)
+    for c, v in cats.items(): data[c] = pd.Categorical(v)
+    return data
+
+
+def _parse_jour(chunk):
+    if 'jour' in chunk.columns:
+        chunk['jour'] = pd.to_datetime(chunk['jour'], format='%Y-%m-%d', errors='coerce')
+    else:
+        chunk['jour'] = pd.NaT
+    return chunk
+
+
+# ============================================================================
+# 3. Nettoyage (appliqué à chaque bloc)
+# ============================================================================
+def _recode(values, label, categories):
+    """Applique ``label`` aux seules valeurs distinctes ; ``Categorical`` sur ``categories``.
+
+    Les valeurs dont le libellé n'est pas dans ``categories`` deviennent manquantes.
+    """
+    cat = values.array if isinstance(values.dtype, pd.CategoricalDtype) else pd.Categorical(values)
+    labels = [label(c) for c in cat.categories]
+    indexer = np.append(pd.Index(categories).get_indexer(labels), -1).astype(np.int16)
+    return pd.Categorical.from_codes(indexer[cat.codes], categories=categories)
+
+
+def _age_label(code):
+    try: return AGE_MAPPING.get(int(float(code)))
+    except ValueError: return None
+
+
+def _sex_label(code): return SEX_LABELS.get(str(code).replace('.0', ''))
+
+
+def _valid_rows(data, key, tally=None, check=None, expected=None):
+    """Écarte les lignes sans libellé (copie seulement s'il y en a).
+
+    Les lignes écartées sont comptées dans ``tally`` sous ``check``, sauf
+    celles de ``expected`` (agrégats écartés volontairement).
+    """
+    keep = data[key].notna().to_numpy()
+    if keep.all(): return data
+    if tally is not None: tally.add(check, data['jour'].to_numpy(), ~keep if expected is None else ~keep & ~expected)
+    return data[keep].reset_index(drop=True)
+
+
+def _is_code(values, codes):
+    """Masque des lignes dont le code source est dans ``codes`` (calculé sur les valeurs distinctes)."""
+    cat = values.array if isinstance(values.dtype, pd.CategoricalDtype) else pd.Categorical(values)
+    flags = np.append([str(c).replace('.0', '') in codes for c in cat.categories], False)
+    return flags[cat.codes]
+
+
+def _finite_rates(rate, upper=100, fixed=None):
+    """Taux (tableau float32 modifié en place) : NaN/inf -> 0, plafonné à ``upper``.
+
+    ``fixed`` : masques par contrôle qualité (``taux_non_fini``, ``taux_sup_100``),
+    complétés des lignes corrigées.
+    """
+    bad = ~np.isfinite(rate)
+    rate[bad] = 0
+    if fixed is not None:
+        _flag(fixed, 'taux_non_fini', bad)
+        _flag(fixed, 'taux_sup_100', rate > upper)
+    np.minimum(rate, upper, out=rate)
+    return rate
+
+
+def _flag(fixed, check, mask):
+    if check in fixed: fixed[check] |= mask
+    else: fixed[check] = mask
+
+
+def _tally_fixed(tally, jour, fixed):
+    if tally is None: return
+    for check, mask in fixed.items(): tally.add(check, jour, mask)
+
+
+def _counts(values, fixed=None):
+    """Effectifs en ``uint32`` (manquants et négatifs -> 0).
+
+    ``fixed`` : masques par contrôle qualité, complétés sous ``effectif_invalide``
+    des lignes manquantes, négatives ou hors de la plage ``uint32``.
+    """
+    arr = np.asarray(values, dtype=np.float64)
+    if fixed is not None: _flag(fixed, 'effectif_invalide', ~((arr >= 0) & (arr <= np.iinfo(np.uint32).max)))
+    arr = np.nan_to_num(arr, nan=0, posinf=0, neginf=0)
+    return np.clip(np.round(arr), 0, np.iinfo(np.uint32).max).astype(np.uint32)
+
+
+def _clean_counts(data, names, fixed):
+    """Colonnes d'effectifs lues en flottants -> ``uint32`` corrigés."""
+    for c in names: data[c] = _counts(data[c].to_numpy(), fixed)
+
+
+def clean_dep_chunk(chunk, found, tally=None):
+    """Nettoie un bloc du fichier âge × département (toutes dates)."""
+    rename = {'dep': 'Departement', 'pop': 'Population'}
+    rename.update({src: n for n, src in found.items()})
+    data = _parse_jour(chunk).rename(columns=rename)
+    data['Departement'] = normalize_dep_codes(data['Departement'])
+    return _age_rates(data, found, tally)
+
+
+def clean_fra_chunk(chunk, found, tally=None):
+    """Nettoie un bloc du fichier âge France entière (toutes dates)."""
+    rename = {'pop': 'Population'}
+    rename.update({src: n for n, src in found.items()})
+    return _age_rates(_parse_jour(chunk).rename(columns=rename), found, tally)
+
+
+def _age_rates(data, found, tally=None):
+    """Classe d'âge et taux de couverture, communs aux fichiers par âge."""
+    data['Classe dAge'] = _recode(data.pop('clage_vacsi'), _age_label, AGE_ORDER)
+    data = _valid_rows(data, 'Classe dAge', tally, 'age_inconnu')
+
+    fixed = {}
+    _clean_counts(data, found, fixed)
+    # Taux calculés colonne par colonne en float32 (population nulle -> taux 0)
+    pop = data['Population'].to_numpy(dtype=np.float32)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for c in found:
+            rate = data[c].to_numpy(dtype=np.float32) / pop
+            rate *= 100
+            data[f"Taux {c} (%)"] = _finite_rates(rate, fixed=fixed)
+    _tally_fixed(tally, data['jour'].to_numpy(), fixed)
+    # Population : estimation INSEE parfois fractionnaire, gardée en float32
+    data['Population'] = np.nan_to_num(pop, nan=0, posinf=0, neginf=0)
+    return data
+
+
+def clean_sex_chunk(chunk, found_c, found_r, tally=None):
+    """Nettoie un bloc du fichier sexe × département (toutes dates).
+
+    Population déduite de la dose 1 et de son taux ; taux nul -> population 0,
+    comptée par le contrôle qualité ``population_nulle``.
+    """
+    data = _parse_jour(chunk)
+    sexe = data.pop('sexe')
+    data['Sexe'] = _recode(sexe, _sex_label, SEXES)
+    # Code 0 : ensemble des deux sexes, écarté sans être une anomalie
+    data = _valid_rows(data, 'Sexe', tally, 'sexe_inconnu', _is_code(sexe, ('0',)))
+
+    rename = {'dep': 'Departement'}
+    rename.update({src: n for n, src in found_c.items()})
+    rename.update({src: f"Taux {n} (%)" for n, src in found_r.items()})
+    data = data.rename(columns=rename)
+    data['Departement'] = normalize_dep_codes(data['Departement'])
+    fixed = {}
+    _clean_counts(data, found_c, fixed)
+    for n in found_r:
+        col = f"Taux {n} (%)"
+        data[col] = _finite_rates(data[col].to_numpy(dtype=np.float32, copy=True), fixed=fixed)
+    _tally_fixed(tally, data['jour'].to_numpy(), fixed)
+    if 'Dose 1' in found_c and 'Dose 1' in found_r:
+        r = data['Taux Dose 1 (%)'].to_numpy()
+        with np.errstate(divide='ignore', invalid='ignore'):
+            data['Population'] = _counts(np.where(r > 0, data['Dose 1'].to_numpy() / r * 100, 0))
+    else: data['Population'] = np.ones(len(data), dtype=np.uint32)
+    return data
+
+
+def memory_report(frames):
+    """Occupation mémoire réelle (``deep``) par colonne de chaque tableau nommé.
+
+    ``frames`` : dict nom -> DataFrame (``None`` ignoré). Colonnes du résultat :
+    'frame', 'column', 'dtype', 'rows', 'bytes'.
+    """
+    rows = []
+    for name, frame in frames.items():
+        if frame is None: continue
+        for col, n in frame.memory_usage(deep=True).items():
+            dtype = 'index' if col == 'Index' else str(frame[col].dtype)
+            rows.append({'frame': name, 'column': col, 'dtype': dtype, 'rows': len(frame), 'bytes': int(n)})
+    return pd.DataFrame(rows, columns=['frame', 'column', 'dtype', 'rows', 'bytes'])
+
+
+# ============================================================================
+# 4. Série temporelle
+# ============================================================================
+class TimeSeries:
+    """Historique nettoyé, trié par (clés, jour), avec requêtes par période.
+
+    Chaque combinaison de clés (ex. département × classe d'âge) occupe une
+    tranche contiguë du tableau : une requête sur une courbe précise se résout
+    par un accès au dictionnaire des tranches puis une recherche dichotomique
+    sur les dates, sans parcourir le reste de l'historique.
+    """
+
+    def __init__(self, frame, keys, measures, presorted=False, days=None):
+        self.keys = list(keys)
+        self.measures = list(measures)
+        if not presorted:
+            frame = frame.sort_values(self.keys + ['jour'], kind='stable').reset_index(drop=True)
+        self.frame = frame
+        self._jour = self.frame['jour'].to_numpy()
+        self._slices = self._build_slices()
+        self.days = days if days is not None else np.unique(self._jour[~pd.isna(self._jour)])
+        self.quality = None  # Contrôles qualité par jour (voir vacsi.quality), posé par Plan.build
+
+    def _build_slices(self):
+        if self.frame.empty: return {}
+        # Code combiné des clés catégorielles : une rupture = une nouvelle tranche
+        codes = np.zeros(len(self.frame), dtype=np.int64)
+        for k in self.keys:
+            cat = self.frame[k].cat
+            codes = codes * (len(cat.categories) + 1) + cat.codes.to_numpy()
+        starts = np.r_[0, np.flatnonzero(np.diff(codes)) + 1]
+        stops = np.r_[starts[1:], len(codes)]
+        heads = self.frame.loc[starts, self.keys].itertuples(index=False, name=None)
+        return {tuple(k): (a, b) for k, a, b in zip(heads, starts, stops)}
+
+    def __len__(self): return len(self.frame)
+
+    def key_values(self, key):
+        """Valeurs observées d'une clé, dans l'ordre des catégories."""
+        i = self.keys.index(key)
+        seen = {k[i] for k in self._slices}
+        return [c for c in self.frame[key].cat.categories if c in seen]
+
+    @property
+    def first_day(self): return pd.Timestamp(self.days[0]) if self.days.size else None
+
+    @property
+    def last_day(self): return pd.Timestamp(self.days[-1]) if self.days.size else None
+
+    def at(self, day):
+        """Instantané d'un jour donné (toutes clés)."""
+        return self.frame[self._jour == np.datetime64(pd.Timestamp(day))].reset_index(drop=True)
+
+    def latest(self):
+        """Instantané du dernier jour disponible (équivalent de l'ancien chargement)."""
+        if not self.days.size: return self.frame
+        return self.at(self.days[-1])
+
+    def series(self, key, start=None, end=None):
+        """Courbe d'une combinaison de clés entre ``start`` et ``end`` (inclus)."""
+        key = tuple(key)
+        if key not in self._slices: return self.frame.iloc[0:0]
+        a, b = self._slices[key]
+        jour = self._jour[a:b]
+        lo = a + (np.searchsorted(jour, np.datetime64(pd.Timestamp(start)), 'left') if start is not None else 0)
+        hi = a + (np.searchsorted(jour, np.datetime64(pd.Timestamp(end)), 'right') if end is not None else b - a)
+        return self.frame.iloc[lo:hi]
+
+    def query(self, start=None, end=None, **filters):
+        """Lignes entre ``start`` et ``end``, filtrées sur des clés (ex. Departement='75')."""
+        if filters and set(filters) == set(self.keys):
+            return self.series([filters[k] for k in self.keys], start, end)
+        mask = np.ones(len(self.frame), dtype=bool)
+        if start is not None: mask &= self._jour >= np.datetime64(pd.Timestamp(start))
+        if end is not None: mask &= self._jour <= np.datetime64(pd.Timestamp(end))
+        for k, v in filters.items():
+            mask &= (self.frame[k] == v).to_numpy()
+        return self.frame[mask]
+
+
+# ============================================================================
+# 5. Points d'entrée
+# ============================================================================
+class Plan:
+    """Lecture d'un type de fichier : colonnes à lire, nettoyage d'un bloc, clés et mesures.
+
+    Les corrections du nettoyage sont comptées dans ``tally`` (voir vacsi.quality).
+    """
+
+    def __init__(self, wanted, clean, categorical, keys, measures):
+        self.wanted, self._clean = wanted, clean
+        self.categorical, self.keys, self.measures = list(categorical), list(keys), list(measures)
+        self.tally = quality.QualityTally()
+
+    def clean(self, chunk):
+        return self._clean(chunk, self.tally)
+
+    def build(self, chunks, kept_quality=None):
+        """``TimeSeries`` à partir de blocs déjà nettoyés, avec son tableau qualité par jour.
+
+        ``kept_quality`` : compteurs du nettoyage des jours déjà en stock (ingestion incrémentale).
+        """
+        hist = TimeSeries(_concat(chunks, self.categorical), self.keys, self.measures)
+        checks = quality.history_checks(hist.frame, self.keys, self.measures, DEP_CODES)
+        hist.quality = quality.combine(kept_quality, self.tally.frame(), checks)
+        return hist
+
+
+def _dep_plan(lower):
+    found = _match(lower, DEP_COUNT_MAPPING)
+    return Plan({'dep', 'clage_vacsi', 'pop', 'jour', *found.values()}, lambda ch, tally: clean_dep_chunk(ch, found, tally),
+                ['Departement', 'Classe dAge'], ['Departement', 'Classe dAge'], found)
+
+
+def _fra_plan(lower):
+    found = _match(lower, DEP_COUNT_MAPPING)
+    return Plan({'clage_vacsi', 'pop', 'jour', *found.values()}, lambda ch, tally: clean_fra_chunk(ch, found, tally),
+                ['Classe dAge'], ['Classe dAge'], found)
+
+
+def _sex_plan(lower):
+    if 'sexe' not in lower: return None
+    found_c, found_r = _match(lower, SEX_COUNT_MAPPING), _match(lower, SEX_RATE_MAPPING)
+    return Plan({'dep', 'sexe', 'jour', *found_c.values(), *found_r.values()},
+                lambda ch, tally: clean_sex_chunk(ch, found_c, found_r, tally),
+                ['Departement', 'Sexe'], ['Departement', 'Sexe'], found_c)
+
+
+PLANS = {'dep_age': _dep_plan, 'fra_age': _fra_plan, 'dep_sex': _sex_plan}
+
+
+def read_plan(kind, filepath):
+    """Plan de lecture de ``filepath`` d'après son en-tête ; ``None`` si le fichier ne convient pas."""
+    if not os.path.exists(filepath): raise FileNotFoundError(filepath)
+    _, lower = _read_header(filepath)
+    return PLANS[kind](lower)
+
+
+def read_history(kind, filepath, chunksize=CHUNK_ROWS):
+    """Charge tout l'historique d'un fichier du type ``kind`` ; retourne une ``TimeSeries``."""
+    plan = read_plan(kind, filepath)
+    if plan is None: return None
+    return plan.build([plan.clean(ch) for ch in _iter_chunks(filepath, plan.wanted, chunksize)])
+
+
+def read_dep_history(filepath, chunksize=CHUNK_ROWS):
+    """Charge tout l'historique âge × département ; retourne une ``TimeSeries``."""
+    return read_history('dep_age', filepath, chunksize)
+
+
+def read_fra_history(filepath, chunksize=CHUNK_ROWS):
+    """Charge l'historique national par classe d'âge (``vacsi-tot-a-fra``) ; retourne une ``TimeSeries``."""
+    return read_history('fra_age', filepath, chunksize)
+
+
+def read_sex_history(filepath, chunksize=CHUNK_ROWS):
+    """Charge tout l'historique sexe × département ; ``None`` si le fichier n'a pas de colonne sexe."""
+    return read_history('dep_sex', filepath, chunksize)
@@ -0,0 +1,79 @@
+"""Niveaux de détail des séries temporelles (sous-échantillonnage LTTB).
+
+Une courbe d'un département et d'une classe d'âge compte un point par jour :
+sur un long historique, tout envoyer au navigateur alourdit la spec sans rien
+ajouter à l'affichage (plusieurs points par pixel). ``SeriesLOD`` précalcule
+pour une série plusieurs niveaux (64, 128, 256… points sur tout
+l'historique), choisis par l'algorithme LTTB (*Largest-Triangle-Three-Buckets*,
+Steinarsson 2013), qui garde la forme de la courbe. À l'affichage, ``pick``
+prend le niveau le plus grossier qui donne assez de points sur la période
+demandée pour la largeur du graphique : le nombre de points envoyés reste
+borné quelle que soit la longueur de l'historique.
+"""
+
+import numpy as np
+import pandas as pd
+
+MIN_POINTS = 64      # Niveau le plus grossier
+POINTS_PER_PX = 0.5  # Un point tous les deux pixels suffit à une courbe
+
+
+def lttb(x, y, n):
+    """Indices des ``n`` points retenus par LTTB (premier et dernier toujours gardés).
+
+    ``x`` croissant. Le point gardé dans chaque intervalle est celui qui forme
+    le plus grand triangle avec le point gardé précédent et la moyenne de
+    l'intervalle suivant.
+    """
+    size = len(x)
+    if n >= size or n < 3: return np.arange(size)
+    x, y = np.asarray(x, dtype=np.float64), np.asarray(y, dtype=np.float64)
+    y = np.where(np.isnan(y), 0.0, y)
+    # Intervalles de taille égale entre le premier et le dernier point
+    edges = np.linspace(1, size - 1, n - 1).astype(np.int64)
+    out = np.empty(n, dtype=np.int64)
+    out[0], out[-1] = 0, size - 1
+    a = 0
+    for i in range(n - 2):
+        lo, hi = edges[i], edges[i + 1]
+        nlo, nhi = hi, edges[i + 2] if i + 2 < n - 1 else size
+        cx, cy = x[nlo:nhi].mean(), y[nlo:nhi].mean()
+        # Aire (doublée) des triangles (a, candidat, moyenne suivante)
+        area = np.abs((x[a] - cx) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (cy - y[a]))
+        a = out[i + 1] = lo + int(np.argmax(area))
+    return out
+
+
+class SeriesLOD:
+    """Niveaux de détail d'une série : indices des points gardés, du plus grossier au complet.
+
+    ``x`` : dates (croissantes), ``y`` : valeurs tracées. Chaque niveau double
+    le nombre de points du précédent ; le dernier est la série complète.
+    """
+
+    def __init__(self, x, y, min_points=MIN_POINTS):
+        self.x = np.asarray(x).astype('datetime64[ns]')
+        xs = self.x.astype(np.int64)
+        self.levels = []
+        n = min_points
+        while n < len(xs):
+            self.levels.append(lttb(xs, y, n))
+            n *= 2
+        self.levels.append(np.arange(len(xs)))
+
+    def __len__(self): return len(self.x)
+
+    def pick(self, start=None, end=None, width=800):
+        """Positions des points à tracer entre ``start`` et ``end`` pour ``width`` pixels.
+
+        Niveau le plus grossier offrant au moins ``width * POINTS_PER_PX``
+        points sur la période ; à défaut, tous les points de la période.
+        """
+        target = max(int(width * POINTS_PER_PX), 2)
+        lo = np.datetime64(pd.Timestamp(start), 'ns') if start is not None else None
+        hi = np.datetime64(pd.Timestamp(end), 'ns') if end is not None else None
+        for idx in self.levels:
+            x = self.x[idx]
+            a = np.searchsorted(x, lo, 'left') if lo is not None else 0
+            b = np.searchsorted(x, hi, 'right') if hi is not None else len(x)
+            if b - a >= target or idx is self.levels[-1]: return idx[a:b]
@@ -0,0 +1,131 @@
+"""Contrôle qualité des données, compté pendant l'ingestion.
+
+Le nettoyage corrige certaines valeurs (effectifs vides ou négatifs ramenés
+à 0, taux plafonnés à 100 %, taux non finis ramenés à 0, lignes sans classe d'âge ou sexe reconnu écartées) : ces
+corrections sont comptées au passage, sur les masques que le nettoyage calcule
+de toute façon. Les contrôles qui portent sur l'historique trié (population
+nulle, département inconnu, cumul qui diminue) sont faits une fois sur le
+tableau final, en une passe vectorisée.
+
+Le résultat est un tableau par jour (index ``jour``, une colonne par contrôle,
+nombre de lignes concernées), enregistré avec l'historique dans le cache
+disque et mis à jour jour par jour par l'ingestion incrémentale.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Contrôles comptés pendant le nettoyage, bloc par bloc
+CLEAN_CHECKS = ('effectif_invalide', 'taux_sup_100', 'taux_non_fini', 'age_inconnu', 'sexe_inconnu')
+# Contrôles recalculés sur l'historique complet après chaque construction
+HISTORY_CHECKS = ('population_nulle', 'departement_inconnu', 'cumul_decroissant')
+CHECKS = CLEAN_CHECKS + HISTORY_CHECKS
+
+
+def empty():
+    return pd.DataFrame({c: pd.Series(dtype=np.int64) for c in CHECKS},
+                        index=pd.DatetimeIndex([], name='jour', dtype='datetime64[us]'))
+
+
+def _per_day(parts):
+    """(contrôle, jours, effectifs) -> tableau par jour, une colonne par contrôle."""
+    parts = [p for p in parts if len(p[1])]
+    if not parts: return empty()
+    long = pd.DataFrame({'check': np.concatenate([np.full(len(d), c, dtype=object) for c, d, _ in parts]),
+                         'jour': np.concatenate([d for _, d, _ in parts]).astype('datetime64[us]'),
+                         'n': np.concatenate([n for _, _, n in parts]).astype(np.int64)})
+    table = long.pivot_table(index='jour', columns='check', values='n', aggfunc='sum', fill_value=0)
+    return table.reindex(columns=list(CHECKS), fill_value=0).astype(np.int64).rename_axis(columns=None)
+
+
+def _count(jour, mask):
+    days, n = np.unique(np.asarray(jour)[mask].astype('datetime64[D]'), return_counts=True)
+    return days, n
+
+
+class QualityTally:
+    """Compteurs par jour accumulés bloc par bloc pendant le nettoyage."""
+
+    def __init__(self):
+        self._parts = []
+
+    def add(self, check, jour, mask):
+        """Compte les lignes de ``mask`` (booléen aligné sur ``jour``) pour le contrôle ``check``."""
+        if mask.any(): self._parts.append((check, *_count(jour, mask)))
+
+    def frame(self):
+        return _per_day(self._parts)
+
+
+def history_checks(frame, keys, measures, known_deps):
+    """Contrôles sur l'historique trié par (clés, jour) ; tableau par jour.
+
+    Cumul décroissant : ligne dont un effectif cumulé est inférieur à celui
+    du jour précédent pour la même combinaison de clés.
+    """
+    if frame.empty: return empty()
+    jour = frame['jour'].to_numpy()
+    parts = []
+    if 'Population' in frame.columns:
+        parts.append(('population_nulle', *_count(jour, frame['Population'].to_numpy() == 0)))
+    if 'Departement' in frame.columns:
+        codes = frame['Departement'].cat.codes.to_numpy()
+        parts.append(('departement_inconnu', *_count(jour, (codes < 0) | (codes >= len(known_deps)))))
+    # Même combinaison de clés que la ligne précédente (tableau trié par clés puis jour)
+    same = np.ones(len(frame) - 1, dtype=bool)
+    for k in keys: same &= np.diff(frame[k].cat.codes.to_numpy()) == 0
+    down = np.zeros(len(frame), dtype=bool)
+    for m in measures:
+        values = frame[m].to_numpy()
+        down[1:] |= same & (values[1:] < values[:-1])
+    parts.append(('cumul_decroissant', *_count(jour, down)))
+    return _per_day(parts)
+
+
+def combine(kept, cleaned, history):
+    """Compteurs du nettoyage (jours conservés + nouveaux blocs) et contrôles de l'historique."""
+    clean = cleaned[list(CLEAN_CHECKS)]
+    if kept is not None and not kept.empty: clean = clean.add(kept[list(CLEAN_CHECKS)], fill_value=0)
+    out = clean.join(history[list(HISTORY_CHECKS)], how='outer').fillna(0).astype(np.int64)
+    out = out[list(CHECKS)]
+    return out[out.to_numpy().any(axis=1)]
+
+
+def drop_days(quality, days):
+    """Retire des jours (révisés ou disparus) avant de recompter leurs lignes."""
+    if quality is None: return None
+    return quality[~quality.index.isin(pd.DatetimeIndex(days))]
+
+
+# Colonne dont dépend un contrôle : sans elle, le contrôle ne s'applique pas au fichier
+REQUIRES = {'age_inconnu': 'Classe dAge', 'sexe_inconnu': 'Sexe', 'population_nulle': 'Population',
+            'departement_inconnu': 'Departement'}
+
+
+def checks_for(columns):
+    return [c for c in CHECKS if c not in REQUIRES or REQUIRES[c] in columns]
+
+
+def summary(quality, rows=None, checks=CHECKS):
+    """Une ligne par contrôle : lignes concernées, jours touchés, premier et dernier jour."""
+    out = []
+    for c in checks:
+        col = quality[c] if quality is not None else pd.Series(dtype=np.int64)
+        hit = col[col > 0]
+        out.append({'check': c, 'lignes': int(hit.sum()), 'jours': len(hit),
+                    'part': hit.sum() / rows if rows else None,
+                    'premier': hit.index.min() if len(hit) else pd.NaT, 'dernier': hit.index.max() if len(hit) else pd.NaT})
+    return pd.DataFrame(out)
+
+
+def to_json(quality):
+    """Forme JSON (métadonnées du cache disque)."""
+    if quality is None: return None
+    return {'days': [str(d)[:10] for d in quality.index], **{c: quality[c].tolist() for c in CHECKS}}
+
+
+def from_json(data):
+    if data is None: return None
+    days = np.asarray(data['days'], dtype='datetime64[D]').astype('datetime64[us]')
+    return pd.DataFrame({c: np.asarray(data.get(c, []), dtype=np.int64) for c in CHECKS},
+                        index=pd.DatetimeIndex(days, name='jour'))
@@ -0,0 +1,63 @@
+"""Statistiques de boîte à moustaches calculées côté serveur.
+
+Au lieu d'envoyer chaque ligne au navigateur pour que Vega calcule les
+quartiles, on calcule min / Q1 / médiane / Q3 / max pour tous les groupes et
+toutes les colonnes en une passe NumPy : deux tris stables sur l'ensemble du
+tableau (par valeur puis par groupe) rangent chaque colonne par groupe, et les
+quantiles se lisent ensuite par indexation. La taille du résultat ne dépend
+que du nombre de groupes, pas du nombre de lignes.
+"""
+
+import numpy as np
+import pandas as pd
+
+STATS = ('min', 'q1', 'median', 'q3', 'max')
+_PROBS = np.array([0.0, 0.25, 0.5, 0.75, 1.0])
+
+
+def grouped_quantiles(values, groups, n_groups, probs=_PROBS):
+    """Quantiles (interpolation linéaire, comme ``np.quantile``) par groupe et par colonne.
+
+    ``values`` : tableau (n, d) sans valeurs manquantes ; ``groups`` : codes
+    entiers (n,) dans ``[0, n_groups)``. Retourne un tableau
+    (n_groups, len(probs), d), NaN pour les groupes vides.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if values.ndim == 1: values = values[:, None]
+    groups = np.asarray(groups)
+    if len(values) == 0: return np.full((n_groups, len(probs), values.shape[1]), np.nan)
+    # Tri par valeur (toutes colonnes à la fois), puis tri stable par groupe
+    by_value = np.argsort(values, axis=0, kind='stable')
+    by_group = np.argsort(groups[by_value], axis=0, kind='stable')
+    ordered = np.take_along_axis(values, np.take_along_axis(by_value, by_group, axis=0), axis=0)
+
+    counts = np.bincount(groups, minlength=n_groups)
+    starts = np.r_[0, np.cumsum(counts)[:-1]]
+    pos = starts[:, None] + probs[None, :] * np.maximum(counts - 1, 0)[:, None]
+    last = np.minimum(starts + np.maximum(counts - 1, 0), len(ordered) - 1)[:, None]
+    lo = np.minimum(np.floor(pos).astype(np.int64), last)
+    hi = np.minimum(lo + 1, last)
+    frac = (pos - lo)[:, :, None]
+    out = ordered[lo] * (1 - frac) + ordered[hi] * frac
+    out[counts == 0] = np.nan
+    return out
+
+
+def box_stats(frame, group, columns):
+    """Cinq nombres par (groupe, colonne), au format long.
+
+    Colonnes du résultat : ``group``, 'Indicateur', 'n', puis ``STATS``.
+    """
+    keys = frame[group]
+    cat = keys.cat if isinstance(keys.dtype, pd.CategoricalDtype) else keys.astype('category').cat
+    codes, labels = cat.codes.to_numpy(), list(cat.categories)
+    q = grouped_quantiles(frame[list(columns)].to_numpy(), codes, len(labels))
+    counts = np.bincount(codes, minlength=len(labels))
+
+    # (groupe, stat, colonne) -> lignes (colonne, groupe) et colonnes stats
+    flat = q.transpose(2, 0, 1).reshape(-1, len(STATS))
+    out = pd.DataFrame(flat, columns=list(STATS))
+    out.insert(0, 'n', np.tile(counts, len(columns)))
+    out.insert(0, 'Indicateur', np.repeat(list(columns), len(labels)))
+    out.insert(0, group, np.tile(labels, len(columns)))
+    return out[out['n'] > 0].reset_index(drop=True)
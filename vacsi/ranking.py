@@ -0,0 +1,67 @@
+"""Index de classement précalculé (Top N, Bottom N, rang et centile d'une unité).
+
+Les ordres de tri de chaque colonne sont calculés une fois par version des
+données (``argsort``) : un Top 20 est ensuite une simple tranche, le rang
+d'un département une lecture de tableau. Le navigateur ne reçoit que les
+lignes affichées au lieu de classer lui-même toutes les lignes.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+class RankingIndex:
+    """Ordres décroissants et rangs de ``columns`` pour les unités de ``table[key]``.
+
+    Rangs « compétition » comme ``rank()`` de Vega : ex æquo au même rang,
+    rang 1 = valeur la plus haute.
+    """
+
+    def __init__(self, table, key, columns):
+        self.table = table.reset_index(drop=True)
+        self.key = key
+        self.codes = self.table[key].astype(str).to_numpy()
+        self._pos = {c: i for i, c in enumerate(self.codes)}
+        self.columns = [c for c in columns if c in self.table.columns]
+        self.order, self.ranks, self.below = {}, {}, {}
+        for col in self.columns:
+            values = self.table[col].to_numpy(dtype=np.float64)
+            order = np.argsort(-values, kind='stable')
+            ranked = -values[order]
+            # Rang = 1 + nombre de valeurs strictement supérieures
+            ranks = np.empty(len(values), dtype=np.int32)
+            ranks[order] = np.searchsorted(ranked, ranked, side='left') + 1
+            # Nombre de valeurs strictement inférieures (pour le centile)
+            below = np.empty(len(values), dtype=np.int32)
+            below[order] = len(values) - np.searchsorted(ranked, ranked, side='right')
+            self.order[col], self.ranks[col], self.below[col] = order, ranks, below
+
+    def __len__(self): return len(self.codes)
+
+    def top(self, column, n=20):
+        """Les ``n`` lignes aux valeurs les plus hautes, dans l'ordre, avec leur rang."""
+        idx = self.order[column][:n]
+        return self.table.iloc[idx].assign(Rang=self.ranks[column][idx]).reset_index(drop=True)
+
+    def bottom(self, column, n=20):
+        """Les ``n`` lignes aux valeurs les plus basses, la plus basse en premier."""
+        idx = self.order[column][::-1][:n]
+        return self.table.iloc[idx].assign(Rang=self.ranks[column][idx]).reset_index(drop=True)
+
+    def rank_of(self, code, column):
+        """(rang, nombre d'unités, centile) de ``code`` ; centile = part des unités strictement en dessous."""
+        i = self._pos[str(code)]
+        return int(self.ranks[column][i]), len(self), float(self.below[column][i] / len(self) * 100)
+
+    def profile(self, code, columns=None):
+        """Rang de ``code`` pour chaque colonne : 'Indicateur', 'Valeur', 'Rang', 'Sur', 'Centile'."""
+        i = self._pos[str(code)]
+        columns = self.columns if columns is None else [c for c in columns if c in self.order]
+        n = len(self)
+        return pd.DataFrame({
+            'Indicateur': columns,
+            'Valeur': [float(self.table[c].iloc[i]) for c in columns],
+            'Rang': [int(self.ranks[c][i]) for c in columns],
+            'Sur': n,
+            'Centile': [float(self.below[c][i] / n * 100) for c in columns],
+        })
@@ -0,0 +1,63 @@
+"""Rapprochement des sommes départementales avec les totaux nationaux.
+
+Le fichier national (``vacsi-tot-a-fra``) et le fichier par département
+décrivent les mêmes injections ; leurs totaux par classe d'âge diffèrent
+normalement de quelques pourcents (département de résidence inconnu, hors
+France). Cet écart est à sens unique : le national compte aussi les
+résidences inconnues, la somme des départements est donc en dessous. Sur la
+publication de référence il atteint 7 % chez les adultes (25-29 ans, dose 1)
+et bien plus dans les petites cohortes d'enfants (0-4 ans : quelques milliers
+d'injections). Un déficit au-delà de ``TOLERANCE`` sur un effectif d'au moins
+``MIN_COUNT`` signale un lot de lignes perdu ou une publication incomplète ;
+un excédent des départements, qui n'a pas de cause structurelle (lignes en
+double), est signalé dès ``EXCESS_TOLERANCE``.
+
+Le rapprochement est calculé une fois par version des données, en une passe :
+un ``groupby`` sur la classe d'âge (catégorielle) pour toutes les colonnes,
+puis une soustraction de tableaux alignés.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+# Déficit relatif toléré des sommes départementales (résidences inconnues : jusqu'à 7 % constaté)
+TOLERANCE = float(os.environ.get("VACSI_RECONCILE_TOLERANCE", "0.10"))
+# Excédent relatif toléré (aucune cause structurelle : lignes en double)
+EXCESS_TOLERANCE = float(os.environ.get("VACSI_RECONCILE_EXCESS", "0.01"))
+# En dessous de ce total national, l'écart relatif n'est pas significatif
+MIN_COUNT = 10_000
+
+
+def reconcile(dep, fra, measures, tolerance=TOLERANCE, min_count=MIN_COUNT, excess_tolerance=EXCESS_TOLERANCE):
+    """Écarts par (classe d'âge, indicateur) entre départements et national.
+
+    ``dep`` et ``fra`` : derniers jours des fichiers âge × département et âge
+    France. Colonnes du résultat : 'Classe dAge', 'Indicateur', 'departements',
+    'national', 'ecart', 'ecart_relatif', 'derive' (booléen).
+    """
+    columns = ['Population', *[m for m in measures if m in fra.columns]]
+    # Effectifs non signés : calcul en float64 pour des écarts négatifs corrects
+    sums = dep.groupby('Classe dAge', observed=True)[columns].sum().astype(np.float64)
+    nat = fra.set_index('Classe dAge')[columns].astype(np.float64)
+    sums, nat = sums.align(nat, join='inner', axis=0)
+
+    diff = sums.to_numpy() - nat.to_numpy()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rel = np.where(nat.to_numpy() > 0, diff / nat.to_numpy(), np.nan)
+    ages = np.repeat(sums.index.astype(str), len(columns))
+    out = pd.DataFrame({
+        'Classe dAge': ages, 'Indicateur': np.tile(columns, len(sums)),
+        'departements': sums.to_numpy().ravel(), 'national': nat.to_numpy().ravel(),
+        'ecart': diff.ravel(), 'ecart_relatif': rel.ravel(),
+    })
+    rel = out['ecart_relatif']
+    out['derive'] = (out['national'] >= min_count) & ((rel < -tolerance) | (rel > excess_tolerance))
+    return out
+
+
+def drift_summary(report):
+    """Lignes en dérive, de la plus forte à la plus faible."""
+    flagged = report[report['derive']]
+    return flagged.reindex(flagged['ecart_relatif'].abs().sort_values(ascending=False).index)
@@ -0,0 +1,59 @@
+"""Hiérarchie territoriale : département -> région -> zone (métropole / outre-mer).
+
+Codes INSEE des régions (découpage 2016). Les collectivités d'outre-mer, qui
+ne sont pas des régions, sont regroupées sous le code ``COM``. Les codes
+départementaux inconnus n'appartiennent à aucune région : ils comptent dans
+le total national mais pas dans les agrégats régionaux.
+"""
+
+import pandas as pd
+
+METRO, OVERSEAS = 'Métropole', 'Outre-mer'
+
+# Code région -> (nom, départements)
+REGIONS = {
+    '11': ("Île-de-France", ['75', '77', '78', '91', '92', '93', '94', '95']),
+    '24': ("Centre-Val de Loire", ['18', '28', '36', '37', '41', '45']),
+    '27': ("Bourgogne-Franche-Comté", ['21', '25', '39', '58', '70', '71', '89', '90']),
+    '28': ("Normandie", ['14', '27', '50', '61', '76']),
+    '32': ("Hauts-de-France", ['02', '59', '60', '62', '80']),
+    '44': ("Grand Est", ['08', '10', '51', '52', '54', '55', '57', '67', '68', '88']),
+    '52': ("Pays de la Loire", ['44', '49', '53', '72', '85']),
+    '53': ("Bretagne", ['22', '29', '35', '56']),
+    '75': ("Nouvelle-Aquitaine", ['16', '17', '19', '23', '24', '33', '40', '47', '64', '79', '86', '87']),
+    '76': ("Occitanie", ['09', '11', '12', '30', '31', '32', '34', '46', '48', '65', '66', '81', '82']),
+    '84': ("Auvergne-Rhône-Alpes", ['01', '03', '07', '15', '26', '38', '42', '43', '63', '69', '73', '74']),
+    '93': ("Provence-Alpes-Côte d'Azur", ['04', '05', '06', '13', '83', '84']),
+    '94': ("Corse", ['2A', '2B']),
+    '01': ("Guadeloupe", ['971']),
+    '02': ("Martinique", ['972']),
+    '03': ("Guyane", ['973']),
+    '04': ("La Réunion", ['974']),
+    '06': ("Mayotte", ['976']),
+    'COM': ("Collectivités d'outre-mer", ['975', '977', '978', '986', '987', '988']),
+}
+
+REGION_NAMES = {code: name for code, (name, _) in REGIONS.items()}
+DEP_REGION = {dep: code for code, (_, deps) in REGIONS.items() for dep in deps}
+# Régions d'outre-mer : codes INSEE 01 à 06, plus les collectivités
+REGION_ZONE = {code: OVERSEAS if code == 'COM' or code < '10' else METRO for code in REGIONS}
+DEP_ZONE = {dep: REGION_ZONE[code] for dep, code in DEP_REGION.items()}
+
+# Niveaux d'agrégation, du plus grossier au plus fin
+LEVELS = ('Zone', 'Region', 'Departement')
+
+
+def region_departments(code):
+    """Départements d'une région, dans l'ordre des codes."""
+    return list(REGIONS[code][1])
+
+
+def hierarchy(departements):
+    """Région et zone de chaque département (``NaN`` pour un code inconnu).
+
+    La correspondance est calculée sur les codes distincts, pas ligne à ligne.
+    """
+    cat = pd.Categorical(departements)
+    regions = pd.Index(cat.categories.astype(str)).map(DEP_REGION).to_numpy(dtype=object)
+    region = pd.Series(regions[cat.codes]).where(cat.codes >= 0)
+    return pd.DataFrame({'Departement': cat, 'Region': region, 'Zone': region.map(REGION_ZONE)})
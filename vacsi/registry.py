@@ -0,0 +1,55 @@
+"""Registre des fichiers VACSI : découverte du cliché le plus récent de chaque type.
+
+Santé publique France publie chaque cliché sous un nom horodaté
+(``vacsi-tot-a-dep-2023-07-13-15h50.csv``). Plutôt que de coder ces noms en
+dur, le registre cherche dans ``data/`` les fichiers de chaque type par motif
+et retient le plus récent (horodatage du nom, puis date de modification).
+"""
+
+import fnmatch
+import os
+import re
+
+DATA_DIR = os.environ.get("VACSI_DATA_DIR", "data")
+
+# Type de jeu de données -> motif de nom de fichier
+KINDS = {
+    'dep_age': "vacsi-tot-a-dep-*.csv",   # âge × département
+    'dep_sex': "vacsi-tot-s-dep-*.csv",   # sexe × département
+    'fra_age': "vacsi-tot-a-fra-*.csv",   # âge, France entière
+}
+
+_STAMP = re.compile(r"(\d{4}-\d{2}-\d{2})-(\d{2})h(\d{2})")
+
+
+def snapshot_stamp(filename):
+    """Horodatage ``AAAA-MM-JJ-HHhMM`` contenu dans le nom, sous forme triable ; ``''`` si absent."""
+    m = _STAMP.search(os.path.basename(filename))
+    return f"{m.group(1)} {m.group(2)}:{m.group(3)}" if m else ""
+
+
+class DatasetRegistry:
+    """Fichiers disponibles par type dans un dossier, le plus récent en dernier."""
+
+    def __init__(self, data_dir=DATA_DIR, kinds=None):
+        self.data_dir = data_dir
+        self.kinds = dict(KINDS if kinds is None else kinds)
+
+    def snapshots(self, kind):
+        """Tous les fichiers du type ``kind``, du plus ancien au plus récent."""
+        try: names = os.listdir(self.data_dir)
+        except OSError: return []
+        paths = [os.path.join(self.data_dir, n) for n in fnmatch.filter(names, self.kinds[kind])]
+        return sorted(paths, key=lambda p: (snapshot_stamp(p), os.path.getmtime(p)))
+
+    def newest(self, kind):
+        found = self.snapshots(kind)
+        return found[-1] if found else None
+
+    def discover(self):
+        """Chemin du cliché le plus récent pour chaque type (``None`` si aucun)."""
+        return {kind: self.newest(kind) for kind in self.kinds}
+
+    def missing(self, kind):
+        """Chemin indicatif pour les messages d'erreur quand aucun fichier ne correspond."""
+        return os.path.join(self.data_dir, self.kinds[kind])
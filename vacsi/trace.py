@@ -0,0 +1,231 @@
+"""Instrumentation des étapes d'un rendu (temps, pic mémoire, octets envoyés).
+
+Chaque rendu Streamlit ouvre un ``Trace`` ; les étapes sont mesurées avec le
+gestionnaire de contexte ``stage(name)`` ou le décorateur ``traced(name)``,
+imbriquables (``page_geo/specs``). Sans trace active, ils ne font rien.
+
+* temps : toujours mesuré (``perf_counter``, coût négligeable) ;
+* pic mémoire et octets : seulement en mode détaillé (``tracemalloc`` ralentit
+  nettement les allocations, et compter les octets demande de sérialiser).
+
+Les rendus terminés alimentent un ``Registry`` de processus : derniers rendus
+pour le panneau d'administration, ligne JSON par rendu sur le logger
+``vacsi.trace`` et compteurs au format texte Prometheus (``prometheus_text``),
+écrits dans un fichier pour le collecteur textfile si ``VACSI_METRICS_FILE``
+est défini. Les caches déclarés avec ``register_cache`` (tout objet doté de
+``stats()``, comme ``SpecCache``) y ajoutent leurs succès et échecs.
+"""
+
+import contextlib
+import contextvars
+import functools
+import json
+import logging
+import os
+import threading
+import time
+import tracemalloc
+from collections import deque
+
+logger = logging.getLogger("vacsi.trace")
+
+METRICS_FILE = os.environ.get("VACSI_METRICS_FILE")
+HISTORY = 50
+
+_current = contextvars.ContextVar("vacsi_trace", default=None)
+# tracemalloc est global : démarré par le premier rendu détaillé, arrêté par le dernier
+_tracemalloc_users = 0
+_tracemalloc_lock = threading.Lock()
+
+
+# ============================================================================
+# 1. Trace d'un rendu
+# ============================================================================
+class Trace:
+    """Mesures d'un rendu : une ligne par étape (début relatif au rendu, durée), dans l'ordre de sortie."""
+
+    def __init__(self, name="rerun", detailed=False):
+        self.name, self.detailed = name, detailed
+        self.stages = []
+        self._stack = []
+        self.started = time.time()
+        self._t0 = time.perf_counter()
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        path = "/".join([f['name'] for f in self._stack] + [name])
+        frame = {'name': name, 'bytes': 0, 'carry': 0, 'mem0': 0, 'peak0': 0}
+        if self.detailed:
+            frame['mem0'], frame['peak0'] = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+        self._stack.append(frame)
+        t0 = time.perf_counter()
+        try:
+            yield self
+        finally:
+            seconds = time.perf_counter() - t0
+            self._stack.pop()
+            peak = None
+            if self.detailed:
+                top = max(tracemalloc.get_traced_memory()[1], frame['carry'])
+                peak = max(top - frame['mem0'], 0)
+                # Le pic remis à zéro pour cette étape reste dû à l'étape parente
+                if self._stack: self._stack[-1]['carry'] = max(self._stack[-1]['carry'], top, frame['peak0'])
+            if self._stack: self._stack[-1]['bytes'] += frame['bytes']
+            self.stages.append({'stage': path, 'offset': t0 - self._t0, 'seconds': seconds, 'peak_bytes': peak,
+                                'payload_bytes': frame['bytes'] if self.detailed else None})
+
+    def add_bytes(self, n):
+        if self._stack: self._stack[-1]['bytes'] += n
+
+    @property
+    def total_seconds(self):
+        return sum(s['seconds'] for s in self.stages if '/' not in s['stage'])
+
+    def as_dict(self):
+        return {'name': self.name, 'started': self.started, 'detailed': self.detailed,
+                'total_seconds': self.total_seconds, 'stages': self.stages}
+
+
+@contextlib.contextmanager
+def rerun(name="rerun", detailed=False, registry=None):
+    """Ouvre la trace du rendu courant et l'enregistre à la sortie."""
+    global _tracemalloc_users
+    trace = Trace(name, detailed)
+    if detailed:
+        with _tracemalloc_lock:
+            if _tracemalloc_users == 0 and not tracemalloc.is_tracing(): tracemalloc.start()
+            _tracemalloc_users += 1
+    token = _current.set(trace)
+    try:
+        yield trace
+    finally:
+        _current.reset(token)
+        if detailed:
+            with _tracemalloc_lock:
+                _tracemalloc_users -= 1
+                if _tracemalloc_users == 0: tracemalloc.stop()
+        (registry or REGISTRY).record(trace)
+
+
+def current():
+    return _current.get()
+
+
+def stage(name):
+    """Mesure une étape de la trace active (sans effet hors d'un rendu tracé)."""
+    trace = _current.get()
+    return trace.stage(name) if trace is not None else contextlib.nullcontext()
+
+
+def traced(name=None):
+    """Décorateur : chaque appel de la fonction devient une étape de la trace active."""
+    def decorate(fn):
+        label = name or fn.__name__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with stage(label): return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def add_bytes(n):
+    """Ajoute ``n`` octets envoyés au navigateur à l'étape en cours."""
+    trace = _current.get()
+    if trace is not None: trace.add_bytes(n)
+
+
+def detailed():
+    trace = _current.get()
+    return trace is not None and trace.detailed
+
+
+# ============================================================================
+# 2. Agrégation, logs et export Prometheus
+# ============================================================================
+class Registry:
+    """Derniers rendus et compteurs cumulés par étape, partagés par le processus."""
+
+    def __init__(self, history=HISTORY, metrics_file=METRICS_FILE):
+        self.recent = deque(maxlen=history)
+        self.totals = {}
+        self.metrics_file = metrics_file
+        self.caches = {}  # nom -> cache exposant stats() (succès, échecs, taille)
+        self._lock = threading.Lock()
+
+    def record(self, trace):
+        data = trace.as_dict()
+        with self._lock:
+            self.recent.append(data)
+            for s in data['stages']:
+                tot = self.totals.setdefault(s['stage'], {'count': 0, 'seconds': 0.0, 'max_seconds': 0.0,
+                                                          'payload_bytes': 0, 'peak_bytes': 0})
+                tot['count'] += 1
+                tot['seconds'] += s['seconds']
+                tot['max_seconds'] = max(tot['max_seconds'], s['seconds'])
+                if s['payload_bytes']: tot['payload_bytes'] += s['payload_bytes']
+                if s['peak_bytes']: tot['peak_bytes'] = max(tot['peak_bytes'], s['peak_bytes'])
+        logger.info(json.dumps(data, separators=(',', ':')))
+        if self.metrics_file: self.write_metrics(self.metrics_file)
+
+    def last(self):
+        with self._lock: return self.recent[-1] if self.recent else None
+
+    def register_cache(self, name, cache):
+        """Déclare un cache dont les compteurs sont exportés (``stats()`` lu à chaque export)."""
+        with self._lock: self.caches[name] = cache
+        return cache
+
+    def cache_stats(self):
+        """Compteurs des caches déclarés : nom -> ``stats()``."""
+        with self._lock: caches = dict(self.caches)
+        return {name: cache.stats() for name, cache in sorted(caches.items())}
+
+    def prometheus_text(self):
+        """Compteurs au format d'exposition texte de Prometheus."""
+        with self._lock: totals = {k: dict(v) for k, v in self.totals.items()}
+        lines = []
+        metrics = [
+            ('vacsi_stage_seconds_total', 'counter', "Temps cumulé par étape", 'seconds'),
+            ('vacsi_stage_calls_total', 'counter', "Nombre d'exécutions par étape", 'count'),
+            ('vacsi_stage_seconds_max', 'gauge', "Temps maximal observé par étape", 'max_seconds'),
+            ('vacsi_stage_payload_bytes_total', 'counter', "Octets envoyés au navigateur (mode détaillé)", 'payload_bytes'),
+            ('vacsi_stage_peak_bytes', 'gauge', "Pic mémoire Python observé (mode détaillé)", 'peak_bytes'),
+        ]
+        for metric, kind, help_text, field in metrics:
+            lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} {kind}"]
+            for name, tot in sorted(totals.items()):
+                label = name.replace('\\', '\\\\').replace('"', '\\"')
+                lines.append(f'{metric}{{stage="{label}"}} {tot[field]}')
+        caches = self.cache_stats()
+        metrics = [
+            ('vacsi_cache_hits_total', 'counter', "Succès par cache", 'hits'),
+            ('vacsi_cache_misses_total', 'counter', "Échecs (construction) par cache", 'misses'),
+            ('vacsi_cache_entries', 'gauge', "Entrées présentes par cache", 'size'),
+            ('vacsi_cache_max_entries', 'gauge', "Capacité par cache", 'maxsize'),
+        ]
+        for metric, kind, help_text, field in metrics if caches else ():
+            lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} {kind}"]
+            lines += [f'{metric}{{cache="{name}"}} {stats[field]}' for name, stats in caches.items()]
+        return "\n".join(lines) + "\n"
+
+    def write_metrics(self, path):
+        """Écriture atomique (collecteur textfile de node_exporter)."""
+        tmp = f"{path}.tmp-{os.getpid()}"
+        try:
+            with open(tmp, 'w', encoding='utf-8') as f: f.write(self.prometheus_text())
+            os.replace(tmp, path)
+        except OSError:
+            logger.warning("Écriture des métriques impossible : %s", path)
+
+
+REGISTRY = Registry()
+
+
+def prometheus_text():
+    return REGISTRY.prometheus_text()
+
+
+def register_cache(name, cache):
+    return REGISTRY.register_cache(name, cache)
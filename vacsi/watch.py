@@ -0,0 +1,99 @@
+"""Surveillance du dossier des données et rafraîchissement en arrière-plan.
+
+Un fil démon relève périodiquement l'état du dossier (nom, taille et date de
+modification des fichiers VACSI : un simple ``stat``, sans relire les
+fichiers). Quand cet état change puis reste stable sur deux relevés (fichier
+entièrement copié), il appelle ``SharedDataset.refresh()`` : la nouvelle
+version est lue, nettoyée et validée hors de tout rendu, puis publiée d'un
+seul coup. Les sessions en cours gardent l'instantané qu'elles ont déjà pris ;
+le rendu suivant voit la nouvelle version, sans rechargement à froid.
+"""
+
+import fnmatch
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger("vacsi.watch")
+
+
+def directory_state(data_dir, patterns):
+    """(nom, taille, date de modification en ns) des fichiers correspondant à ``patterns``, triés."""
+    state = []
+    try:
+        with os.scandir(data_dir) as entries:
+            for e in entries:
+                if not any(fnmatch.fnmatch(e.name, p) for p in patterns): continue
+                try: st = e.stat()
+                except OSError: continue  # Fichier supprimé entre la liste et le stat
+                state.append((e.name, st.st_size, st.st_mtime_ns))
+    except OSError:
+        pass  # Dossier absent : état vide
+    return tuple(sorted(state))
+
+
+class Refresher:
+    """Fil démon qui republie ``dataset`` quand les fichiers de ``registry.data_dir`` changent.
+
+    ``interval`` : secondes entre deux relevés. Une erreur de lecture ou une
+    version rejetée laisse la version servie en place ; le prochain changement
+    du dossier déclenche un nouvel essai.
+    """
+
+    def __init__(self, dataset, registry, interval=30.0):
+        self.dataset = dataset
+        self.registry = registry
+        self.interval = interval
+        self.checks = self.refreshes = self.errors = 0
+        self.last_error = None
+        self.last_refresh = None  # (version, durée en secondes, horodatage)
+        self._applied = directory_state(registry.data_dir, registry.kinds.values())
+        self._pending = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="vacsi-refresher", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        if self._thread is not None: self._thread.join(timeout)
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.check()
+
+    def check(self):
+        """Un relevé ; True si une nouvelle version a été publiée."""
+        self.checks += 1
+        state = directory_state(self.registry.data_dir, self.registry.kinds.values())
+        if state == self._applied:
+            self._pending = None
+            return False
+        # Changement vu pour la première fois : on attend un relevé identique (copie terminée)
+        if state != self._pending:
+            self._pending = state
+            return False
+        self._applied, self._pending = state, None
+        start = time.perf_counter()
+        try:
+            published = self.dataset.refresh()
+        except Exception as e:  # Cliché illisible : la version servie reste en place
+            self.errors += 1
+            self.last_error = (f"{type(e).__name__}: {e}", time.time())
+            logger.warning("Rafraîchissement impossible : %s", e)
+            return False
+        if published:
+            self.refreshes += 1
+            self.last_refresh = (self.dataset.version, time.perf_counter() - start, time.time())
+            logger.info("Nouvelle version %s publiée en arrière-plan (%.2f s)", self.dataset.version, self.last_refresh[1])
+        return published